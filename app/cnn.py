@@ -0,0 +1,299 @@
+"""
+Runtime NumPy du CNN_RegularizedLight (inférence CPU, sans TensorFlow).
+
+Le modèle Keras (`notebooks/models/cnn_regularizedlight_*/cnn_model.keras`)
+est exporté une fois en un graphe séquentiel de couches + poids dans un
+`.npz` (`NumpyCNN.from_keras(...).save(...)`, voir export_cnn.py). L'API
+ne charge ensuite que ce fichier et NumPy : pas de TensorFlow dans
+l'image, démarrage à froid immédiat.
+
+Couches supportées (mode inférence, Dropout ignoré) : Conv1D (stride 1,
+padding 'same' ou 'valid'), BatchNormalization, MaxPooling1D,
+GlobalAveragePooling1D, Dense ; activations relu, softmax, linear.
+
+Entrée : (N, 500, 6), l'époque de 3000 points z-scorée puis repliée en
+500 pas × 6 canaux, comme à l'entraînement (`prepare_signals`).
+
+Utilisation :
+    cnn = NumpyCNN.load("notebooks/models/cnn_regularizedlight_20251015_202037/cnn_model.npz")
+    probabilities = cnn.predict_proba(prepare_signals(signals))  # (N, 3000) → (N, 5)
+"""
+
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Entrée du réseau : 3000 points = 500 pas × 6 canaux
+INPUT_SHAPE = (500, 6)
+
+# Nombre d'époques propagées à la fois (borne la mémoire des convolutions)
+_CHUNK_SIZE = 256
+
+# Nom des groupes de poids dans model.weights.h5 (Keras 3)
+_WEIGHT_GROUPS = {
+    'Conv1D': 'conv1d',
+    'BatchNormalization': 'batch_normalization',
+    'Dense': 'dense'
+}
+
+_IGNORED_LAYERS = ('InputLayer', 'Dropout')
+
+
+def prepare_signals(signals: np.ndarray) -> np.ndarray:
+    """
+    Époques brutes (N, 3000) → entrée du CNN (N, 500, 6), float32.
+    
+    Chaque époque est z-scorée individuellement (preprocessing du dataset ;
+    une époque constante est seulement centrée) puis repliée en 500 × 6.
+    """
+    signals = np.asarray(signals, dtype=np.float64)
+    if signals.ndim != 2 or signals.shape[1] != INPUT_SHAPE[0] * INPUT_SHAPE[1]:
+        raise ValueError(f"Signaux doivent avoir shape (N, 3000), reçu {signals.shape}")
+    centered = signals - signals.mean(axis=1, keepdims=True)
+    std = signals.std(axis=1, keepdims=True)
+    normalized = np.divide(centered, std, out=centered, where=std > 0)
+    return normalized.astype(np.float32).reshape(-1, *INPUT_SHAPE)
+
+
+class NumpyCNN:
+    """
+    CNN séquentiel exécuté en NumPy (float32).
+    
+    `layers` est la liste des couches dans l'ordre, chacune un dict
+    `{"type": ..., paramètres..., tableaux...}` ; les BatchNormalization sont
+    pré-calculées en (scale, shift) par canal.
+    """
+    
+    def __init__(self, layers: List[Dict], normalization: Dict, class_names: List[str],
+                 info: Dict = None):
+        """
+        Args:
+            layers: Couches (voir `from_keras`)
+            normalization: {"mean": ..., "std": ...} appliqués à l'entrée (normalization_params.json)
+            class_names: Noms des classes, dans l'ordre des sorties
+            info: Métadonnées du modèle (performance, architecture)
+        """
+        self.layers = layers
+        self.normalization = normalization
+        self.class_names = list(class_names)
+        self.info = info or {}
+    
+    @classmethod
+    def from_keras(cls, model_dir: Union[str, Path]) -> "NumpyCNN":
+        """
+        Exporte un modèle sauvegardé par le notebook CNN.
+        
+        Lit `cnn_model.keras` (archive : config.json + model.weights.h5),
+        `normalization_params.json` et `metadata.json`. Nécessite h5py
+        (pas TensorFlow) ; seul l'export en dépend, pas l'inférence.
+        
+        Raises:
+            ImportError: Si h5py n'est pas installé
+            ValueError: Si une couche n'est pas supportée
+        """
+        import h5py
+        
+        model_dir = Path(model_dir)
+        with zipfile.ZipFile(model_dir / "cnn_model.keras") as archive:
+            config = json.loads(archive.read("config.json"))
+            weights = h5py.File(io.BytesIO(archive.read("model.weights.h5")), "r")
+        
+        seen = {}
+        layers = []
+        with weights:
+            for layer in config["config"]["layers"]:
+                kind, params = layer["class_name"], layer["config"]
+                if kind in _IGNORED_LAYERS:
+                    continue
+                variables = []
+                if kind in _WEIGHT_GROUPS:
+                    index = seen.get(kind, 0)
+                    seen[kind] = index + 1
+                    group = _WEIGHT_GROUPS[kind] + (f"_{index}" if index else "")
+                    variables = [np.asarray(weights[f"layers/{group}/vars/{i}"], dtype=np.float32)
+                                 for i in range(len(weights[f"layers/{group}/vars"]))]
+                layers.append(_convert_layer(kind, params, variables))
+        
+        normalization = json.loads((model_dir / "normalization_params.json").read_text())
+        metadata = json.loads((model_dir / "metadata.json").read_text())
+        return cls(
+            layers=layers,
+            normalization={"mean": normalization["mean_train"], "std": normalization["std_train"]},
+            class_names=metadata["architecture"]["class_names"],
+            info={
+                "model_type": metadata["model_name"],
+                "accuracy": metadata["performance"]["test_accuracy"],
+                "f1_score": metadata["performance"]["test_f1_score"],
+                "cohens_kappa": metadata["performance"]["cohen_kappa"],
+                "n_features": INPUT_SHAPE[0] * INPUT_SHAPE[1],
+                "training_date": metadata["timestamp"]
+            }
+        )
+    
+    def save(self, path: Union[str, Path]):
+        """Écrit le graphe et les poids dans un `.npz` (lisible sans pickle)."""
+        arrays = {}
+        graph = []
+        for i, layer in enumerate(self.layers):
+            spec = {}
+            for name, value in layer.items():
+                if isinstance(value, np.ndarray):
+                    arrays[f"{i}.{name}"] = value
+                else:
+                    spec[name] = value
+            graph.append(spec)
+        header = {"layers": graph, "normalization": self.normalization,
+                  "class_names": self.class_names, "info": self.info}
+        np.savez(path, header=np.array(json.dumps(header)), **arrays)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NumpyCNN":
+        """Charge un modèle écrit par `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            layers = []
+            for i, spec in enumerate(header["layers"]):
+                prefix = f"{i}."
+                arrays = {key[len(prefix):]: data[key] for key in data.files if key.startswith(prefix)}
+                layers.append({**spec, **arrays})
+        return cls(layers, header["normalization"], header["class_names"], header["info"])
+    
+    @property
+    def n_parameters(self) -> int:
+        return sum(value.size for layer in self.layers for value in layer.values()
+                   if isinstance(value, np.ndarray))
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Probabilités des classes.
+        
+        Args:
+            X: Entrée du réseau (N, 500, 6) (voir `prepare_signals`)
+        
+        Returns:
+            Array (N, n_classes), colonnes dans l'ordre de `class_names`
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 3 or X.shape[1:] != INPUT_SHAPE:
+            raise ValueError(f"X doit avoir shape (N, {INPUT_SHAPE[0]}, {INPUT_SHAPE[1]}), reçu {X.shape}")
+        X = (X - np.float32(self.normalization["mean"])) / np.float32(self.normalization["std"])
+        
+        outputs = [self._forward(X[start:start + _CHUNK_SIZE]) for start in range(0, len(X), _CHUNK_SIZE)]
+        return np.concatenate(outputs) if outputs else np.empty((0, len(self.class_names)), dtype=np.float32)
+    
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        for layer in self.layers:
+            x = _LAYER_FUNCTIONS[layer["type"]](x, layer)
+        return x
+
+
+def _convert_layer(kind: str, params: Dict, variables: List[np.ndarray]) -> Dict:
+    """Couche Keras (config + variables) → couche du runtime."""
+    activation = params.get("activation", "linear")
+    if activation not in _ACTIVATIONS:
+        raise ValueError(f"Activation non supportée : {activation}")
+    
+    if kind == "Conv1D":
+        if (params["strides"] != [1] or params["dilation_rate"] != [1] or params["groups"] != 1
+                or params["padding"] not in ("same", "valid")):
+            raise ValueError(f"Conv1D non supportée : {params}")
+        kernel = variables[0]  # (k, C_in, C_out)
+        bias = variables[1] if params["use_bias"] else np.zeros(kernel.shape[2], dtype=np.float32)
+        # Ordre (C_in, k) des fenêtres de sliding_window_view
+        return {"type": "conv1d", "padding": params["padding"], "activation": activation,
+                "kernel": np.ascontiguousarray(kernel.transpose(1, 0, 2).reshape(-1, kernel.shape[2])),
+                "kernel_size": int(kernel.shape[0]), "bias": bias}
+    
+    if kind == "BatchNormalization":
+        gamma, beta, mean, variance = _batch_norm_variables(params, variables)
+        # Même calcul que keras.ops.batch_normalization : x * inv + (beta - mean * inv)
+        scale = (np.float32(1) / np.sqrt(variance + np.float32(params["epsilon"]))) * gamma
+        return {"type": "batch_norm", "scale": scale.astype(np.float32),
+                "shift": (-mean * scale + beta).astype(np.float32)}
+    
+    if kind == "MaxPooling1D":
+        if params["padding"] != "valid" or params["strides"] != params["pool_size"]:
+            raise ValueError(f"MaxPooling1D non supportée : {params}")
+        return {"type": "max_pool", "pool_size": int(params["pool_size"][0])}
+    
+    if kind == "GlobalAveragePooling1D":
+        return {"type": "global_avg_pool"}
+    
+    if kind == "Dense":
+        bias = variables[1] if params["use_bias"] else np.zeros(variables[0].shape[1], dtype=np.float32)
+        return {"type": "dense", "activation": activation, "kernel": variables[0], "bias": bias}
+    
+    raise ValueError(f"Couche non supportée : {kind}")
+
+
+def _batch_norm_variables(params: Dict, variables: List[np.ndarray]):
+    """(gamma, beta, moyenne, variance) ; gamma/beta absents si scale/center désactivés."""
+    variables = list(variables)
+    gamma = variables.pop(0) if params["scale"] else None
+    beta = variables.pop(0) if params["center"] else None
+    mean, variance = variables
+    if gamma is None:
+        gamma = np.ones_like(mean)
+    if beta is None:
+        beta = np.zeros_like(mean)
+    return gamma, beta, mean, variance
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "softmax": _softmax
+}
+
+
+def _conv1d(x: np.ndarray, layer: Dict) -> np.ndarray:
+    """Convolution 1D par im2col : une seule multiplication matricielle (BLAS)."""
+    k = layer["kernel_size"]
+    if layer["padding"] == "same":
+        left = (k - 1) // 2
+        x = np.pad(x, ((0, 0), (left, k - 1 - left), (0, 0)))
+    windows = sliding_window_view(x, k, axis=1)  # (N, L, C_in, k)
+    n, length = windows.shape[:2]
+    out = windows.reshape(n * length, -1) @ layer["kernel"]
+    out += layer["bias"]
+    return _ACTIVATIONS[layer["activation"]](out.reshape(n, length, -1))
+
+
+def _batch_norm(x: np.ndarray, layer: Dict) -> np.ndarray:
+    # En place : x est la sortie de la couche précédente
+    x *= layer["scale"]
+    x += layer["shift"]
+    return x
+
+
+def _max_pool(x: np.ndarray, layer: Dict) -> np.ndarray:
+    pool = layer["pool_size"]
+    length = x.shape[1] // pool
+    return x[:, :length * pool].reshape(x.shape[0], length, pool, x.shape[2]).max(axis=2)
+
+
+def _global_avg_pool(x: np.ndarray, layer: Dict) -> np.ndarray:
+    return x.mean(axis=1)
+
+
+def _dense(x: np.ndarray, layer: Dict) -> np.ndarray:
+    return _ACTIVATIONS[layer["activation"]](x @ layer["kernel"] + layer["bias"])
+
+
+_LAYER_FUNCTIONS = {
+    "conv1d": _conv1d,
+    "batch_norm": _batch_norm,
+    "max_pool": _max_pool,
+    "global_avg_pool": _global_avg_pool,
+    "dense": _dense
+}
@@ -0,0 +1,127 @@
+"""
+Compaction du modèle : moins d'arbres, arbres moins profonds.
+
+La forêt de production (500 arbres, profondeur 50) est volumineuse et
+lente à parcourir. `compact_pipeline` en dérive un pipeline plus petit,
+toujours sklearn (donc servi par les deux backends) :
+
+- `n_trees` : ne garde que les premiers arbres. Ce sont des réplicats
+  bootstrap indépendants : les premiers forment un sous-échantillon sans
+  biais, et `predict_proba` moyenne sur les arbres restants (poids 1/k).
+- `max_depth` : tronque chaque arbre ; un nœud à la profondeur limite
+  devient une feuille dont les probabilités sont la distribution des
+  classes qu'il contenait à l'entraînement (`tree_.value` du nœud).
+
+La réduction des types (seuils float32, features int8) concerne la forêt
+aplatie : voir `FlatForest.compact_dtypes`.
+
+Utilisation :
+    small = compact_pipeline(pipeline, n_trees=100, max_depth=20)
+"""
+
+import copy
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.tree._tree import Tree
+
+# Valeurs sklearn d'une feuille (sklearn.tree._tree.TREE_LEAF / TREE_UNDEFINED)
+_TREE_LEAF = -1
+_TREE_UNDEFINED = -2
+
+
+def node_depths(tree: Tree) -> np.ndarray:
+    """Profondeur de chaque nœud d'un arbre sklearn (racine : 0)."""
+    depth = np.zeros(tree.node_count, dtype=np.int64)
+    level = np.array([0])
+    # Parcours niveau par niveau (au plus max_depth itérations)
+    while level.size:
+        children = np.concatenate([tree.children_left[level], tree.children_right[level]])
+        children = children[children != _TREE_LEAF]
+        depth[children] = depth[level[0]] + 1
+        level = children
+    return depth
+
+
+def truncate_tree(tree: Tree, max_depth: int) -> Tree:
+    """
+    Copie d'un arbre sklearn limitée à `max_depth`.
+    
+    Les nœuds au-delà de la limite sont supprimés et les index renumérotés ;
+    l'arbre est reconstruit via l'état de sérialisation de `Tree`.
+    """
+    if max_depth < 0:
+        raise ValueError(f"max_depth doit être >= 0, reçu {max_depth}")
+    cls, args, state = tree.__reduce__()
+    if tree.max_depth <= max_depth:
+        new = cls(*args)
+        new.__setstate__(state)
+        return new
+    
+    depth = node_depths(tree)
+    keep = depth <= max_depth
+    new_index = np.cumsum(keep) - 1
+    
+    nodes = state['nodes'][keep].copy()
+    cut = depth[keep] == max_depth
+    internal = (nodes['left_child'] != _TREE_LEAF) & ~cut
+    nodes['left_child'] = np.where(internal, new_index[nodes['left_child']], _TREE_LEAF)
+    nodes['right_child'] = np.where(internal, new_index[nodes['right_child']], _TREE_LEAF)
+    nodes['feature'][cut] = _TREE_UNDEFINED
+    nodes['threshold'][cut] = _TREE_UNDEFINED
+    
+    new = cls(*args)
+    new.__setstate__({
+        'max_depth': max_depth,
+        'node_count': len(nodes),
+        'nodes': nodes,
+        'values': np.ascontiguousarray(state['values'][keep])
+    })
+    return new
+
+
+def compact_pipeline(pipeline: Pipeline, n_trees: Optional[int] = None,
+                     max_depth: Optional[int] = None) -> Pipeline:
+    """
+    Pipeline réduit : `n_trees` premiers arbres, tronqués à `max_depth`.
+    
+    Le pipeline d'origine n'est pas modifié ; les autres étapes
+    (FeatureExtractor, StandardScaler) sont partagées.
+    
+    Args:
+        pipeline: Pipeline entraîné se terminant par une RandomForestClassifier
+        n_trees: Nombre d'arbres à garder (None : tous)
+        max_depth: Profondeur maximale (None : inchangée)
+    
+    Returns:
+        Nouveau pipeline, mêmes étapes, forêt réduite
+    
+    Raises:
+        ValueError: Si le pipeline ne se termine pas par une RandomForest
+            ou si les paramètres sont invalides
+    """
+    name, forest = pipeline.steps[-1]
+    if not isinstance(forest, RandomForestClassifier):
+        raise ValueError(f"Le pipeline doit se terminer par une RandomForestClassifier, reçu {type(forest).__name__}")
+    n_total = len(forest.estimators_)
+    if n_trees is None:
+        n_trees = n_total
+    if not 1 <= n_trees <= n_total:
+        raise ValueError(f"n_trees doit être entre 1 et {n_total}, reçu {n_trees}")
+    
+    estimators = []
+    for estimator in forest.estimators_[:n_trees]:
+        estimator = copy.copy(estimator)
+        if max_depth is not None:
+            estimator.tree_ = truncate_tree(estimator.tree_, max_depth)
+            estimator.max_depth = max_depth
+        estimators.append(estimator)
+    
+    compact = copy.copy(forest)
+    compact.estimators_ = estimators
+    compact.n_estimators = n_trees
+    if max_depth is not None:
+        compact.max_depth = max_depth
+    return Pipeline(pipeline.steps[:-1] + [(name, compact)])
@@ -0,0 +1,37 @@
+"""
+Empreintes des époques EEG pour les caches (features, prédictions).
+
+BLAKE2b sur les octets float64 de chaque époque : deux signaux ont la même
+empreinte si et seulement s'ils ont exactement les mêmes valeurs, quel
+que soit le format d'envoi (JSON, float64 binaire ; le float32 est
+converti en float64 avant hachage).
+"""
+
+import hashlib
+from typing import List
+import numpy as np
+
+# Taille des empreintes (octets) : 128 bits, collisions négligeables
+DIGEST_SIZE = 16
+
+
+def epoch_digests(signals: np.ndarray) -> List[bytes]:
+    """
+    Empreinte de chaque époque d'un batch.
+
+    Args:
+        signals: Array (N, L)
+
+    Returns:
+        N empreintes de DIGEST_SIZE octets
+    """
+    signals = np.ascontiguousarray(signals, dtype=np.float64)
+    return [
+        hashlib.blake2b(row.data, digest_size=DIGEST_SIZE).digest()
+        for row in signals.reshape(len(signals), -1)
+    ]
+
+
+def params_digest(*params) -> bytes:
+    """Empreinte d'un jeu de paramètres (repr stable : nombres, chaînes, tuples)."""
+    return hashlib.blake2b(repr(params).encode(), digest_size=DIGEST_SIZE).digest()
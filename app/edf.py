@@ -0,0 +1,271 @@
+"""
+Lecture native des fichiers EDF/EDF+ (Sleep-EDF `*-PSG.edf`).
+
+Les data records sont mappés en mémoire (`np.memmap`) : un canal est lu
+à la demande, par batchs d'époques de 30 s, sans charger l'enregistrement
+complet en RAM ni dépendre de `pyedflib`. Seules les époques demandées
+sont converties en unités physiques (float64).
+
+Utilisation :
+    reader = EdfReader("SC4001E0-PSG.edf")
+    for batch in reader.iter_epoch_batches("EEG Fpz-Cz"):
+        features = extractor.transform(batch)   # (N, 16)
+
+    stages = EdfReader("SC4001EC-Hypnogram.edf").annotations()  # [(onset, durée, texte), ...]
+
+Note : le filtre passe-bande du preprocessing (0.3-35 Hz) n'est pas appliqué.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+import numpy as np
+
+# Tailles (octets) des champs de l'en-tête EDF
+_HEADER_FIELDS = (
+    ('version', 8), ('patient', 80), ('recording', 80), ('start_date', 8),
+    ('start_time', 8), ('header_bytes', 8), ('reserved', 44),
+    ('n_records', 8), ('record_duration', 8), ('n_signals', 4),
+)
+_SIGNAL_FIELDS = (
+    ('label', 16), ('transducer', 80), ('physical_dimension', 8),
+    ('physical_min', 8), ('physical_max', 8), ('digital_min', 8),
+    ('digital_max', 8), ('prefiltering', 80), ('samples_per_record', 8),
+    ('reserved', 32),
+)
+
+ANNOTATIONS_LABEL = "EDF Annotations"
+
+
+@dataclass
+class EdfSignal:
+    """Description d'un canal EDF (en-tête de signal)."""
+    index: int
+    label: str
+    physical_dimension: str
+    physical_min: float
+    physical_max: float
+    digital_min: int
+    digital_max: int
+    samples_per_record: int
+    fs: float
+
+    @property
+    def gain(self) -> float:
+        """Facteur digital → physique."""
+        return (self.physical_max - self.physical_min) / (self.digital_max - self.digital_min)
+
+    @property
+    def offset(self) -> float:
+        """Décalage digital → physique."""
+        return self.physical_min - self.gain * self.digital_min
+
+
+class EdfReader:
+    """
+    Lecteur EDF avec accès mappé en mémoire aux data records.
+
+    Chaque record contient, pour chaque canal, `samples_per_record` entiers
+    int16 ; le mapping est un tableau structuré (n_records,) dont chaque
+    champ est la vue (n_records, samples_per_record) d'un canal.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Chemin du fichier .edf
+
+        Raises:
+            ValueError: Si l'en-tête est invalide ou le fichier tronqué
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            header = self._parse_fields(f.read(256), _HEADER_FIELDS)
+            try:
+                self.header_bytes = int(header['header_bytes'])
+                n_signals = int(header['n_signals'])
+                self.record_duration = float(header['record_duration'])
+                n_records = int(header['n_records'])
+            except ValueError as e:
+                raise ValueError(f"En-tête EDF invalide: {e}")
+
+            raw = f.read(256 * n_signals)
+            if len(raw) != 256 * n_signals:
+                raise ValueError("En-tête EDF tronqué")
+
+        self.start = f"{header['start_date']} {header['start_time']}"
+        self.signals = self._parse_signals(raw, n_signals)
+
+        self._record_dtype = np.dtype([
+            (f"s{s.index}", '<i2', (s.samples_per_record,)) for s in self.signals
+        ])
+        available = (self.path.stat().st_size - self.header_bytes) // self._record_dtype.itemsize
+        # n_records = -1 pendant l'enregistrement : déduit de la taille du fichier
+        self.n_records = available if n_records < 0 else min(n_records, available)
+        if self.n_records <= 0:
+            raise ValueError("Fichier EDF sans data record")
+
+        self._records = np.memmap(
+            self.path, dtype=self._record_dtype, mode='r',
+            offset=self.header_bytes, shape=(self.n_records,)
+        )
+
+    @staticmethod
+    def _parse_fields(raw: bytes, fields) -> dict:
+        values, pos = {}, 0
+        for name, size in fields:
+            values[name] = raw[pos:pos + size].decode('ascii', errors='replace').strip()
+            pos += size
+        return values
+
+    def _parse_signals(self, raw: bytes, n_signals: int) -> List[EdfSignal]:
+        # Les champs sont stockés par colonne : ns labels, puis ns transducers, ...
+        columns, pos = {}, 0
+        for name, size in _SIGNAL_FIELDS:
+            columns[name] = [
+                raw[pos + i * size:pos + (i + 1) * size].decode('ascii', errors='replace').strip()
+                for i in range(n_signals)
+            ]
+            pos += size * n_signals
+
+        signals = []
+        for i in range(n_signals):
+            try:
+                samples = int(columns['samples_per_record'][i])
+                signals.append(EdfSignal(
+                    index=i,
+                    label=columns['label'][i],
+                    physical_dimension=columns['physical_dimension'][i],
+                    physical_min=float(columns['physical_min'][i]),
+                    physical_max=float(columns['physical_max'][i]),
+                    digital_min=int(columns['digital_min'][i]),
+                    digital_max=int(columns['digital_max'][i]),
+                    samples_per_record=samples,
+                    fs=samples / self.record_duration if self.record_duration > 0 else 0.0,
+                ))
+            except ValueError as e:
+                raise ValueError(f"En-tête du signal {i} invalide: {e}")
+            if signals[-1].digital_max == signals[-1].digital_min:
+                # gain non défini (division par zéro à la lecture)
+                raise ValueError(
+                    f"En-tête du signal {i} invalide: digital_min = digital_max ({signals[-1].digital_min})"
+                )
+        return signals
+
+    @property
+    def labels(self) -> List[str]:
+        """Noms des canaux."""
+        return [s.label for s in self.signals]
+
+    def signal(self, channel: Union[int, str]) -> EdfSignal:
+        """Retourne un canal par index ou par nom."""
+        if isinstance(channel, str):
+            if channel not in self.labels:
+                raise ValueError(f"Canal inconnu: '{channel}' (disponibles: {', '.join(self.labels)})")
+            channel = self.labels.index(channel)
+        signal = self.signals[channel]
+        if signal.label == ANNOTATIONS_LABEL:
+            raise ValueError("Le canal 'EDF Annotations' ne contient pas de signal")
+        return signal
+
+    def n_samples(self, channel: Union[int, str]) -> int:
+        """Nombre de points du canal."""
+        return self.n_records * self.signal(channel).samples_per_record
+
+    def n_epochs(self, channel: Union[int, str], epoch_len: int = 3000) -> int:
+        """Nombre d'époques complètes du canal."""
+        return self.n_samples(channel) // epoch_len
+
+    def digital(self, channel: Union[int, str]) -> np.ndarray:
+        """
+        Vue mappée (sans copie) des valeurs int16 du canal.
+
+        Returns:
+            Array (n_records, samples_per_record) en lecture seule
+        """
+        return self._records[f"s{self.signal(channel).index}"]
+
+    def read_epochs(self, channel: Union[int, str], start: int, stop: int,
+                    epoch_len: int = 3000) -> np.ndarray:
+        """
+        Lit les époques [start, stop) d'un canal en unités physiques.
+
+        Seuls les records couvrant ces époques sont lus depuis le disque.
+
+        Returns:
+            Array float64 (stop - start, epoch_len)
+        """
+        signal = self.signal(channel)
+        stop = min(stop, self.n_epochs(channel, epoch_len))
+        if start >= stop:
+            return np.empty((0, epoch_len))
+
+        per_record = signal.samples_per_record
+        first, last = start * epoch_len, stop * epoch_len
+        r0, r1 = first // per_record, -(-last // per_record)
+        samples = self.digital(signal.index)[r0:r1].reshape(-1)
+        samples = samples[first - r0 * per_record:last - r0 * per_record]
+
+        epochs = samples.astype(np.float64).reshape(-1, epoch_len)
+        epochs *= signal.gain
+        epochs += signal.offset
+        return epochs
+
+    def iter_epoch_batches(self, channel: Union[int, str], batch_size: int = 256,
+                           epoch_len: int = 3000) -> Iterator[np.ndarray]:
+        """
+        Parcourt un canal par batchs d'époques en unités physiques.
+
+        La mémoire reste bornée à un batch, quelle que soit la durée
+        de l'enregistrement ; les points d'une époque incomplète en fin
+        de fichier sont ignorés.
+
+        Yields:
+            Arrays float64 (≤ batch_size, epoch_len)
+        """
+        n_epochs = self.n_epochs(channel, epoch_len)
+        for start in range(0, n_epochs, batch_size):
+            yield self.read_epochs(channel, start, start + batch_size, epoch_len)
+
+    def annotations(self) -> List[Tuple[float, float, str]]:
+        """
+        Annotations EDF+ des canaux 'EDF Annotations' (hypnogrammes Sleep-EDF).
+
+        Chaque record contient des TAL (Time-stamped Annotations Lists)
+        séparées par \\x00 : `+onset[\\x15durée]\\x14texte\\x14...\\x14`.
+        Les TAL sans texte (horodatage des records) sont ignorées.
+
+        Returns:
+            Liste (onset en s, durée en s ou 0, texte), triée par onset
+
+        Raises:
+            ValueError: Si une TAL est mal formée
+        """
+        annotations = []
+        for signal in self.signals:
+            if signal.label != ANNOTATIONS_LABEL:
+                continue
+            for record in self._records[f"s{signal.index}"]:
+                for tal in record.tobytes().split(b"\x00"):
+                    if not tal:
+                        continue
+                    timing, *texts = tal.split(b"\x14")
+                    onset, _, duration = timing.partition(b"\x15")
+                    try:
+                        onset, duration = float(onset), float(duration) if duration else 0.0
+                    except ValueError:
+                        raise ValueError(f"Annotation EDF+ invalide: {tal[:40]!r}")
+                    annotations.extend(
+                        (onset, duration, text.decode('utf-8', errors='replace')) for text in texts if text
+                    )
+        return sorted(annotations, key=lambda annotation: annotation[0])
+
+    def close(self):
+        """Libère le mapping (effectif quand plus aucune vue n'y fait référence)."""
+        self._records = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
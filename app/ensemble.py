@@ -0,0 +1,230 @@
+"""
+Ensemble de modèles : moyenne pondérée des probabilités (RF + CNN, ...).
+
+Un ensemble naïf repasserait chaque batch dans le prétraitement de chaque
+membre. Ici les représentations intermédiaires sont calculées une seule
+fois par batch :
+
+- le tableau brut (N, 3000), validé une fois ;
+- les 16 features, une fois par paramétrage du FeatureExtractor (les
+  forêts entraînées sur les mêmes features les partagent) ;
+- le tenseur d'entrée du CNN (N, 500, 6).
+
+Les membres (scaler + forêt, CNN) tournent ensuite en parallèle sur un
+pool de threads : NumPy et sklearn libèrent le GIL dans les calculs lourds.
+La durée de chaque étape et de chaque membre est gardée pour le dernier
+batch prédit par le thread appelant (`get_last_timings`).
+
+Configuration JSON (chemins relatifs au fichier) :
+    {
+      "members": [
+        {"name": "rf", "path": "rf_v2_final", "backend": "flat", "weight": 0.5},
+        {"name": "cnn", "path": "cnn_regularizedlight_20251015_202037/cnn_model.npz",
+         "backend": "cnn", "weight": 0.5}
+      ],
+      "info": {"accuracy": 0.70, "f1_score": 0.69, "cohens_kappa": 0.60}
+    }
+
+Utilisation :
+    ensemble = EnsembleClassifier.from_config("models/ensemble.json")
+    results = ensemble.predict_batch(signals)
+    ensemble.get_last_timings()  # {'features_ms': ..., 'members_ms': {'rf': ..., 'cnn': ...}, ...}
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.cnn import prepare_signals
+from app.digest import params_digest
+from app.ml_model import SleepStageClassifier
+
+logger = logging.getLogger(__name__)
+
+# Backend des configurations d'ensemble (registre, SLEEPAI_MODEL_BACKEND)
+ENSEMBLE_BACKEND = 'ensemble'
+
+
+class EnsembleClassifier(SleepStageClassifier):
+    """
+    Moyenne pondérée des probabilités de plusieurs `SleepStageClassifier`.
+    
+    Même interface que le classificateur simple (predict, predict_batch,
+    cache de prédictions, get_model_info) : l'API le sert sans distinction.
+    Les features retournées (monitoring) sont celles du premier
+    FeatureExtractor, ou None si aucun membre n'en a.
+    """
+    
+    def __init__(self, members: Sequence[SleepStageClassifier], weights: Optional[Sequence[float]] = None,
+                 names: Optional[Sequence[str]] = None, model_path: Optional[Union[str, Path]] = None,
+                 info: Optional[Dict] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            members: Classificateurs chargés (backends 'sklearn', 'flat', 'cnn')
+            weights: Poids de chaque membre (normalisés ; défaut : uniformes)
+            names: Noms des membres dans les timings (défaut : fichier_backend)
+            model_path: Fichier de configuration (affiché par /health)
+            info: Métriques de l'ensemble pour /model-info (défaut : celles
+                du premier membre)
+            max_workers: Threads du pool (défaut : un par membre)
+        
+        Raises:
+            ValueError: Si la liste, les poids ou les noms sont invalides
+        """
+        if not members:
+            raise ValueError("Un ensemble demande au moins un membre")
+        weights = np.ones(len(members)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if weights.shape != (len(members),) or np.any(weights < 0) or weights.sum() <= 0:
+            raise ValueError(f"Poids invalides pour {len(members)} membres: {weights.tolist()}")
+        names = list(names) if names is not None else [f"{m.model_path.stem}_{m.backend}" for m in members]
+        if len(names) != len(members) or len(set(names)) != len(names):
+            raise ValueError(f"Noms de membres invalides ou en double: {names}")
+        
+        self.members = list(members)
+        self.member_names = names
+        self.weights = weights / weights.sum()
+        self.info = dict(info or {})
+        self.backend = ENSEMBLE_BACKEND
+        self.model_path = Path(model_path) if model_path is not None else self.members[0].model_path
+        self.pipeline = None
+        self.feature_extractor = None
+        self.head = None
+        self.flat_head = None
+        self.cnn = None
+        self.prediction_cache = None
+        self._timings = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(self.members),
+                                        thread_name_prefix="ensemble")
+        self._plan_inputs()
+        self._new_model_version()
+    
+    @classmethod
+    def from_config(cls, path: Union[str, Path], **kwargs) -> "EnsembleClassifier":
+        """
+        Charge les membres décrits par un fichier de configuration JSON.
+        
+        Raises:
+            ValueError: Si la configuration ne décrit aucun membre
+        """
+        path = Path(path)
+        config = json.loads(path.read_text())
+        entries = config.get("members") if isinstance(config, dict) else None
+        if not entries:
+            raise ValueError(f"{path} : aucun membre ('members')")
+        members = [
+            SleepStageClassifier(str(path.parent / entry["path"]), backend=entry.get("backend", "sklearn"))
+            for entry in entries
+        ]
+        names = [entry.get("name", f"{m.model_path.stem}_{m.backend}") for entry, m in zip(entries, members)]
+        return cls(members, weights=[entry.get("weight", 1.0) for entry in entries], names=names,
+                   model_path=path, info=config.get("info"), **kwargs)
+    
+    def _plan_inputs(self):
+        """Regroupe les membres par représentation d'entrée (features partagées par extracteur)."""
+        self._feature_groups: List[Tuple[object, List[int]]] = []
+        namespaces = {}
+        self._tensor_members: List[int] = []
+        self._signal_members: List[int] = []
+        for i, member in enumerate(self.members):
+            if member.input_kind == 'features':
+                namespace = member.feature_extractor.cache_namespace()
+                if namespace not in namespaces:
+                    namespaces[namespace] = len(self._feature_groups)
+                    self._feature_groups.append((member.feature_extractor, []))
+                self._feature_groups[namespaces[namespace]][1].append(i)
+            elif member.input_kind == 'tensor':
+                self._tensor_members.append(i)
+            else:
+                self._signal_members.append(i)
+    
+    def _compute_model_version(self) -> str:
+        """Version de l'ensemble : versions des membres + poids."""
+        return params_digest(*(m.model_version for m in self.members), tuple(self.weights)).hex()
+    
+    def _predict_proba_and_features(self, signals: np.ndarray,
+                                    use_cache: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # Pas de timings périmés si tout le batch vient du cache
+        self._timings.last = None
+        return super()._predict_proba_and_features(signals, use_cache)
+    
+    def _compute_proba_and_features(self, signals: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Représentations partagées une fois, puis membres en parallèle."""
+        start = time.perf_counter()
+        timings = {}
+        try:
+            # 1. Représentations partagées (extraction et préparation en parallèle)
+            feature_jobs = [self._pool.submit(_timed, extractor.transform, signals)
+                            for extractor, _ in self._feature_groups]
+            tensor_job = self._pool.submit(_timed, prepare_signals, signals) if self._tensor_members else None
+            features = [job.result() for job in feature_jobs]
+            if feature_jobs:
+                timings["features_ms"] = sum(ms for _, ms in features)
+            tensor = None
+            if tensor_job is not None:
+                tensor, timings["cnn_input_ms"] = tensor_job.result()
+            
+            # 2. Membres sur leur représentation
+            jobs = {}
+            for (_, indices), (group_features, _) in zip(self._feature_groups, features):
+                for i in indices:
+                    jobs[i] = self._pool.submit(_timed, self.members[i].predict_proba_from_features, group_features)
+            for i in self._tensor_members:
+                jobs[i] = self._pool.submit(_timed, self.members[i].predict_proba_from_tensor, tensor)
+            for i in self._signal_members:
+                jobs[i] = self._pool.submit(_timed, self.members[i].predict_proba, signals)
+            
+            probabilities = np.zeros((len(signals), len(self.CLASS_NAMES)))
+            timings["members_ms"] = {}
+            for i in range(len(self.members)):
+                member_probabilities, timings["members_ms"][self.member_names[i]] = jobs[i].result()
+                probabilities += self.weights[i] * member_probabilities
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la prédiction de l'ensemble: {e}")
+            raise
+        
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        self._timings.last = timings
+        return probabilities, features[0][0] if features else None
+    
+    def get_last_timings(self) -> Optional[Dict]:
+        """Durées (ms) du dernier batch calculé par le thread appelant : features, entrée CNN, membres, total."""
+        return getattr(self._timings, "last", None)
+    
+    def get_model_info(self) -> dict:
+        """Informations de l'ensemble, métriques de la configuration (défaut : premier membre)."""
+        label = " + ".join(f"{name} × {weight:.2f}" for name, weight in zip(self.member_names, self.weights))
+        return {
+            **self.members[0].get_model_info(),
+            'model_type': f"Ensemble ({label})",
+            **self.info,
+            'backend': self.backend,
+            'model_loaded': self.is_loaded(),
+            'members': [
+                {'name': name, 'weight': float(weight), 'backend': member.backend,
+                 'model_type': member.get_model_info()['model_type'], 'model_path': str(member.model_path)}
+                for name, weight, member in zip(self.member_names, self.weights, self.members)
+            ]
+        }
+    
+    def is_loaded(self) -> bool:
+        return all(member.is_loaded() for member in self.members)
+
+
+def _timed(fn, *args):
+    """(résultat, durée en ms) d'un appel."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def load_classifier(model_path: Union[str, Path], backend: str) -> SleepStageClassifier:
+    """Classificateur simple, ou ensemble si `backend` vaut 'ensemble' (fichier de configuration)."""
+    if backend == ENSEMBLE_BACKEND:
+        return EnsembleClassifier.from_config(model_path)
+    return SleepStageClassifier(str(model_path), backend=backend)
@@ -0,0 +1,172 @@
+"""
+Cache persistant des features EEG (SQLite).
+
+Les rejeux de trafic loggé et les expériences de réentraînement
+recalculent les mêmes features pour des époques identiques : le cache
+les retrouve par empreinte BLAKE2b des octets de l'époque.
+
+La clé inclut aussi l'empreinte des paramètres de l'extracteur
+(fs, expected_len, bandes de fréquence, version des features) : changer
+l'un d'eux n'invalide rien mais ne relit jamais d'anciennes valeurs.
+
+Utilisation :
+    extractor.set_cache(FeatureCache("cache/features.sqlite"))
+    extractor.transform(X)   # seules les époques absentes sont calculées
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+import numpy as np
+
+from app.digest import epoch_digests
+
+# Nombre maximum de paramètres par requête SQLite (limite par défaut : 999)
+_SQL_CHUNK = 500
+
+
+class FeatureCache:
+    """
+    Cache de features sur disque, borné en nombre d'entrées (éviction LRU).
+
+    Chaque entrée : (namespace, empreinte de l'époque) → 16 float64.
+    Thread-safe (une connexion partagée protégée par un verrou).
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", max_entries: int = 1_000_000):
+        """
+        Args:
+            path: Fichier SQLite (créé si absent), ":memory:" pour un cache volatil
+            max_entries: Nombre maximum d'époques en cache (les moins
+                récemment utilisées sont évincées au-delà)
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS features (
+                namespace BLOB NOT NULL,
+                digest BLOB NOT NULL,
+                features BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (namespace, digest)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS features_last_used ON features (last_used);
+        """)
+        self._count, last_used = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM features"
+        ).fetchone()
+        self._tick = last_used
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_compute(self, namespace: bytes, X: np.ndarray,
+                       compute: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Features de X, lues en cache ou calculées (puis mises en cache).
+
+        Args:
+            namespace: Empreinte des paramètres de l'extracteur
+            X: Époques (N, L)
+            compute: Fonction (M, L) → (M, n_features) pour les époques absentes
+
+        Returns:
+            Array (N, n_features)
+        """
+        if len(X) == 0:
+            return compute(X)
+        digests = epoch_digests(X)
+        cached = self._get_many(namespace, digests)
+
+        missing = [i for i, d in enumerate(digests) if d not in cached]
+        with self._lock:
+            self._hits += len(digests) - len(missing)
+            self._misses += len(missing)
+
+        computed = {}
+        if missing:
+            values = compute(X[missing])
+            computed = {digests[i]: row for i, row in zip(missing, values)}
+            self._put_many(namespace, computed)
+
+        return np.vstack([cached[d] if d in cached else computed[d] for d in digests])
+
+    def _get_many(self, namespace: bytes, digests: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        unique = list(dict.fromkeys(digests))
+        with self._lock:
+            self._tick += 1
+            for start in range(0, len(unique), _SQL_CHUNK):
+                chunk = unique[start:start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT digest, features FROM features WHERE namespace = ? AND digest IN ({marks})",
+                    [namespace, *chunk]
+                ).fetchall()
+                found.update((d, np.frombuffer(f, dtype=np.float64)) for d, f in rows)
+                if rows:
+                    hit_marks = ",".join("?" * len(rows))
+                    self._conn.execute(
+                        f"UPDATE features SET last_used = ? WHERE namespace = ? AND digest IN ({hit_marks})",
+                        [self._tick, namespace, *(d for d, _ in rows)]
+                    )
+            self._conn.commit()
+        return found
+
+    def _put_many(self, namespace: bytes, entries: Dict[bytes, np.ndarray]):
+        with self._lock:
+            self._tick += 1
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO features (namespace, digest, features, last_used) VALUES (?, ?, ?, ?)",
+                [(namespace, d, np.asarray(f, dtype=np.float64).tobytes(), self._tick)
+                 for d, f in entries.items()]
+            )
+            self._count += self._conn.total_changes - before
+
+            excess = self._count - self.max_entries
+            if excess > 0:
+                # Éviction LRU : les entrées les moins récemment lues ou écrites
+                self._conn.execute(
+                    "DELETE FROM features WHERE (namespace, digest) IN "
+                    "(SELECT namespace, digest FROM features ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self._count -= excess
+                self._evictions += excess
+            self._conn.commit()
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM features")
+            self._conn.commit()
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_metrics(self) -> Dict:
+        """Compteurs du cache : entrées, hits, misses, taux de hit, évictions."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": self._count,
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions
+            }
+
+    def close(self):
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -8,7 +8,125 @@ Elle est utilisée dans le pipeline sklearn.
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
 from scipy import stats
-from scipy.signal import welch
+from scipy.signal import welch, get_window
+
+from app.digest import params_digest
+
+# Version du calcul des features : à incrémenter si les formules changent
+# (invalide les entrées du cache de features)
+FEATURES_VERSION = 1
+
+
+# Bandes de fréquence : (nom, borne basse, borne haute, borne haute incluse)
+FREQUENCY_BANDS = (
+    ('delta', 0.5, 4, False),   # Sommeil profond
+    ('theta', 4, 8, False),     # Somnolence
+    ('alpha', 8, 13, False),    # Relaxation
+    ('beta', 13, 30, False),    # Éveil actif
+    ('gamma', 30, 35, True),    # Cognition
+)
+
+
+class SpectralPlan:
+    """
+    Plan spectral précalculé pour un couple (fs, expected_len) donné.
+    
+    Reproduit `scipy.signal.welch(x, fs=fs, nperseg=256)` (fenêtre de Hann,
+    recouvrement 50 %, detrend constant, densité one-sided) sans reconstruire
+    à chaque appel la fenêtre, la grille de segments, les bins de fréquence
+    et les masques de bandes.
+    """
+    
+    def __init__(self, fs, expected_len, nperseg=256):
+        """
+        Parameters
+        ----------
+        fs : int
+            Fréquence d'échantillonnage (Hz)
+        expected_len : int
+            Longueur des époques
+        nperseg : int
+            Longueur des segments de Welch (tronquée à expected_len)
+        """
+        self.fs = fs
+        self.expected_len = expected_len
+        self.nperseg = min(nperseg, expected_len)
+        self.step = self.nperseg - self.nperseg // 2
+        self.n_segments = (expected_len - self.nperseg) // self.step + 1
+        
+        # Fenêtre et bins FFT
+        self.window = get_window('hann', self.nperseg)
+        self.freqs = np.fft.rfftfreq(self.nperseg, d=1.0 / fs)
+        
+        # Constantes de normalisation : densité + doublement one-sided
+        bin_weights = np.full(len(self.freqs), 2.0 / (fs * np.sum(self.window ** 2)))
+        bin_weights[0] /= 2
+        if self.nperseg % 2 == 0:
+            bin_weights[-1] /= 2
+        self.bin_weights = bin_weights
+        
+        # Bornes des bandes (bins contigus car freqs est croissant)
+        self.band_slices = []
+        for _, low, high, inclusive in FREQUENCY_BANDS:
+            mask = (self.freqs >= low) & ((self.freqs <= high) if inclusive else (self.freqs < high))
+            idx = np.flatnonzero(mask)
+            self.band_slices.append(slice(idx[0], idx[-1] + 1) if len(idx) else None)
+    
+    def matches(self, fs, expected_len):
+        """Vérifie que le plan correspond aux paramètres de l'extracteur."""
+        return self.fs == fs and self.expected_len == expected_len
+    
+    def psd(self, X):
+        """
+        Densité spectrale de Welch pour un batch d'époques.
+        
+        Parameters
+        ----------
+        X : array, shape (n_samples, expected_len)
+        
+        Returns
+        -------
+        psd : array, shape (n_samples, n_freqs)
+        """
+        segments = np.lib.stride_tricks.sliding_window_view(X, self.nperseg, axis=-1)
+        segments = segments[:, ::self.step][:, :self.n_segments]
+        return self.segment_powers(segments).mean(axis=1) * self.bin_weights
+    
+    def segment_powers(self, segments):
+        """
+        Périodogrammes non normalisés de segments de Welch.
+        
+        Parameters
+        ----------
+        segments : array, shape (..., nperseg)
+        
+        Returns
+        -------
+        power : array, shape (..., n_freqs)
+            |FFT|² du segment centré et fenêtré ; la moyenne sur les segments
+            multipliée par `bin_weights` donne la densité de Welch
+        """
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectrum = np.fft.rfft(segments * self.window, axis=-1)
+        return spectrum.real ** 2 + spectrum.imag ** 2
+    
+    def band_powers(self, X):
+        """
+        Puissance moyenne par bande (Delta, Theta, Alpha, Beta, Gamma).
+        
+        Returns
+        -------
+        powers : array, shape (n_samples, 5)
+        """
+        return self.band_powers_from_psd(self.psd(X))
+    
+    def band_powers_from_psd(self, psd):
+        """Puissance moyenne par bande à partir d'une densité (n_samples, n_freqs)."""
+        powers = np.zeros((psd.shape[0], len(self.band_slices)))
+        for j, band in enumerate(self.band_slices):
+            if band is not None:
+                powers[:, j] = psd[:, band].mean(axis=1)
+        return powers
 
 
 class FeatureExtractor(BaseEstimator, TransformerMixin):
@@ -38,9 +156,43 @@ class FeatureExtractor(BaseEstimator, TransformerMixin):
         self.expected_len = expected_len
     
     def fit(self, X, y=None):
-        """Fit ne fait rien, juste pour sklearn compatibility"""
+        """Fit construit le plan spectral (pas de paramètres appris)"""
+        self._spectral_plan = SpectralPlan(self.fs, self.expected_len)
+        return self
+    
+    def __getstate__(self):
+        # Le plan spectral est dérivé de (fs, expected_len) : inutile de le sérialiser ;
+        # le cache de features est une ressource locale, rattachée à l'exécution
+        state = super().__getstate__()
+        state.pop('_spectral_plan', None)
+        state.pop('_feature_cache', None)
+        return state
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._spectral_plan = SpectralPlan(self.fs, self.expected_len)
+    
+    def _get_spectral_plan(self):
+        """Retourne le plan spectral, reconstruit si absent ou obsolète (set_params)."""
+        plan = getattr(self, '_spectral_plan', None)
+        if plan is None or not plan.matches(self.fs, self.expected_len):
+            plan = SpectralPlan(self.fs, self.expected_len)
+            self._spectral_plan = plan
+        return plan
+    
+    def set_cache(self, cache):
+        """
+        Rattache un cache de features (`FeatureCache`, ou None pour le retirer).
+        
+        Le cache n'est pas sérialisé avec le pipeline.
+        """
+        self._feature_cache = cache
         return self
     
+    def cache_namespace(self) -> bytes:
+        """Empreinte des paramètres qui déterminent les features (clé du cache)."""
+        return params_digest(self.fs, self.expected_len, FREQUENCY_BANDS, FEATURES_VERSION)
+    
     def transform(self, X):
         """
         Transforme les signaux bruts en features.
@@ -55,7 +207,7 @@ class FeatureExtractor(BaseEstimator, TransformerMixin):
         features : array, shape (n_samples, 16)
             Features extraites
         """
-        X = np.asarray(X)
+        X = np.asarray(X, dtype=np.float64)
         
         # Valider shape
         if X.ndim != 2 or X.shape[1] != self.expected_len:
@@ -63,7 +215,21 @@ class FeatureExtractor(BaseEstimator, TransformerMixin):
                 f"X doit être (N, {self.expected_len}), reçu {X.shape}"
             )
         
-        # Extraire features pour chaque sample
+        # Époques déjà calculées lues dans le cache, s'il est rattaché
+        cache = getattr(self, '_feature_cache', None)
+        if cache is not None:
+            return cache.get_or_compute(self.cache_namespace(), X, self._compute_features)
+        return self._compute_features(X)
+    
+    def _compute_features(self, X):
+        """Calcule les features de X (N, expected_len) déjà validé."""
+        # Chemin vectorisé : toutes les époques en une seule passe
+        try:
+            return self._extract_features_batch(X)
+        except Exception as e:
+            print(f"⚠️ Erreur extraction vectorisée, repli époque par époque: {e}")
+        
+        # Repli : extraire features pour chaque sample
         features_list = []
         for i, signal in enumerate(X):
             try:
@@ -80,6 +246,61 @@ class FeatureExtractor(BaseEstimator, TransformerMixin):
         
         return features_array
     
+    def _extract_features_batch(self, X):
+        """
+        Extrait les 16 features de toutes les époques en une seule passe.
+        
+        Version vectorisée de `_extract_features_from_signal` : moments et
+        quantiles calculés par axe, un seul Welch batché via le plan
+        spectral précalculé (voir `SpectralPlan`).
+        Les valeurs sont identiques à celles du chemin époque par époque
+        à une tolérance relative de 1e-9 près (ordre des sommations).
+        
+        Parameters
+        ----------
+        X : array, shape (n_samples, expected_len)
+            Signaux EEG bruts
+        
+        Returns
+        -------
+        features : array, shape (n_samples, 16)
+            Features extraites
+        """
+        features = np.empty((X.shape[0], 16))
+        
+        # 1. Statistiques temporelles (8 features)
+        features[:, 0] = np.mean(X, axis=1)
+        features[:, 1] = np.std(X, axis=1)
+        features[:, 2] = np.min(X, axis=1)
+        features[:, 3] = np.max(X, axis=1)
+        features[:, 4:6] = np.percentile(X, [25, 75], axis=1).T
+        
+        # Moments centrés (équivalent à stats.skew / stats.kurtosis, bias=True)
+        centered = X - features[:, 0:1]
+        sq = centered * centered
+        m2 = np.mean(sq, axis=1)
+        m3 = np.mean(sq * centered, axis=1)
+        m4 = np.mean(sq * sq, axis=1)
+        with np.errstate(all='ignore'):
+            # Signal constant → NaN, comme scipy
+            constant = m2 <= (np.finfo(np.float64).resolution * features[:, 0]) ** 2
+            features[:, 6] = np.where(constant, np.nan, m3 / m2 ** 1.5)
+            features[:, 7] = np.where(constant, np.nan, m4 / m2 ** 2 - 3.0)
+        
+        # 2. Analyse spectrale : un seul Welch pour tout le batch,
+        #    fenêtre et bornes de bandes issues du plan précalculé
+        features[:, 8:13] = self._get_spectral_plan().band_powers(X)
+        
+        # 3. Ratios de puissance (3 features)
+        total_power = features[:, 8:13].sum(axis=1, keepdims=True)
+        features[:, 13:16] = np.divide(
+            features[:, 8:11], total_power,
+            out=np.zeros((X.shape[0], 3)),
+            where=total_power > 0
+        )
+        
+        return features
+    
     def _extract_features_from_signal(self, epoch):
         """
         Extrait 16 features d'une époque EEG.
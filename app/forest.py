@@ -0,0 +1,305 @@
+"""
+Moteur d'inférence RandomForest sur tableaux plats.
+
+`RandomForestClassifier.predict_proba` appelle chaque arbre un par un
+(dispatch Python/joblib) : pour une seule époque, le surcoût domine le
+calcul. `FlatForest` concatène les nœuds de tous les arbres dans des
+tableaux NumPy contigus (feature, seuil, enfants, probabilités des
+feuilles) et descend tous les arbres à la fois, niveau par niveau.
+
+Le StandardScaler est replié dans les seuils : chaque seuil est converti
+en seuil sur la feature brute, si bien que la normalisation disparaît à
+l'inférence. La conversion est exacte (voir `_fold_thresholds`) : les
+probabilités sont identiques bit à bit à celles de sklearn (n_jobs=1).
+
+Utilisation :
+    forest = FlatForest.from_pipeline(pipeline)   # [FeatureExtractor,] StandardScaler, RandomForest
+    probabilities = forest.predict_proba(features)  # (N, 16) → (N, 5)
+"""
+
+from typing import Dict, Optional
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.feature_extractor import FeatureExtractor
+
+# Masques des bits float64 (ordre total des flottants, voir `_float_keys`)
+_SIGN_BIT = np.int64(-2 ** 63)
+_MAGNITUDE = np.int64(2 ** 63 - 1)
+
+# Nombre d'échantillons descendus à la fois (borne la mémoire (arbres × chunk))
+_CHUNK_SIZE = 1024
+
+
+class FlatForest:
+    """
+    Forêt aplatie : les nœuds des T arbres dans des tableaux uniques.
+    
+    Les enfants sont des index globaux, rangés par paire
+    (`children[node] = (gauche, droite)`) : un seul accès mémoire par
+    niveau. Les feuilles ont la feature -1. `value` contient les
+    probabilités normalisées de chaque feuille, comme
+    `DecisionTreeClassifier.predict_proba`.
+    """
+    
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_left: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, classes: np.ndarray, max_depth: int):
+        """
+        Args:
+            feature: Index de la feature testée par nœud, -1 pour une feuille (n_nodes,)
+            threshold: Seuil sur la feature brute par nœud (n_nodes,) ; x <= seuil → gauche
+            children: Index globaux des enfants gauche et droit (n_nodes, 2)
+            missing_left: Nœuds où une valeur NaN part à gauche (n_nodes,)
+            value: Probabilités des classes par nœud (n_nodes, n_classes)
+            roots: Index de la racine de chaque arbre (n_trees,)
+            classes: Labels des classes (colonnes de `value`)
+            max_depth: Profondeur maximale des arbres
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+    
+    @classmethod
+    def from_pipeline(cls, pipeline: Pipeline) -> "FlatForest":
+        """
+        Aplatit la fin d'un pipeline : [FeatureExtractor,] [StandardScaler,] RandomForest.
+        
+        Le FeatureExtractor éventuel n'est pas inclus : la forêt prend les
+        features (N, 16) en entrée.
+        
+        Raises:
+            ValueError: Si les étapes ne sont pas de cette forme
+        """
+        steps = [step for _, step in pipeline.steps]
+        if steps and isinstance(steps[0], FeatureExtractor):
+            steps = steps[1:]
+        scaler = steps[0] if len(steps) == 2 else None
+        if (not steps or len(steps) > 2 or not isinstance(steps[-1], RandomForestClassifier)
+                or (len(steps) == 2 and not isinstance(scaler, StandardScaler))):
+            raise ValueError(
+                "Pipeline non supporté : attendu [FeatureExtractor,] [StandardScaler,] RandomForestClassifier, "
+                f"reçu {[type(step).__name__ for step in steps]}"
+            )
+        return cls.from_estimator(steps[-1], scaler)
+    
+    @classmethod
+    def from_estimator(cls, forest: RandomForestClassifier,
+                       scaler: Optional[StandardScaler] = None) -> "FlatForest":
+        """
+        Aplatit une RandomForest entraînée, en repliant le scaler dans les seuils.
+        
+        Args:
+            forest: RandomForestClassifier entraînée (une seule sortie)
+            scaler: StandardScaler appliqué avant la forêt, ou None
+        """
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Seules les forêts à une sortie sont supportées")
+        
+        n_features = forest.n_features_in_
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if scaler.mean_ is not None:
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if scaler.scale_ is not None:
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+        
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        n_nodes = int(offsets[-1])
+        
+        feature = np.full(n_nodes, -1, dtype=np.int32)
+        threshold = np.full(n_nodes, np.inf)
+        children = np.full((n_nodes, 2), -1, dtype=np.int32)
+        missing_left = np.zeros(n_nodes, dtype=bool)
+        value = np.empty((n_nodes, len(forest.classes_)))
+        
+        for tree, offset in zip(trees, offsets[:-1]):
+            nodes = slice(offset, offset + tree.node_count)
+            split = tree.children_left != -1
+            feature[nodes][split] = tree.feature[split]
+            threshold[nodes][split] = tree.threshold[split]
+            children[nodes, 0][split] = tree.children_left[split] + offset
+            children[nodes, 1][split] = tree.children_right[split] + offset
+            if hasattr(tree, "missing_go_to_left"):
+                missing_left[nodes] = np.asarray(tree.missing_go_to_left, dtype=bool)
+            
+            # sklearn >= 1.4 stocke des fractions, utilisées telles quelles par
+            # predict_proba ; les versions antérieures stockent des effectifs
+            # et les normalisent
+            proba = tree.value[:, 0, :len(forest.classes_)]
+            normalizer = proba.sum(axis=1)
+            normalizer[(normalizer == 0.0) | (np.abs(normalizer - 1.0) < 1e-9)] = 1.0
+            value[nodes] = proba / normalizer[:, None]
+        
+        split = feature >= 0
+        threshold[split] = _fold_thresholds(threshold[split], mean[feature[split]], scale[feature[split]])
+        
+        return cls(
+            feature=feature, threshold=threshold, children=children,
+            missing_left=missing_left, value=value,
+            roots=offsets[:-1].astype(np.int32), classes=forest.classes_,
+            max_depth=max(tree.max_depth for tree in trees)
+        )
+    
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+    
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+    
+    @property
+    def nbytes(self) -> int:
+        """Taille des tableaux (octets)."""
+        return sum(array.nbytes for array in self.arrays().values())
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Tableaux de la forêt (sérialisation)."""
+        return {
+            "feature": self.feature, "threshold": self.threshold,
+            "children": self.children, "missing_left": self.missing_left,
+            "value": self.value, "roots": self.roots, "classes": self.classes_,
+            "max_depth": np.array([self.max_depth])
+        }
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "FlatForest":
+        """Reconstruit une forêt depuis `arrays()` (tableaux éventuellement mappés en mémoire)."""
+        return cls(**{name: arrays[name] for name in (
+            "feature", "threshold", "children", "missing_left", "value", "roots", "classes"
+        )}, max_depth=int(arrays["max_depth"][0]))
+    
+    def compact_dtypes(self) -> "FlatForest":
+        """
+        Copie aux types réduits : seuils et probabilités en float32, features en int8.
+        
+        Chaque seuil est arrondi au plus grand float32 qui ne le dépasse pas :
+        seules les valeurs comprises entre les deux seuils changent de
+        branche. Les index des nœuds restent en int32. Les prédictions ne
+        sont plus identiques bit à bit à sklearn.
+        """
+        threshold = self.threshold.astype(np.float32)
+        above = threshold.astype(np.float64) > self.threshold
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        feature_dtype = np.int8 if self.feature.max(initial=0) < 128 else np.int16
+        return FlatForest(
+            feature=self.feature.astype(feature_dtype), threshold=threshold,
+            children=self.children.astype(np.int32), missing_left=self.missing_left,
+            value=self.value.astype(np.float32), roots=self.roots.astype(np.int32),
+            classes=self.classes_, max_depth=self.max_depth
+        )
+    
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Feuille atteinte dans chaque arbre.
+        
+        Args:
+            X: Features brutes (N, n_features), non normalisées
+        
+        Returns:
+            Index globaux des feuilles (n_trees, N)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        has_nan = bool(np.isnan(flat_X).any())
+        children = self.children.ravel()
+        
+        # Un parcours par couple (arbre, échantillon) ; seuls les parcours
+        # pas encore arrivés sur une feuille sont avancés à chaque niveau
+        nodes = np.repeat(self.roots, n_samples).astype(np.int32)
+        offsets = np.tile(np.arange(n_samples, dtype=np.int32) * n_features, self.n_trees)
+        active = np.arange(len(nodes), dtype=np.int32)
+        current = nodes
+        
+        while True:
+            features = self.feature[current]
+            internal = features >= 0
+            if not internal.all():
+                active, current, features = active[internal], current[internal], features[internal]
+                if not active.size:
+                    break
+            values = flat_X[offsets[active] + features]
+            go_right = ~(values <= self.threshold[current])
+            if has_nan:
+                go_right &= ~(np.isnan(values) & self.missing_left[current])
+            current = children[2 * current + go_right]
+            nodes[active] = current
+        return nodes.reshape(self.n_trees, n_samples)
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Probabilités des classes, moyenne des arbres (même ordre de sommation que sklearn).
+        
+        Args:
+            X: Features brutes (N, n_features), non normalisées
+        
+        Returns:
+            Array (N, n_classes), colonnes dans l'ordre de `classes_`
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2:
+            raise ValueError(f"X doit être 2D (N, n_features), reçu {X.shape}")
+        
+        probabilities = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), _CHUNK_SIZE):
+            leaves = self.apply(X[start:start + _CHUNK_SIZE])
+            # Somme arbre par arbre sur l'axe 0, comme l'accumulation de sklearn
+            probabilities[start:start + _CHUNK_SIZE] = self.value[leaves].sum(axis=0)
+        probabilities /= self.n_trees
+        return probabilities
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classes prédites (argmax des probabilités)."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _float_keys(x: np.ndarray) -> np.ndarray:
+    """Flottants float64 → entiers int64 de même ordre (-0.0 et +0.0 confondus)."""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, -(bits & _MAGNITUDE), bits)
+
+
+def _keys_to_float(keys: np.ndarray) -> np.ndarray:
+    """Inverse de `_float_keys`."""
+    bits = np.where(keys < 0, (-keys) | _SIGN_BIT, keys)
+    return bits.view(np.float64)
+
+
+def _fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Convertit des seuils sur features normalisées en seuils sur features brutes.
+    
+    sklearn teste `float32((x - mean) / scale) <= seuil` (le scaler calcule en
+    float64, la forêt convertit en float32). Cette fonction de x est croissante :
+    le test équivaut à `x <= T`, où T est le plus grand float64 qui le vérifie.
+    T est trouvé par dichotomie sur l'ordre des float64 (64 itérations au plus,
+    vectorisées sur tous les nœuds) : le repli est exact, sans erreur d'arrondi.
+    """
+    def passes(keys):
+        x = _keys_to_float(keys)
+        with np.errstate(over="ignore", invalid="ignore"):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+    
+    # Invariant : passes(low) vrai (-inf), passes(high) faux (+inf)
+    low = np.full(len(threshold), _float_keys(np.array([-np.inf]))[0])
+    high = np.full(len(threshold), _float_keys(np.array([np.inf]))[0])
+    while True:
+        open_ = high > low + 1
+        if not open_.any():
+            break
+        middle = (low >> 1) + (high >> 1) + (low & high & 1)
+        ok = passes(middle)
+        low = np.where(open_ & ok, middle, low)
+        high = np.where(open_ & ~ok, middle, high)
+    return _keys_to_float(low)
@@ -0,0 +1,230 @@
+"""
+Exécution de l'inférence hors de la boucle asyncio.
+
+Les appels au pipeline sklearn (et l'écriture des logs de monitoring)
+sont CPU-bound et synchrones : exécutés directement dans un endpoint
+`async def`, ils bloquent la boucle d'événements d'uvicorn et font
+attendre `/health` et `/monitoring/*`. Ce module les délègue à un pool
+de threads borné, avec une file d'attente limitée (backpressure).
+
+`MicroBatcher` regroupe en plus les requêtes mono-époque concurrentes
+en un seul appel matriciel au modèle (coût fixe par appel amorti).
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(RuntimeError):
+    """Trop de requêtes d'inférence en attente : la requête est rejetée."""
+
+
+class InferenceExecutor:
+    """
+    Pool de threads borné pour l'inférence, avec limite de requêtes en attente.
+    
+    Au-delà de `max_pending` jobs en cours ou en file, `run` lève
+    `InferenceQueueFull` immédiatement au lieu d'empiler les requêtes
+    (l'API répond alors 503 avec un header Retry-After).
+    """
+    
+    def __init__(self, max_workers: int = 2, max_pending: int = 64):
+        """
+        Args:
+            max_workers: Nombre de threads d'inférence
+            max_pending: Nombre maximum de jobs en cours + en attente
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Crée le pool à la première utilisation."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+        return self._pool
+    
+    def _on_done(self, _future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+    
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Exécute `fn(*args, **kwargs)` dans le pool et attend son résultat.
+        
+        Raises:
+            InferenceQueueFull: Si `max_pending` jobs sont déjà en cours ou en attente
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise InferenceQueueFull(
+                    f"File d'inférence pleine ({self.max_pending} requêtes en attente)"
+                )
+            self._pending += 1
+        
+        try:
+            future = self._get_pool().submit(functools.partial(fn, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Décrémenté à la fin du job (et non de l'await) pour compter aussi
+        # les jobs dont le client s'est déconnecté
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+    
+    def get_metrics(self) -> Dict:
+        """Métriques du pool d'inférence."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
+    
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool (attend la fin des jobs en cours si `wait`)."""
+        if self._pool is not None:
+            logger.info("🛑 Arrêt du pool d'inférence...")
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes mono-époque concurrentes en un seul batch.
+    
+    La première requête d'un batch ouvre une fenêtre de `max_wait_ms` ;
+    les requêtes qui arrivent pendant ce temps sont ajoutées au batch,
+    qui part dès qu'il atteint `max_batch_size` lignes ou que la fenêtre
+    expire. Le batch est exécuté comme une seule matrice dans
+    l'`InferenceExecutor`, puis chaque résultat est renvoyé à sa requête.
+    """
+    
+    def __init__(self, executor: InferenceExecutor, fn: Callable,
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Args:
+            executor: Pool d'inférence dans lequel exécuter les batchs
+            fn: Fonction batch `fn(rows, contexts) -> list`, un résultat par ligne,
+                où `rows` est une matrice (N, 3000) et `contexts` la liste des
+                contextes passés à `submit`
+            max_batch_size: Nombre maximum de lignes par batch
+            max_wait_ms: Attente maximale avant d'envoyer un batch incomplet
+        """
+        self.executor = executor
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = []
+        self._full = None
+        self._tasks = set()
+        
+        # Métriques
+        self._n_batches = 0
+        self._n_rows = 0
+        self._size_histogram = {}
+        self._total_delay = 0.0
+        self._max_delay = 0.0
+    
+    async def submit(self, row: np.ndarray, context: Any = None):
+        """
+        Ajoute une ligne au batch courant et attend son résultat.
+        
+        Args:
+            row: Signal d'une époque, shape (3000,) ou (1, 3000)
+            context: Donnée propre à la requête, transmise à `fn`
+        
+        Raises:
+            Toute exception levée par `fn` ou `InferenceQueueFull`
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((row, context, future, time.perf_counter()))
+        
+        if len(self._queue) == 1:
+            self._start_collector()
+        elif len(self._queue) >= self.max_batch_size:
+            self._full.set()
+        
+        return await future
+    
+    def _start_collector(self):
+        """Ouvre une nouvelle fenêtre de collecte pour le batch en tête de file."""
+        self._full = asyncio.Event()
+        if len(self._queue) >= self.max_batch_size:
+            self._full.set()
+        task = asyncio.ensure_future(self._collect_and_run(self._full))
+        # Garder une référence tant que la tâche tourne
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _collect_and_run(self, full: asyncio.Event):
+        try:
+            await asyncio.wait_for(full.wait(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            pass
+        
+        batch = self._queue[:self.max_batch_size]
+        self._queue = self._queue[self.max_batch_size:]
+        if self._queue:
+            # Surplus arrivé avant le départ du batch : nouvelle fenêtre
+            self._start_collector()
+        
+        rows, contexts, futures, enqueued = zip(*batch)
+        self._record(len(batch), time.perf_counter(), enqueued)
+        
+        try:
+            results = await self.executor.run(
+                self.fn, np.vstack(rows), list(contexts)
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def _record(self, size: int, now: float, enqueued: List[float]):
+        """Met à jour les métriques de taille de batch et d'attente."""
+        delays = [now - t for t in enqueued]
+        self._n_batches += 1
+        self._n_rows += size
+        self._size_histogram[size] = self._size_histogram.get(size, 0) + 1
+        self._total_delay += sum(delays)
+        self._max_delay = max(self._max_delay, max(delays))
+    
+    def get_metrics(self) -> Dict:
+        """Métriques de micro-batching : taille des batchs et délai en file."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self._n_batches,
+            "rows": self._n_rows,
+            "avg_batch_size": self._n_rows / self._n_batches if self._n_batches else 0,
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+            "avg_queue_delay_ms": self._total_delay / self._n_rows * 1000 if self._n_rows else 0,
+            "max_queue_delay_ms": self._max_delay * 1000
+        }
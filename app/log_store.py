@@ -0,0 +1,277 @@
+"""
+Stockage append-only des logs de prédiction (JSON Lines).
+
+- Lecture des N derniers enregistrements en lisant le fichier à rebours
+  par blocs depuis la fin : le coût dépend de N, pas de la taille du fichier.
+- Rotation par taille et/ou par durée (`predictions.jsonl` → `.1` → `.2` ...),
+  transparente pour les lectures de fin de fichier.
+- Écriture asynchrone (`BufferedLogWriter`) : file bornée vidée par un
+  thread de fond, hors du chemin des requêtes.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus à rebours depuis la fin du fichier
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class JsonlLogStore:
+    """Fichier JSONL append-only avec lecture de fin en O(N) et rotation."""
+    
+    def __init__(self,
+                 path: str,
+                 max_bytes: Optional[int] = 50 * 1024 * 1024,
+                 rotate_interval: Optional[float] = None,
+                 backup_count: int = 5):
+        """
+        Args:
+            path: Chemin du fichier courant
+            max_bytes: Taille déclenchant une rotation (None = pas de rotation par taille)
+            rotate_interval: Durée en secondes déclenchant une rotation, comptée depuis
+                l'ouverture du store ou la dernière rotation (None = pas de rotation par durée)
+            backup_count: Nombre de fichiers archivés conservés (`.1` ... `.N`)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self._period_start = time.time()
+        self._lock = threading.Lock()
+    
+    def files(self) -> List[Path]:
+        """Fichiers existants, du plus récent (courant) au plus ancien."""
+        candidates = [self.path] + [self._backup_path(i) for i in range(1, self.backup_count + 1)]
+        return [p for p in candidates if p.exists()]
+    
+    def append(self, lines: List[str]):
+        """Ajoute des lignes (sans '\\n') en une seule écriture, après rotation éventuelle."""
+        if not lines:
+            return
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+        with self._lock:
+            if self._should_rotate(len(data)):
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+    
+    def tail(self, n: int) -> List[str]:
+        """Retourne les N dernières lignes, en remontant dans les archives si nécessaire."""
+        if n <= 0:
+            return []
+        lines = []
+        with self._lock:
+            for path in self.files():
+                lines = self._tail_file(path, n - len(lines)) + lines
+                if len(lines) >= n:
+                    break
+        return lines
+    
+    def _backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+    
+    def _should_rotate(self, incoming: int) -> bool:
+        if self.rotate_interval is not None and time.time() - self._period_start >= self.rotate_interval:
+            return self.path.exists()
+        if self.max_bytes is not None and self.path.exists():
+            size = self.path.stat().st_size
+            return size > 0 and size + incoming > self.max_bytes
+        return False
+    
+    def _rotate(self):
+        """predictions.jsonl → .1, .1 → .2, ... ; la plus ancienne archive est supprimée."""
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+        else:
+            self._backup_path(self.backup_count).unlink(missing_ok=True)
+            for i in range(self.backup_count - 1, 0, -1):
+                if self._backup_path(i).exists():
+                    os.replace(self._backup_path(i), self._backup_path(i + 1))
+            if self.path.exists():
+                os.replace(self.path, self._backup_path(1))
+        self._period_start = time.time()
+        logger.info(f"🔄 Rotation des logs : {self.path}")
+    
+    @staticmethod
+    def _tail_file(path: Path, n: int) -> List[str]:
+        """Lit les N dernières lignes non vides d'un fichier, à rebours par blocs."""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b''
+            # N lignes complètes = N+1 séparateurs (ou début du fichier atteint)
+            while position > 0 and buffer.count(b'\n') <= n:
+                size = min(TAIL_BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                buffer = f.read(size) + buffer
+        
+        lines = buffer.split(b'\n')
+        if position > 0:
+            lines = lines[1:]  # première ligne potentiellement tronquée
+        lines = [line.decode('utf-8') for line in lines if line.strip()]
+        return lines[-n:]
+
+
+class _Flush:
+    """Message de contrôle : écrire le batch courant puis signaler l'événement."""
+    
+    def __init__(self, stop: bool = False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class BufferedLogWriter:
+    """
+    Écrivain de logs en arrière-plan pour un `JsonlLogStore`.
+    
+    Les lignes passent par une file bornée ; un thread de fond les écrit
+    par batchs, dès que `batch_size` lignes sont en attente ou que
+    `flush_interval` secondes se sont écoulées depuis la première ligne
+    du batch. Si la file est pleine, les lignes sont abandonnées (et
+    comptées) plutôt que de bloquer la requête.
+    """
+    
+    def __init__(self, store: JsonlLogStore, max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        """
+        Args:
+            store: Store dans lequel écrire
+            max_queue: Nombre maximum de lignes en attente
+            batch_size: Nombre de lignes déclenchant une écriture
+            flush_interval: Délai maximum (s) avant écriture d'un batch incomplet
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self._flushed = 0
+        self._dropped = 0
+        self._batches = 0
+        self._errors = 0
+    
+    def submit(self, lines: List[str]) -> int:
+        """
+        Met des lignes en file d'écriture, sans bloquer.
+        
+        Returns:
+            Nombre de lignes acceptées (les autres sont comptées comme abandonnées)
+        """
+        self._ensure_started()
+        accepted = 0
+        for line in lines:
+            try:
+                self._queue.put_nowait(line)
+                accepted += 1
+            except queue.Full:
+                break
+        if accepted < len(lines):
+            self._count(dropped=len(lines) - accepted)
+        return accepted
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Attend que les lignes déjà soumises soient écrites."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        message = _Flush()
+        try:
+            self._queue.put(message, timeout=timeout)
+        except queue.Full:
+            return False
+        return message.done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """
+        Écrit les lignes en attente et arrête le thread (idempotent).
+        
+        L'écrivain reste utilisable : un `submit` ultérieur relance le thread
+        (ex. lifespan exécuté plusieurs fois dans le même processus).
+        """
+        with self._start_lock:
+            if self._thread is None:
+                return
+            if self._thread.is_alive():
+                message = _Flush(stop=True)
+                try:
+                    self._queue.put(message, timeout=timeout)
+                    self._thread.join(timeout)
+                except queue.Full:
+                    logger.error("File de logs pleine à l'arrêt : lignes en attente perdues")
+            self._thread = None
+            atexit.unregister(self.close)
+    
+    def get_metrics(self) -> Dict:
+        """Compteurs de l'écrivain : lignes écrites, abandonnées, en attente."""
+        with self._counters_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "flushed": self._flushed,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "errors": self._errors
+            }
+    
+    def _count(self, flushed: int = 0, dropped: int = 0, batches: int = 0, errors: int = 0):
+        with self._counters_lock:
+            self._flushed += flushed
+            self._dropped += dropped
+            self._batches += batches
+            self._errors += errors
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="log-writer", daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.close)
+    
+    def _write(self, batch: List[str]):
+        try:
+            self.store.append(batch)
+            self._count(flushed=len(batch), batches=1)
+        except Exception as e:
+            self._count(dropped=len(batch), errors=1)
+            logger.error(f"Erreur lors de l'écriture des logs : {e}")
+    
+    def _run(self):
+        """Boucle du thread de fond : regroupe les lignes et les écrit par batchs."""
+        while True:
+            batch = []
+            control = None
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if isinstance(item, _Flush):
+                    control = item
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            
+            if batch:
+                self._write(batch)
+            if control is not None:
+                control.done.set()
+                if control.stop:
+                    return
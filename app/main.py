@@ -4,12 +4,18 @@ API FastAPI pour la classification de stades de sommeil.
 Cette API expose le modèle SleepAI via des endpoints REST.
 """
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
 from contextlib import asynccontextmanager
 from pathlib import Path
 import numpy as np
+import json
 import logging
+import os
 from app.monitoring import SimpleMonitor
 import time
 
@@ -19,10 +25,24 @@ monitor = SimpleMonitor()
 from app.models import (
     PredictionRequest,
     PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
     HealthResponse,
-    ModelInfoResponse
+    ModelInfoResponse,
+    ModelLoadRequest,
+    MAX_BATCH_SIZE,
+    BATCH_TOO_LARGE
 )
 from app.ml_model import SleepStageClassifier
+from app.inference import InferenceExecutor, InferenceQueueFull, MicroBatcher
+from app.signal_codec import (
+    decode_signals, max_payload_size, UnsupportedContentType, OCTET_STREAM, BASE64, NPY
+)
+from app.recording import EpochAssembler, HypnogramSmoothing, hypnogram_entries
+from app.smoothing import HypnogramSmoother
+from app.streaming import LiveScorer
+from app.prediction_cache import PredictionCache
+from app.registry import ModelRegistry, ModelLoadInProgress
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -33,7 +53,67 @@ model: SleepStageClassifier = None
 
 # Chemin absolu du modèle
 PROJECT_ROOT = Path(__file__).parent.parent  # Remonte de app/ vers sleepai/
-MODEL_PATH = PROJECT_ROOT / "models" / "rf_v2_final_pipeline.joblib"
+# Moteur d'inférence : 'sklearn', 'flat' (forêt aplatie, voir app/forest.py),
+# 'cnn' (CNN_RegularizedLight exécuté en NumPy, voir app/cnn.py) ou 'ensemble'
+# (configuration JSON de plusieurs modèles, voir app/ensemble.py)
+MODEL_BACKEND = os.getenv("SLEEPAI_MODEL_BACKEND", "sklearn")
+
+# Pipeline .joblib, dossier d'artefact mappable en mémoire (export_model_artifact.py),
+# ou CNN exporté en .npz (export_cnn.py) pour le backend 'cnn'
+CNN_MODEL_PATH = PROJECT_ROOT / "notebooks" / "models" / "cnn_regularizedlight_20251015_202037" / "cnn_model.npz"
+MODEL_PATH = Path(os.getenv(
+    "SLEEPAI_MODEL_PATH",
+    CNN_MODEL_PATH if MODEL_BACKEND == "cnn" else PROJECT_ROOT / "models" / "rf_v2_final_pipeline.joblib"
+))
+
+# Nombre d'époques prédites à la fois sur /predict/recording (borne la mémoire)
+RECORDING_BATCH_SIZE = int(os.getenv("SLEEPAI_RECORDING_BATCH_SIZE", "256"))
+
+# Lissage HMM de l'hypnogramme (/predict/recording?smooth=true) : transitions
+# apprises par fit_transitions.py, retard du décodage en flux (époques)
+TRANSITIONS_PATH = Path(os.getenv("SLEEPAI_TRANSITIONS_PATH", PROJECT_ROOT / "models" / "hypnogram_transitions.json"))
+SMOOTHING_LAG = int(os.getenv("SLEEPAI_SMOOTHING_LAG", "20"))
+smoother: HypnogramSmoother = None
+
+# Estimation en direct (/ws/live) : pas par défaut entre deux fenêtres de 30 s
+# (points, multiple de 128 = pas de Welch ; 256 = 2.56 s à 100Hz)
+LIVE_HOP = int(os.getenv("SLEEPAI_LIVE_HOP", "256"))
+
+# Cache LRU des prédictions d'époques identiques sur /predict et /predict/raw
+# (0 = désactivé, par défaut), TTL en secondes
+PREDICTION_CACHE_SIZE = int(os.getenv("SLEEPAI_PREDICTION_CACHE_SIZE", "0"))
+prediction_cache = PredictionCache(
+    capacity=PREDICTION_CACHE_SIZE,
+    ttl=float(os.getenv("SLEEPAI_PREDICTION_CACHE_TTL", "600"))
+) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Dossiers scannés par le registre des modèles (séparés par os.pathsep)
+MODEL_DIRS = [Path(p) for p in os.getenv(
+    "SLEEPAI_MODEL_DIRS",
+    os.pathsep.join([str(PROJECT_ROOT / "models"), str(PROJECT_ROOT / "notebooks" / "models")])
+).split(os.pathsep) if p]
+
+
+def _set_model(classifier: SleepStageClassifier):
+    """Remplace le modèle actif (appelé par le registre après préchauffage)."""
+    global model
+    model = classifier
+
+
+# Registre : liste des modèles, chargement en arrière-plan et changement à chaud
+registry = ModelRegistry(
+    MODEL_DIRS,
+    on_swap=_set_model,
+    prediction_cache=prediction_cache,
+    warmup_epochs=int(os.getenv("SLEEPAI_WARMUP_EPOCHS", "32")),
+    base_dir=PROJECT_ROOT
+)
+
+# Pool d'inférence : threads et nombre max de requêtes en attente (au-delà → 503)
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv("SLEEPAI_INFERENCE_WORKERS", "2")),
+    max_pending=int(os.getenv("SLEEPAI_INFERENCE_MAX_PENDING", "64"))
+)
 
 
 @asynccontextmanager
@@ -41,25 +121,34 @@ async def lifespan(app: FastAPI):
     """
     Gestionnaire de cycle de vie de l'application.
     
-    - startup: Charge le modèle au démarrage
+    - startup: Charge et préchauffe le modèle au démarrage
     - shutdown: Nettoyage (si nécessaire)
     """
     # Startup: Charger le modèle
-    global model
+    global smoother
     logger.info("🚀 Démarrage de l'API SleepAI...")
     logger.info(f"📂 Chemin du modèle : {MODEL_PATH}")
     
     try:
-        model = SleepStageClassifier(model_path=str(MODEL_PATH))
+        registry.load(MODEL_PATH, MODEL_BACKEND)
         logger.info("✅ Modèle chargé avec succès")
     except Exception as e:
         logger.error(f"❌ Erreur au chargement du modèle: {e}")
         raise
     
+    if TRANSITIONS_PATH.is_file():
+        smoother = HypnogramSmoother.load(TRANSITIONS_PATH)
+        logger.info(f"✅ Lissage HMM : transitions {TRANSITIONS_PATH}")
+    else:
+        logger.warning(f"⚠️ Pas de matrice de transition ({TRANSITIONS_PATH}) : lissage désactivé")
+    
     yield  # L'API tourne ici
     
     # Shutdown: Nettoyage
     logger.info("🛑 Arrêt de l'API SleepAI...")
+    registry.shutdown(wait=True)
+    inference_executor.shutdown(wait=True)
+    monitor.close()
 
 
 # Créer l'application FastAPI
@@ -91,6 +180,21 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    Erreurs de validation : 413 pour un batch trop grand (rejeté par
+    BatchPredictionRequest avant la validation des époques), 422 sinon.
+    """
+    for error in exc.errors():
+        if error["type"] == BATCH_TOO_LARGE:
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": error["msg"]}
+            )
+    return await request_validation_exception_handler(request, exc)
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """
@@ -103,10 +207,16 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "prediction": "/predict",
+            "prediction_batch": "/predict/batch",
+            "prediction_raw": "/predict/raw",
+            "prediction_batch_raw": "/predict/batch/raw",
+            "prediction_recording": "/predict/recording",
+            "live_stream": "/ws/live",
             "health": "/health",
             "model_info": "/model-info",
             "monitoring_stats": "/monitoring/stats",
             "monitoring_drift": "/monitoring/drift",
+            "monitoring_inference": "/monitoring/inference",
             "documentation": "/docs"
         }
     }
@@ -177,30 +287,252 @@ async def predict_sleep_stage(request: PredictionRequest):
         )
     
     try:
-        # Convertir la liste en array numpy
-        signal_array = np.array(request.signal).reshape(1, -1)
+        # Signal déjà converti et validé par PredictionRequest ;
+        # regroupé avec les requêtes concurrentes, inférence + log hors de la boucle asyncio
+        return await micro_batcher.submit(request.signal_array, start_time)
         
-        # Faire la prédiction
-        predicted_class, predicted_index, confidence, probabilities = model.predict(signal_array)
-        
-        # Logger la prédiction
-        processing_time = (time.time() - start_time) * 1000  # en ms
-        monitor.log_prediction(
-            signal=request.signal,
-            prediction=predicted_class,
-            confidence=confidence,
-            probabilities=probabilities,
-            processing_time=processing_time
+    except InferenceQueueFull as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: {str(e)}"
         )
-        
-        # Retourner la réponse
-        return PredictionResponse(
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne: {str(e)}"
+        )
+
+
+def _predict_coalesced(signals_array: np.ndarray, start_times: list) -> list:
+    """
+    Prédit un micro-batch de requêtes /predict et logge chaque prédiction.
+    
+    Appelée par le MicroBatcher avec les époques empilées (N, 3000) et
+    l'heure de début de chaque requête ; retourne une réponse par requête.
+    """
+    # Une seule prédiction vectorisée pour toutes les requêtes regroupées
+    # (requêtes unitaires : cache de prédictions utilisé s'il est activé)
+    results, features = model.predict_batch(signals_array, return_features=True, use_cache=True)
+    
+    # Logger les prédictions (temps de traitement propre à chaque requête)
+    now = time.time()
+    predicted_classes, _, confidences, probabilities = zip(*results)
+    monitor.log_predictions(
+        signals=signals_array,
+        predictions=list(predicted_classes),
+        confidences=list(confidences),
+        probabilities=list(probabilities),
+        processing_time=[(now - start_time) * 1000 for start_time in start_times],  # en ms
+        features=features
+    )
+    
+    return [
+        PredictionResponse(
             predicted_class=predicted_class,
             predicted_index=predicted_index,
             confidence=confidence,
-            probabilities=probabilities
+            probabilities=probas
         )
+        for predicted_class, predicted_index, confidence, probas in results
+    ]
+
+
+# Micro-batching des requêtes mono-époque (/predict, /predict/raw)
+micro_batcher = MicroBatcher(
+    inference_executor,
+    _predict_coalesced,
+    max_batch_size=int(os.getenv("SLEEPAI_MICROBATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.getenv("SLEEPAI_MICROBATCH_WAIT_MS", "2"))
+)
+
+
+def _overloaded(error: InferenceQueueFull) -> HTTPException:
+    """Réponse 503 quand la file d'inférence est pleine (backpressure)."""
+    logger.warning(f"⚠️ Requête rejetée: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Serveur surchargé: {str(error)}",
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse, tags=["Prediction"])
+async def predict_sleep_stage_batch(request: BatchPredictionRequest):
+    """
+    Prédit les stades de sommeil de plusieurs époques EEG en une seule requête.
+    
+    ## Input
+    
+    - **signals**: Liste d'époques de 3000 valeurs numériques (30s à 100Hz)
+      (au plus `SLEEPAI_MAX_BATCH_SIZE` époques, 1024 par défaut)
+    
+    ## Output
+    
+    - **predictions**: Une prédiction par époque, dans l'ordre d'envoi
+    - **n_epochs**: Nombre d'époques prédites
+    - **processing_time_ms**: Temps de traitement total (ms)
+    """
+    start_time = time.time()
+    
+    # Vérifier que le modèle est chargé
+    if model is None or not model.is_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modèle non chargé. Veuillez redémarrer le serveur."
+        )
+    
+    try:
+        # Époques déjà converties et validées par BatchPredictionRequest
+        # (taille du batch bornée avant validation, 413 au-delà de MAX_BATCH_SIZE)
+        return await inference_executor.run(_predict_batch, request.signals_array, start_time)
         
+    except InferenceQueueFull as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne: {str(e)}"
+        )
+
+
+def _predict_batch(signals_array: np.ndarray, start_time: float) -> BatchPredictionResponse:
+    """Prédit un batch (N, 3000), logge les prédictions et construit la réponse."""
+    # Une seule prédiction vectorisée pour tout le batch
+    classifier = model
+    results, features = classifier.predict_batch(signals_array, return_features=True)
+    
+    # Logger toutes les prédictions en une seule écriture
+    processing_time = (time.time() - start_time) * 1000  # en ms
+    predicted_classes, _, confidences, probabilities = zip(*results)
+    monitor.log_predictions(
+        signals=signals_array,
+        predictions=list(predicted_classes),
+        confidences=list(confidences),
+        probabilities=list(probabilities),
+        processing_time=processing_time / len(results),
+        features=features
+    )
+    
+    return BatchPredictionResponse(
+        predictions=[
+            PredictionResponse(
+                predicted_class=predicted_class,
+                predicted_index=predicted_index,
+                confidence=confidence,
+                probabilities=probas
+            )
+            for predicted_class, predicted_index, confidence, probas in results
+        ],
+        n_epochs=len(results),
+        processing_time_ms=processing_time,
+        timings=classifier.get_last_timings()
+    )
+
+
+# Schéma OpenAPI du corps binaire (non déclaré via Pydantic)
+BINARY_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            OCTET_STREAM: {"schema": {"type": "string", "format": "binary"}},
+            BASE64: {"schema": {"type": "string", "format": "byte"}},
+            NPY: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+async def _decode_binary_request(request: Request, dtype: str,
+                                 max_epochs: int = None) -> np.ndarray:
+    """
+    Lit le corps binaire et le décode en matrice (N, 3000).
+    
+    Avec `max_epochs`, un corps plus grand que `max_epochs` époques est rejeté
+    (413) dès le Content-Length ou au fil de la lecture, avant décodage.
+    """
+    content_type = request.headers.get("content-type", "")
+    if max_epochs is None:
+        body = await request.body()
+    else:
+        max_size = max_payload_size(content_type, dtype, max_epochs)
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_size:
+            raise _payload_too_large(max_epochs)
+        chunks, size = [], 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_size:
+                raise _payload_too_large(max_epochs)
+            chunks.append(chunk)
+        body = b"".join(chunks)
+    
+    try:
+        return decode_signals(body, content_type, dtype=dtype)
+    except UnsupportedContentType as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: {str(e)}"
+        )
+
+
+def _payload_too_large(max_epochs: int) -> HTTPException:
+    """Réponse 413 pour un corps binaire de plus de `max_epochs` époques."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch trop grand: plus de {max_epochs} époques"
+    )
+
+
+@app.post("/predict/raw", response_model=PredictionResponse, tags=["Prediction"],
+          openapi_extra=BINARY_BODY_OPENAPI)
+async def predict_sleep_stage_raw(request: Request, dtype: str = "float32"):
+    """
+    Prédit le stade de sommeil à partir d'un signal EEG binaire.
+    
+    Même résultat que `/predict`, sans parsing JSON des 3000 valeurs.
+    
+    ## Input (Content-Type)
+    
+    - **application/octet-stream**: 3000 flottants little-endian bruts
+    - **application/base64**: les mêmes octets encodés en base64
+    - **application/x-npy**: fichier `.npy` (`np.save`)
+    - **dtype** (query): `float32` (défaut) ou `float64` pour les deux premiers formats
+    """
+    start_time = time.time()
+    
+    # Vérifier que le modèle est chargé
+    if model is None or not model.is_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modèle non chargé. Veuillez redémarrer le serveur."
+        )
+    
+    # Corps de plus d'une époque rejeté (413) avant lecture complète et décodage
+    signals_array = await _decode_binary_request(request, dtype, max_epochs=1)
+    if signals_array.shape[0] != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: 1 époque attendue, reçu {signals_array.shape[0]} (voir /predict/batch/raw)"
+        )
+    
+    try:
+        return await micro_batcher.submit(signals_array, start_time)
+    except InferenceQueueFull as e:
+        raise _overloaded(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -214,12 +546,337 @@ async def predict_sleep_stage(request: PredictionRequest):
         )
 
 
+@app.post("/predict/batch/raw", response_model=BatchPredictionResponse, tags=["Prediction"],
+          openapi_extra=BINARY_BODY_OPENAPI)
+async def predict_sleep_stage_batch_raw(request: Request, dtype: str = "float32"):
+    """
+    Prédit les stades de sommeil de N époques envoyées en binaire.
+    
+    Mêmes formats que `/predict/raw` ; le payload contient N × 3000 valeurs
+    (au plus `SLEEPAI_MAX_BATCH_SIZE` époques).
+    """
+    start_time = time.time()
+    
+    # Vérifier que le modèle est chargé
+    if model is None or not model.is_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modèle non chargé. Veuillez redémarrer le serveur."
+        )
+    
+    # Taille vérifiée avant lecture complète et décodage (protection mémoire)
+    signals_array = await _decode_binary_request(request, dtype, max_epochs=MAX_BATCH_SIZE)
+    if signals_array.shape[0] > MAX_BATCH_SIZE:
+        raise _payload_too_large(MAX_BATCH_SIZE)
+    
+    try:
+        return await inference_executor.run(_predict_batch, signals_array, start_time)
+    except InferenceQueueFull as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne: {str(e)}"
+        )
+
+
+# Réponse streamée : une ligne JSON par époque
+NDJSON = "application/x-ndjson"
+
+
+@app.post("/predict/recording", tags=["Prediction"], response_class=StreamingResponse,
+          openapi_extra={
+              "requestBody": {
+                  "required": True,
+                  "content": {OCTET_STREAM: {"schema": {"type": "string", "format": "binary"}}},
+              },
+              "responses": {"200": {"content": {NDJSON: {}}}},
+          })
+async def predict_recording(request: Request, dtype: str = "float32", smooth: bool = False):
+    """
+    Score un enregistrement complet (nuit entière) envoyé en streaming.
+    
+    Le signal continu est découpé au fil de l'upload en époques de 3000 points,
+    prédites par batchs de `SLEEPAI_RECORDING_BATCH_SIZE` (256 par défaut) :
+    la mémoire reste bornée quelle que soit la durée de l'enregistrement.
+    
+    ## Input
+    
+    - **application/octet-stream**: flottants little-endian bruts, envoyés
+      d'un bloc ou en chunked transfer encoding
+    - **dtype** (query): `float32` (défaut) ou `float64`
+    - **smooth** (query): ajoute le stade lissé par HMM/Viterbi
+      (`smoothed_class`, `smoothed_index`) ; chaque ligne est alors
+      retardée de `SLEEPAI_SMOOTHING_LAG` époques (20 par défaut)
+    
+    ## Output (application/x-ndjson)
+    
+    - Une ligne par époque dès qu'elle est prédite : epoch, start_s,
+      predicted_class, predicted_index, confidence, probabilities
+    - Une ligne finale `{"summary": {...}}` (n_epochs, discarded_samples,
+      processing_time_ms), ou `{"error": "..."}` si le flux est interrompu
+      (valeurs NaN/inf, surcharge)
+    """
+    # Vérifier que le modèle est chargé
+    if model is None or not model.is_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modèle non chargé. Veuillez redémarrer le serveur."
+        )
+    
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type != OCTET_STREAM:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type non supporté: '{media_type}' (attendu: {OCTET_STREAM})"
+        )
+    
+    if smooth and smoother is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Lissage indisponible : matrice de transition absente ({TRANSITIONS_PATH.name}, voir fit_transitions.py)"
+        )
+    
+    try:
+        assembler = EpochAssembler(dtype=dtype, batch_size=RECORDING_BATCH_SIZE)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signal invalide: {str(e)}"
+        )
+    smoothing = HypnogramSmoothing(smoother, SMOOTHING_LAG) if smooth else None
+    
+    # Modèle fixé pour tout l'enregistrement (pas de changement de modèle en cours de nuit)
+    return _UploadStreamingResponse(_stream_hypnogram(request, assembler, model, smoothing), media_type=NDJSON)
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse dont le générateur lit lui-même le corps de la requête.
+    
+    Avec ASGI < 2.4 (uvicorn 0.27), StreamingResponse écoute `receive` en
+    parallèle pour détecter la déconnexion du client et consommerait les
+    messages `http.request` de l'upload : le générateur attendrait le corps
+    indéfiniment. Ici seul le générateur lit `receive` ; une déconnexion
+    pendant l'upload lève `ClientDisconnect` dans `request.stream()`.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _stream_hypnogram(request: Request, assembler: EpochAssembler, classifier: SleepStageClassifier,
+                            smoothing: HypnogramSmoothing = None):
+    """Lit l'upload par chunks et produit l'hypnogramme NDJSON batch par batch."""
+    start_time = time.time()
+    first_epoch = 0
+    
+    try:
+        async for chunk in request.stream():
+            for batch in assembler.feed_bytes(chunk):
+                yield await inference_executor.run(_score_recording_batch, classifier, batch, first_epoch, smoothing)
+                first_epoch += len(batch)
+        for batch in assembler.finish():
+            yield await inference_executor.run(_score_recording_batch, classifier, batch, first_epoch, smoothing)
+            first_epoch += len(batch)
+        if smoothing is not None:
+            # Dernières époques, retenues en attente de contexte futur
+            yield "".join(json.dumps(entry) + "\n" for entry in smoothing.finish())
+    except ClientDisconnect:
+        logger.warning(f"⚠️ Client déconnecté pendant l'upload ({first_epoch} époques prédites)")
+        return
+    except Exception as e:
+        # En-têtes déjà envoyés : l'erreur est signalée dans le flux
+        logger.error(f"Erreur lors du scoring de l'enregistrement: {e}")
+        yield json.dumps({"error": str(e), "n_epochs": first_epoch}) + "\n"
+        return
+    
+    yield json.dumps({
+        "summary": {
+            "n_epochs": first_epoch,
+            "discarded_samples": assembler.discarded_samples,
+            "smoothing_lag": smoothing.decoder.lag if smoothing is not None else None,
+            "processing_time_ms": (time.time() - start_time) * 1000
+        }
+    }) + "\n"
+
+
+def _score_recording_batch(classifier: SleepStageClassifier, signals_array: np.ndarray, first_epoch: int,
+                           smoothing: HypnogramSmoothing = None) -> str:
+    """
+    Prédit un batch d'époques d'un enregistrement, logge et sérialise en NDJSON.
+    
+    Avec le lissage, seules les lignes dont le stade lissé est décidé sont sérialisées.
+    """
+    start_time = time.time()
+    results, features = classifier.predict_batch(signals_array, return_features=True)
+    
+    processing_time = (time.time() - start_time) * 1000  # en ms
+    predicted_classes, _, confidences, probabilities = zip(*results)
+    monitor.log_predictions(
+        signals=signals_array,
+        predictions=list(predicted_classes),
+        confidences=list(confidences),
+        probabilities=list(probabilities),
+        processing_time=processing_time / len(results),
+        features=features
+    )
+    
+    entries = hypnogram_entries(results, first_epoch)
+    if smoothing is not None:
+        entries = smoothing.add(entries)
+    return "".join(json.dumps(entry) + "\n" for entry in entries)
+
+
+# Codes de fermeture WebSocket (RFC 6455)
+WS_INVALID_DATA = 1007
+WS_POLICY_VIOLATION = 1008
+WS_INTERNAL_ERROR = 1011
+WS_TRY_AGAIN_LATER = 1013
+
+
+@app.websocket("/ws/live")
+async def live_stream(websocket: WebSocket, dtype: str = "float32", hop: int = None):
+    """
+    Estimation du stade en direct sur les 30 dernières secondes.
+    
+    ## Input (messages binaires)
+    
+    - Flottants little-endian bruts au fil de l'acquisition, par messages
+      de n'importe quelle taille
+    - **dtype** (query): `float32` (défaut) ou `float64`
+    - **hop** (query): points entre deux estimations, multiple de 128
+      (`SLEEPAI_LIVE_HOP`, 256 par défaut = 2.56 s)
+    
+    ## Output (messages texte JSON)
+    
+    - Un message par fenêtre complétée : window, end_s, predicted_class,
+      predicted_index, confidence, probabilities
+    - `{"error": "..."}` puis fermeture si les paramètres ou le signal sont
+      invalides, ou si le pool d'inférence est saturé (le message rejeté
+      romprait la continuité du signal : le client se reconnecte)
+    
+    Les features sont mises à jour incrémentalement à chaque pas
+    (voir app/streaming.py) au lieu d'être recalculées sur 3000 points.
+    """
+    await websocket.accept()
+    
+    # Modèle fixé pour toute la connexion, comme /predict/recording
+    classifier = model
+    if classifier is None or not classifier.is_loaded():
+        await websocket.send_json({"error": "Modèle non chargé"})
+        await websocket.close(code=WS_TRY_AGAIN_LATER)
+        return
+    try:
+        scorer = LiveScorer(classifier, hop=LIVE_HOP if hop is None else hop, dtype=dtype)
+    except ValueError as e:
+        await websocket.send_json({"error": f"Paramètres invalides: {str(e)}"})
+        await websocket.close(code=WS_POLICY_VIOLATION)
+        return
+    
+    try:
+        while True:
+            chunk = await websocket.receive_bytes()
+            try:
+                lines = await inference_executor.run(_score_live_chunk, scorer, chunk)
+            except InferenceQueueFull as e:
+                await websocket.send_json({"error": str(e), "n_windows": scorer.extractor.n_windows})
+                await websocket.close(code=WS_TRY_AGAIN_LATER)
+                return
+            for line in lines:
+                await websocket.send_text(line)
+    except WebSocketDisconnect:
+        logger.info(f"🔌 Flux direct terminé ({scorer.extractor.n_windows} fenêtres)")
+    except ValueError as e:
+        await websocket.send_json({"error": f"Signal invalide: {str(e)}"})
+        await websocket.close(code=WS_INVALID_DATA)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'estimation en direct: {e}")
+        await websocket.send_json({"error": f"Erreur interne: {str(e)}"})
+        await websocket.close(code=WS_INTERNAL_ERROR)
+
+
+def _score_live_chunk(scorer: LiveScorer, chunk: bytes) -> list:
+    """Met à jour les fenêtres glissantes, prédit les fenêtres complétées, logge et sérialise."""
+    start_time = time.time()
+    entries, features = scorer.feed_bytes(chunk)
+    if not entries:
+        return []
+    
+    processing_time = (time.time() - start_time) * 1000  # en ms
+    monitor.log_predictions(
+        # Fenêtres non copiées : le log n'en garde que la longueur (stats issues des features)
+        signals=np.broadcast_to(0.0, (len(entries), scorer.extractor.window)),
+        predictions=[entry["predicted_class"] for entry in entries],
+        confidences=[entry["confidence"] for entry in entries],
+        probabilities=[entry["probabilities"] for entry in entries],
+        processing_time=processing_time / len(entries),
+        features=features
+    )
+    return [json.dumps(entry) for entry in entries]
+
+
+# ============================================================================
+# ENDPOINTS REGISTRE DES MODÈLES
+# ============================================================================
+
+@app.get("/models", tags=["Models"])
+def list_models():
+    """
+    Liste les modèles disponibles et l'état du registre.
+    
+    Returns:
+        models (artefacts trouvés, métadonnées, backends possibles) et
+        status (modèle actif, chargement en cours, historique avec temps
+        de chargement et de préchauffage)
+    """
+    return {"models": registry.list_models(), "status": registry.get_status()}
+
+
+@app.post("/models/load", status_code=status.HTTP_202_ACCEPTED, tags=["Models"])
+def load_model(request: ModelLoadRequest):
+    """
+    Charge un modèle en arrière-plan et le substitue au modèle actif.
+    
+    Le modèle actif continue de servir pendant le chargement et le
+    préchauffage ; suivre l'avancement via GET /models.
+    
+    Raises:
+        404: Identifiant inconnu
+        400: Backend non supporté par ce type d'artefact
+        409: Un chargement est déjà en cours
+    """
+    try:
+        registry.load_async(request.model_id, request.backend)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Modèle inconnu: '{request.model_id}' (voir GET /models)"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ModelLoadInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return registry.get_status()
+
+
 # ============================================================================
 # ENDPOINTS MONITORING
 # ============================================================================
+# Endpoints synchrones (threadpool FastAPI) : au-delà du buffer mémoire,
+# la lecture du fichier attend l'écriture des logs en file (jusqu'à 5 s)
+# et ne doit pas bloquer la boucle asyncio.
 
 @app.get("/monitoring/stats", tags=["Monitoring"])
-async def get_monitoring_stats(last_n: int = 100):
+def get_monitoring_stats(last_n: int = 100):
     """
     Obtenir les statistiques de monitoring.
     
@@ -227,9 +884,15 @@ async def get_monitoring_stats(last_n: int = 100):
     - Distribution des classes prédites
     - Statistiques de confiance
     - Temps de traitement moyen
+    - Compteurs de l'écrivain de logs (lignes écrites / abandonnées)
+    - Taux de hit du cache de prédictions (null si désactivé)
     """
     try:
-        return monitor.get_statistics(last_n)
+        return {
+            **monitor.get_statistics(last_n),
+            "log_writer": monitor.get_writer_metrics(),
+            "prediction_cache": prediction_cache.get_metrics() if prediction_cache is not None else None
+        }
     except Exception as e:
         logger.error(f"Erreur monitoring stats: {e}")
         raise HTTPException(
@@ -239,7 +902,7 @@ async def get_monitoring_stats(last_n: int = 100):
 
 
 @app.get("/monitoring/drift", tags=["Monitoring"])
-async def check_drift(threshold: float = 0.1, window_size: int = 50):
+def check_drift(threshold: float = 0.1, window_size: int = 50):
     """
     Vérifier s'il y a une dérive du modèle.
     
@@ -259,8 +922,23 @@ async def check_drift(threshold: float = 0.1, window_size: int = 50):
         )
 
 
+@app.get("/monitoring/inference", tags=["Monitoring"])
+async def get_inference_metrics():
+    """
+    Obtenir l'état du pool d'inférence.
+    
+    Retourne le nombre de threads, les requêtes en cours/en attente,
+    les compteurs de requêtes traitées et rejetées (503), ainsi que les
+    métriques de micro-batching (taille des batchs, délai en file).
+    """
+    return {
+        **inference_executor.get_metrics(),
+        "batching": micro_batcher.get_metrics()
+    }
+
+
 @app.get("/monitoring/recent", tags=["Monitoring"])
-async def get_recent_predictions(n: int = 10):
+def get_recent_predictions(n: int = 10):
     """
     Obtenir les N dernières prédictions.
     
@@ -10,9 +10,14 @@ Cette classe encapsule toute la logique ML pour :
 import joblib
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional, Union
 import logging
+from sklearn.pipeline import Pipeline
 from app.feature_extractor import FeatureExtractor  # Import nécessaire pour joblib
+from app.cnn import NumpyCNN, prepare_signals
+from app.digest import epoch_digests, params_digest
+from app.forest import FlatForest
+from app.model_artifact import METADATA_FILE, is_artifact, load_flat_model, load_pipeline
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -48,15 +53,39 @@ class SleepStageClassifier:
         'training_date': '2025-10-16'
     }
     
-    def __init__(self, model_path: str):
+    # Moteurs d'inférence : forêt sklearn ou aplatie (après extraction des
+    # features), ou CNN exécuté en NumPy (sur le signal brut)
+    BACKENDS = ('sklearn', 'flat', 'cnn')
+    
+    # Backend 'flat' : au-delà de ce nombre d'époques, le parcours compilé de
+    # sklearn redevient plus rapide que le parcours NumPy niveau par niveau
+    FLAT_MAX_BATCH = 128
+    
+    def __init__(self, model_path: str, backend: str = 'sklearn'):
         """
         Initialise le classificateur en chargeant le pipeline.
         
         Args:
-            model_path: Chemin vers le fichier .joblib du pipeline
+            model_path: Chemin vers le fichier .joblib du pipeline, ou vers un
+                artefact mappable en mémoire (dossier, voir app/model_artifact.py)
+            backend: 'sklearn' (StandardScaler + RandomForest du pipeline) ou
+                'flat' (forêt aplatie `FlatForest`, scaler replié dans les
+                seuils ; mêmes probabilités, sans dispatch arbre par arbre,
+                pour les batchs d'au plus FLAT_MAX_BATCH époques) ou 'cnn'
+                (CNN_RegularizedLight exporté en `.npz`, voir app/cnn.py ;
+                `model_path` est alors ce fichier)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend inconnu: '{backend}' (disponibles: {', '.join(self.BACKENDS)})")
+        self.backend = backend
         self.model_path = Path(model_path)
         self.pipeline = None
+        self.feature_extractor = None
+        self.head = None
+        self.flat_head = None
+        self.cnn = None
+        self.model_version = None
+        self.prediction_cache = None
         self._load_model()
     
     def _load_model(self):
@@ -67,14 +96,93 @@ class SleepStageClassifier:
             if not self.model_path.exists():
                 raise FileNotFoundError(f"Modèle non trouvé: {self.model_path}")
             
-            self.pipeline = joblib.load(self.model_path)
+            if self.backend == 'cnn':
+                self.cnn = NumpyCNN.load(self.model_path)
+                if self.cnn.class_names != list(self.CLASS_NAMES.values()):
+                    raise ValueError(f"Classes du CNN inattendues: {self.cnn.class_names}")
+                logger.info(f"   CNN NumPy : {len(self.cnn.layers)} couches, {self.cnn.n_parameters} paramètres")
+                self._new_model_version()
+            elif is_artifact(self.model_path):
+                self._load_artifact()
+            else:
+                self.pipeline = joblib.load(self.model_path)
+                self._split_pipeline()
             logger.info("✅ Modèle chargé avec succès")
-            logger.info(f"   Étapes du pipeline: {list(self.pipeline.named_steps.keys())}")
+            if self.pipeline is not None:
+                logger.info(f"   Étapes du pipeline: {list(self.pipeline.named_steps.keys())}")
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement du modèle: {e}")
             raise
     
+    def _load_artifact(self):
+        """
+        Charge un artefact mappé en mémoire.
+        
+        Backend 'flat' : seuls l'extracteur et les tableaux de la forêt sont
+        ouverts (mmap, pages partagées entre workers), sans désérialiser la
+        forêt sklearn ; tous les batchs passent alors par la forêt aplatie.
+        Backend 'sklearn' : pipeline complet, tableaux mappés par joblib.
+        """
+        if self.backend == 'flat':
+            self.pipeline = None
+            self.head = None
+            self.feature_extractor, self.flat_head = load_flat_model(self.model_path)
+            logger.info(f"   Forêt aplatie mappée : {self.flat_head.n_trees} arbres, {self.flat_head.n_nodes} nœuds")
+            self._new_model_version()
+        else:
+            self.pipeline = load_pipeline(self.model_path)
+            self._split_pipeline()
+    
+    def _split_pipeline(self):
+        """
+        Sépare le FeatureExtractor du reste du pipeline (scaler + classifieur).
+        
+        Permet de récupérer les features calculées pendant la prédiction
+        (réutilisées par le monitoring) sans extraire deux fois.
+        """
+        if isinstance(self.pipeline, Pipeline) and isinstance(self.pipeline.steps[0][1], FeatureExtractor):
+            self.feature_extractor = self.pipeline.steps[0][1]
+            self.head = self.pipeline[1:]
+        else:
+            self.feature_extractor = None
+            self.head = None
+        
+        self.flat_head = None
+        if self.backend == 'flat':
+            if self.head is None:
+                raise ValueError("Backend 'flat' : le pipeline doit commencer par un FeatureExtractor")
+            # predict_proba(features) comme le reste du pipeline
+            self.flat_head = FlatForest.from_pipeline(self.head)
+            logger.info(f"   Forêt aplatie : {self.flat_head.n_trees} arbres, {self.flat_head.n_nodes} nœuds "
+                        f"({self.flat_head.nbytes / 1024**2:.1f} MB)")
+        
+        self._new_model_version()
+    
+    def _new_model_version(self):
+        """Nouveau pipeline → nouvelle version : les prédictions en cache sont invalidées."""
+        self.model_version = self._compute_model_version()
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+    
+    def _compute_model_version(self) -> str:
+        """Version du modèle chargé : fichier (chemin, taille, date) + instance du pipeline."""
+        try:
+            version_file = self.model_path / METADATA_FILE if self.model_path.is_dir() else self.model_path
+            stat = version_file.stat()
+            file_id = (str(self.model_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            file_id = (str(self.model_path),)
+        return params_digest(*file_id, id(self.pipeline), id(self.flat_head), id(self.cnn)).hex()
+    
+    def set_prediction_cache(self, cache):
+        """
+        Rattache un cache de prédictions (`PredictionCache`, ou None pour le retirer).
+        
+        Clé : (model_version, empreinte de l'époque) ; vidé à chaque changement de pipeline.
+        """
+        self.prediction_cache = cache
+    
     def predict(self, signal: np.ndarray) -> Tuple[str, int, float, Dict[str, float]]:
         """
         Prédit le stade de sommeil à partir d'un signal EEG.
@@ -93,7 +201,7 @@ class SleepStageClassifier:
             ValueError: Si le signal n'a pas la bonne shape
         """
         # Validation de la shape
-        signal = np.array(signal)
+        signal = np.asarray(signal)
         
         if signal.ndim == 1:
             # Si shape (3000,), reshaper en (1, 3000)
@@ -104,39 +212,173 @@ class SleepStageClassifier:
                 f"Signal doit avoir shape (1, 3000) ou (3000,), reçu {signal.shape}"
             )
         
-        # Prédiction
+        # Prédiction : un seul passage dans le pipeline (predict_proba + argmax),
+        # court-circuité par le cache de prédictions s'il est rattaché
+        predicted_class, predicted_index, confidence, probabilities = self.predict_batch(
+            signal, use_cache=True
+        )[0]
+        
+        logger.info(f"Prédiction: {predicted_class} (confiance: {confidence:.2%})")
+        
+        return predicted_class, predicted_index, confidence, probabilities
+    
+    def predict_proba(self, signals: np.ndarray) -> np.ndarray:
+        """
+        Calcule les probabilités des 5 classes pour un batch d'époques EEG.
+        
+        Args:
+            signals: Signaux EEG de shape (N, 3000)
+        
+        Returns:
+            Matrice de probabilités de shape (N, 5), colonnes dans l'ordre de CLASS_NAMES
+        
+        Raises:
+            ValueError: Si les signaux n'ont pas la bonne shape
+        """
+        return self._predict_proba_and_features(signals)[0]
+    
+    def _predict_proba_and_features(self, signals: np.ndarray,
+                                    use_cache: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Probabilités (N, 5) et features (N, 16) calculées en un seul passage.
+        
+        Les features valent None si le pipeline ne commence pas par un FeatureExtractor.
+        Avec `use_cache`, les époques déjà vues sont lues dans le cache de prédictions.
+        """
+        signals = np.asarray(signals)
+        
+        if signals.ndim != 2 or signals.shape[1] != 3000 or signals.shape[0] == 0:
+            raise ValueError(
+                f"Signaux doivent avoir shape (N, 3000), reçu {signals.shape}"
+            )
+        
+        if use_cache and self.prediction_cache is not None:
+            return self._predict_cached(signals)
+        return self._compute_proba_and_features(signals)
+    
+    def _compute_proba_and_features(self, signals: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Passage dans le pipeline (signaux déjà validés)."""
         try:
-            # Prédire la classe
-            prediction = self.pipeline.predict(signal)
-            predicted_index = int(prediction[0])
-            predicted_class = self.CLASS_NAMES[predicted_index]
-            
-            # Prédire les probabilités
-            probabilities_array = self.pipeline.predict_proba(signal)[0]
-            confidence = float(np.max(probabilities_array))
-            
-            # Créer le dictionnaire de probabilités
+            if self.input_kind == 'tensor':
+                # Pas de features : le CNN travaille sur le signal brut
+                return self.predict_proba_from_tensor(prepare_signals(signals)), None
+            if self.input_kind == 'signals':
+                return np.asarray(self.pipeline.predict_proba(signals)), None
+            features = self.feature_extractor.transform(signals)
+            return self.predict_proba_from_features(features), features
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la prédiction: {e}")
+            raise
+    
+    @property
+    def input_kind(self) -> str:
+        """
+        Représentation consommée par le modèle : 'tensor' (entrée (N, 500, 6)
+        du CNN), 'features' (16 features du FeatureExtractor) ou 'signals'
+        (pipeline sans FeatureExtractor, signal brut).
+        """
+        if self.cnn is not None:
+            return 'tensor'
+        return 'signals' if self.feature_extractor is None else 'features'
+    
+    def predict_proba_from_features(self, features: np.ndarray) -> np.ndarray:
+        """Probabilités (N, 5) à partir des features déjà extraites (scaler + forêt)."""
+        head = self.head
+        if self.flat_head is not None and (head is None or len(features) <= self.FLAT_MAX_BATCH):
+            head = self.flat_head
+        return np.asarray(head.predict_proba(features))
+    
+    def predict_proba_from_tensor(self, X: np.ndarray) -> np.ndarray:
+        """Probabilités (N, 5) du CNN à partir de l'entrée préparée (`prepare_signals`)."""
+        return self.cnn.predict_proba(X).astype(np.float64)
+    
+    def _predict_cached(self, signals: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Comme `_compute_proba_and_features`, seules les époques absentes du cache passent dans le pipeline."""
+        keys = [(self.model_version, digest) for digest in epoch_digests(signals)]
+        entries = [self.prediction_cache.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        
+        if missing:
+            probabilities, features = self._compute_proba_and_features(signals[missing])
+            for j, i in enumerate(missing):
+                entries[i] = (probabilities[j], None if features is None else features[j])
+                self.prediction_cache.put(keys[i], entries[i])
+        
+        probabilities = np.vstack([entry[0] for entry in entries])
+        if any(entry[1] is None for entry in entries):
+            return probabilities, None
+        return probabilities, np.vstack([entry[1] for entry in entries])
+    
+    def predict_batch(
+        self, signals: np.ndarray, return_features: bool = False, use_cache: bool = False
+    ) -> Union[List[Tuple[str, int, float, Dict[str, float]]],
+               Tuple[List[Tuple[str, int, float, Dict[str, float]]], Optional[np.ndarray]]]:
+        """
+        Prédit les stades de sommeil d'un batch d'époques EEG.
+        
+        Un seul appel vectorisé à `predict_proba` pour tout le batch
+        (extraction de features, scaling et forêt exécutés une fois) ;
+        la classe prédite est l'argmax des probabilités, comme dans sklearn.
+        
+        Args:
+            signals: Signaux EEG de shape (N, 3000)
+            return_features: Retourner aussi les 16 features calculées
+                (shape (N, 16), ou None si le pipeline ne les expose pas)
+            use_cache: Passer par le cache de prédictions (s'il est rattaché) ;
+                réservé aux requêtes unitaires, pour qu'un batch ou un
+                enregistrement complet n'évince pas tout le cache
+        
+        Returns:
+            Liste de N tuples (predicted_class, predicted_index, confidence, probabilities),
+            dans le même format que `predict` ; tuple (résultats, features)
+            si `return_features`
+        
+        Raises:
+            ValueError: Si les signaux n'ont pas la bonne shape
+        """
+        probabilities_matrix, features = self._predict_proba_and_features(signals, use_cache)
+        results = self.format_results(probabilities_matrix)
+        
+        if return_features:
+            return results, features
+        return results
+    
+    def format_results(self, probabilities_matrix: np.ndarray) -> List[Tuple[str, int, float, Dict[str, float]]]:
+        """
+        Convertit une matrice de probabilités (N, 5) en tuples
+        (predicted_class, predicted_index, confidence, probabilities), comme `predict_batch`.
+        """
+        predicted_indices = np.argmax(probabilities_matrix, axis=1)
+        
+        results = []
+        for predicted_index, probabilities_array in zip(predicted_indices, probabilities_matrix):
+            predicted_index = int(predicted_index)
             probabilities = {
                 self.CLASS_NAMES[i]: float(prob)
                 for i, prob in enumerate(probabilities_array)
             }
-            
-            logger.info(f"Prédiction: {predicted_class} (confiance: {confidence:.2%})")
-            
-            return predicted_class, predicted_index, confidence, probabilities
-            
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la prédiction: {e}")
-            raise
+            results.append((
+                self.CLASS_NAMES[predicted_index],
+                predicted_index,
+                float(probabilities_array[predicted_index]),
+                probabilities
+            ))
+        return results
+    
+    def get_last_timings(self) -> Optional[Dict]:
+        """Durées par étape du dernier batch (ensembles seulement, voir app/ensemble.py)."""
+        return None
     
     def get_model_info(self) -> dict:
         """Retourne les informations sur le modèle."""
         return {
             **self.MODEL_METADATA,
+            **(self.cnn.info if self.cnn is not None else {}),
             'classes': list(self.CLASS_NAMES.values()),
-            'model_loaded': self.pipeline is not None
+            'backend': self.backend,
+            'model_loaded': self.is_loaded()
         }
     
     def is_loaded(self) -> bool:
         """Vérifie si le modèle est chargé."""
-        return self.pipeline is not None
\ No newline at end of file
+        return self.pipeline is not None or self.flat_head is not None or self.cnn is not None
\ No newline at end of file
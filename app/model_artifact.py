@@ -0,0 +1,154 @@
+"""
+Artefact de modèle mappable en mémoire.
+
+`joblib.load` du pipeline désérialise les 500 arbres : lent au démarrage
+à froid, et chaque worker uvicorn en garde sa propre copie. L'artefact
+est un dossier dont les gros tableaux numériques sont stockés non
+compressés, ouverts avec `mmap_mode='r'` : les pages sont lues à la
+demande et partagées entre workers par le cache de l'OS.
+
+Contenu du dossier :
+    metadata.json             version du format, taille de la forêt
+    feature_extractor.joblib  FeatureExtractor (quelques Ko)
+    forest/*.npy              tableaux de la forêt aplatie (app/forest.py),
+                              scaler replié dans les seuils
+    pipeline.joblib           pipeline sklearn complet (non compressé), pour
+                              le backend 'sklearn' et les batchs volumineux
+
+Le backend 'flat' ne charge que l'extracteur et les `.npy` mappés : la
+forêt n'est jamais désérialisée. Avec le backend 'sklearn', joblib mappe
+les tableaux du pipeline, mais sklearn recopie les nœuds des arbres dans
+sa propre mémoire : seul le backend 'flat' partage réellement la forêt.
+
+Utilisation :
+    save_artifact(pipeline, "models/rf_v2_final")
+    SleepStageClassifier("models/rf_v2_final", backend="flat")
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from app.feature_extractor import FeatureExtractor
+from app.forest import FlatForest
+
+# Version du format de l'artefact (à incrémenter si le contenu change)
+ARTIFACT_VERSION = 1
+
+METADATA_FILE = "metadata.json"
+EXTRACTOR_FILE = "feature_extractor.joblib"
+PIPELINE_FILE = "pipeline.joblib"
+FOREST_DIR = "forest"
+
+
+def is_artifact(path: Union[str, Path]) -> bool:
+    """
+    Vrai si `path` est un dossier d'artefact (et non un fichier .joblib).
+    
+    Le dossier `forest/` est exigé en plus de `metadata.json` : les dossiers
+    des modèles des notebooks ont aussi un `metadata.json`.
+    """
+    path = Path(path)
+    return (path / METADATA_FILE).is_file() and (path / FOREST_DIR).is_dir()
+
+
+def save_artifact(pipeline: Pipeline, directory: Union[str, Path], compact_dtypes: bool = False) -> Dict:
+    """
+    Écrit l'artefact d'un pipeline FeatureExtractor → StandardScaler → RandomForest.
+    
+    Le dossier est écrit à côté puis renommé : un artefact présent est
+    toujours complet.
+    
+    Args:
+        pipeline: Pipeline entraîné
+        directory: Dossier à créer (ne doit pas exister)
+        compact_dtypes: Forêt aplatie aux types réduits (`FlatForest.compact_dtypes`) ;
+            le pipeline sklearn reste inchangé
+    
+    Returns:
+        Métadonnées de l'artefact
+    
+    Raises:
+        FileExistsError: Si le dossier existe déjà
+        ValueError: Si le pipeline n'a pas la forme attendue
+    """
+    directory = Path(directory)
+    if directory.exists():
+        raise FileExistsError(f"L'artefact existe déjà: {directory}")
+    extractor = pipeline.steps[0][1]
+    if not isinstance(extractor, FeatureExtractor):
+        raise ValueError("Le pipeline doit commencer par un FeatureExtractor")
+    forest = FlatForest.from_pipeline(pipeline)
+    if compact_dtypes:
+        forest = forest.compact_dtypes()
+    
+    tmp = directory.with_name(f".{directory.name}.tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    (tmp / FOREST_DIR).mkdir(parents=True)
+    try:
+        for name, array in forest.arrays().items():
+            np.save(tmp / FOREST_DIR / f"{name}.npy", np.ascontiguousarray(array))
+        joblib.dump(extractor, tmp / EXTRACTOR_FILE)
+        # compress=0 : tableaux stockés tels quels, mappables par joblib.load(mmap_mode='r')
+        joblib.dump(pipeline, tmp / PIPELINE_FILE, compress=0)
+        
+        metadata = {
+            "artifact_version": ARTIFACT_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "n_trees": forest.n_trees,
+            "n_nodes": forest.n_nodes,
+            "max_depth": forest.max_depth,
+            "forest_bytes": forest.nbytes,
+            "compact_dtypes": compact_dtypes,
+            "classes": [int(c) for c in forest.classes_]
+        }
+        (tmp / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+        tmp.rename(directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return metadata
+
+
+def read_metadata(directory: Union[str, Path]) -> Dict:
+    """
+    Lit et vérifie `metadata.json`.
+    
+    Raises:
+        ValueError: Si la version du format n'est pas supportée
+    """
+    metadata = json.loads((Path(directory) / METADATA_FILE).read_text())
+    if metadata.get("artifact_version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Version d'artefact non supportée: {metadata.get('artifact_version')} (attendue: {ARTIFACT_VERSION})"
+        )
+    return metadata
+
+
+def load_pipeline(directory: Union[str, Path], mmap: bool = True) -> Pipeline:
+    """Pipeline sklearn complet (tableaux mappés en mémoire si `mmap`)."""
+    read_metadata(directory)
+    return joblib.load(Path(directory) / PIPELINE_FILE, mmap_mode="r" if mmap else None)
+
+
+def load_flat_model(directory: Union[str, Path], mmap: bool = True) -> Tuple[FeatureExtractor, FlatForest]:
+    """
+    FeatureExtractor et forêt aplatie, sans désérialiser la forêt sklearn.
+    
+    Returns:
+        (extracteur, forêt dont les tableaux sont mappés en lecture seule si `mmap`)
+    """
+    directory = Path(directory)
+    read_metadata(directory)
+    arrays = {
+        path.stem: np.load(path, mmap_mode="r" if mmap else None)
+        for path in (directory / FOREST_DIR).glob("*.npy")
+    }
+    return joblib.load(directory / EXTRACTOR_FILE), FlatForest.from_arrays(arrays)
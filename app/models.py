@@ -7,9 +7,33 @@ Pydantic permet de :
 - Gérer les erreurs de manière claire
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Dict
+from pydantic import BaseModel, Field, PrivateAttr, conlist, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+from typing import List, Dict, Optional
 import numpy as np
+import os
+
+# Nombre maximum d'époques par requête batch (protection mémoire)
+MAX_BATCH_SIZE = int(os.getenv("SLEEPAI_MAX_BATCH_SIZE", "1024"))
+
+# Type d'erreur de validation d'un batch trop grand (converti en 413 par l'API)
+BATCH_TOO_LARGE = "batch_too_large"
+
+
+def to_signal_array(values) -> np.ndarray:
+    """
+    Convertit un ou plusieurs signaux en array float64 et vérifie les valeurs.
+    
+    Une seule conversion et un seul `np.isfinite(...).all()` vectorisé,
+    partagés par les requêtes simples, batch et binaires.
+    
+    Raises:
+        ValueError: Si le signal contient des valeurs NaN ou infinies
+    """
+    array = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(array).all():
+        raise ValueError("Le signal contient des valeurs NaN ou infinies")
+    return array
 
 
 class PredictionRequest(BaseModel):
@@ -26,14 +50,18 @@ class PredictionRequest(BaseModel):
         example=[0.5, -0.2, 1.3] + [0.0] * 2997  # Exemple tronqué pour la doc
     )
     
-    @validator('signal')
-    def validate_signal(cls, v):
+    _signal_array: np.ndarray = PrivateAttr(default=None)
+    
+    @model_validator(mode='after')
+    def validate_signal(self):
         """Vérifie que le signal contient des valeurs numériques valides."""
-        if not all(isinstance(x, (int, float)) for x in v):
-            raise ValueError("Le signal doit contenir uniquement des nombres")
-        if any(np.isnan(x) or np.isinf(x) for x in v):
-            raise ValueError("Le signal contient des valeurs NaN ou infinies")
-        return v
+        self._signal_array = to_signal_array(self.signal).reshape(1, -1)
+        return self
+    
+    @property
+    def signal_array(self) -> np.ndarray:
+        """Signal validé, shape (1, 3000), prêt pour le modèle."""
+        return self._signal_array
 
 
 class PredictionResponse(BaseModel):
@@ -62,6 +90,69 @@ class PredictionResponse(BaseModel):
     )
 
 
+class BatchPredictionRequest(BaseModel):
+    """
+    Requête pour prédire les stades de sommeil de plusieurs époques.
+    
+    Chaque époque doit contenir exactement 3000 points (30s à 100Hz).
+    """
+    signals: List[conlist(float, min_length=3000, max_length=3000)] = Field(
+        ...,
+        description="Liste d'époques EEG de 30 secondes (3000 points à 100Hz chacune)",
+        min_length=1
+    )
+    
+    _signals_array: np.ndarray = PrivateAttr(default=None)
+    
+    @field_validator('signals', mode='before')
+    @classmethod
+    def check_batch_size(cls, value):
+        """
+        Rejette un batch de plus de MAX_BATCH_SIZE époques avant la
+        validation des 3000 flottants de chaque époque et la conversion numpy.
+        """
+        if isinstance(value, list) and len(value) > MAX_BATCH_SIZE:
+            raise PydanticCustomError(
+                BATCH_TOO_LARGE,
+                "Batch trop grand: {n_epochs} époques (max {max_epochs})",
+                {"n_epochs": len(value), "max_epochs": MAX_BATCH_SIZE}
+            )
+        return value
+    
+    @model_validator(mode='after')
+    def validate_signals(self):
+        """Vérifie que les époques contiennent des valeurs numériques valides."""
+        self._signals_array = to_signal_array(self.signals)
+        return self
+    
+    @property
+    def signals_array(self) -> np.ndarray:
+        """Époques validées, shape (N, 3000), prêtes pour le modèle."""
+        return self._signals_array
+
+
+class BatchPredictionResponse(BaseModel):
+    """
+    Réponse après prédiction d'un batch d'époques.
+    """
+    predictions: List[PredictionResponse] = Field(
+        ...,
+        description="Prédictions, dans l'ordre des époques envoyées"
+    )
+    n_epochs: int = Field(
+        ...,
+        description="Nombre d'époques prédites"
+    )
+    processing_time_ms: float = Field(
+        ...,
+        description="Temps de traitement total du batch (ms)"
+    )
+    timings: Optional[Dict] = Field(
+        None,
+        description="Ensemble de modèles : durées (ms) des features, de l'entrée du CNN et de chaque membre"
+    )
+
+
 class HealthResponse(BaseModel):
     """Réponse du endpoint de santé."""
     status: str
@@ -77,4 +168,16 @@ class ModelInfoResponse(BaseModel):
     cohens_kappa: float
     classes: List[str]
     n_features: int
-    training_date: str
\ No newline at end of file
+    training_date: str
+
+
+class ModelLoadRequest(BaseModel):
+    """Demande de changement de modèle (POST /models/load)."""
+    model_id: str = Field(
+        ...,
+        description="Identifiant du modèle (voir GET /models)"
+    )
+    backend: Optional[str] = Field(
+        None,
+        description="Moteur d'inférence ('sklearn', 'flat', 'cnn', 'ensemble') ; défaut selon le type d'artefact"
+    )
@@ -1,66 +1,363 @@
 import json
+import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import logging
+from app.log_store import JsonlLogStore, BufferedLogWriter
 
 logger = logging.getLogger(__name__)
 
+
+class PredictionRingBuffer:
+    """
+    Buffer circulaire des dernières prédictions, avec agrégats incrémentaux.
+    
+    Chaque prédiction est stockée dans des arrays compacts (index de classe,
+    confiance, timestamp, temps de traitement cumulé) accompagnés des sommes
+    cumulées depuis le démarrage : les agrégats d'une fenêtre des N dernières
+    prédictions (effectifs et confiance par classe, moyenne/écart-type de
+    confiance, temps moyen) s'obtiennent par différence de deux cumuls, en
+    O(1) quelle que soit N. Seuls min/max de confiance parcourent la fenêtre
+    (vectorisé).
+    
+    Les entrées de log complètes (features, probabilités) ne sont gardées
+    que pour les `records_capacity` dernières prédictions (/monitoring/recent).
+    """
+    
+    def __init__(self, capacity: int = 10000, max_classes: int = 16,
+                 records_capacity: int = 100):
+        """
+        Args:
+            capacity: Nombre de prédictions conservées en mémoire
+            max_classes: Nombre maximum de classes distinctes suivies
+            records_capacity: Nombre d'entrées de log complètes conservées
+        """
+        self.capacity = capacity
+        # Un slot de plus : le cumul précédant une fenêtre de `capacity` éléments
+        size = capacity + 1
+        self._size = size
+        self._count = 0
+        self._classes = {}
+        self._class_names = []
+        self.max_classes = max_classes
+        
+        # Valeurs par prédiction
+        self._class_idx = np.zeros(size, dtype=np.int16)
+        self._confidence = np.zeros(size, dtype=np.float64)
+        self._timestamp = np.zeros(size, dtype=np.float64)  # secondes (epoch)
+        self._records = deque(maxlen=records_capacity)
+        
+        # Sommes cumulées (incluant la prédiction du slot)
+        self._cum_conf = np.zeros(size)
+        self._cum_conf_sq = np.zeros(size)
+        self._cum_time = np.zeros(size)
+        self._cum_time_n = np.zeros(size, dtype=np.int64)
+        self._cum_class_n = np.zeros((size, max_classes), dtype=np.int64)
+        self._cum_class_conf = np.zeros((size, max_classes))
+        
+        # Totaux courants
+        self._tot_conf = 0.0
+        self._tot_conf_sq = 0.0
+        self._tot_time = 0.0
+        self._tot_time_n = 0
+        self._tot_class_n = np.zeros(max_classes, dtype=np.int64)
+        self._tot_class_conf = np.zeros(max_classes)
+    
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+    
+    def holds_all(self) -> bool:
+        """Vrai si aucune prédiction n'a encore été évincée du buffer."""
+        return self._count < self.capacity
+    
+    def has_records(self, n: int) -> bool:
+        """Vrai si les entrées complètes des N dernières prédictions sont en mémoire."""
+        return n <= len(self._records) or (self.holds_all() and self._count == len(self._records))
+    
+    def append(self, record: Dict):
+        """Ajoute une entrée de log et met à jour les agrégats."""
+        cls = record["prediction"]
+        idx = self._classes.get(cls)
+        if idx is None:
+            if len(self._class_names) >= self.max_classes:
+                raise ValueError(f"Plus de {self.max_classes} classes distinctes")
+            idx = self._classes[cls] = len(self._class_names)
+            self._class_names.append(cls)
+        
+        confidence = float(record["confidence"])
+        processing_time = record.get("processing_time_ms")
+        
+        self._tot_conf += confidence
+        self._tot_conf_sq += confidence * confidence
+        if processing_time:
+            self._tot_time += processing_time
+            self._tot_time_n += 1
+        self._tot_class_n[idx] += 1
+        self._tot_class_conf[idx] += confidence
+        
+        slot = self._count % self._size
+        self._class_idx[slot] = idx
+        self._confidence[slot] = confidence
+        self._timestamp[slot] = datetime.fromisoformat(record["timestamp"]).timestamp()
+        self._records.append(record)
+        self._cum_conf[slot] = self._tot_conf
+        self._cum_conf_sq[slot] = self._tot_conf_sq
+        self._cum_time[slot] = self._tot_time
+        self._cum_time_n[slot] = self._tot_time_n
+        self._cum_class_n[slot] = self._tot_class_n
+        self._cum_class_conf[slot] = self._tot_class_conf
+        self._count += 1
+    
+    def recent(self, n: int) -> List[Dict]:
+        """Les N dernières entrées complètes (voir `has_records`), de la plus ancienne à la plus récente."""
+        n = min(n, len(self._records))
+        return list(self._records)[len(self._records) - n:]
+    
+    def _window_slots(self, start: int, stop: int) -> np.ndarray:
+        """Slots des prédictions d'index global [start, stop)."""
+        return np.arange(start, stop) % self._size
+    
+    def window(self, n: int, offset: int = 0) -> Dict:
+        """
+        Agrégats des N prédictions se terminant `offset` prédictions avant la dernière.
+        
+        Args:
+            n: Taille de la fenêtre (n + offset ≤ len(self))
+            offset: Nombre de prédictions récentes exclues
+        """
+        stop = self._count - offset
+        start = stop - n
+        last = (stop - 1) % self._size
+        
+        def diff(cum):
+            if start == 0:
+                return cum[last]
+            return cum[last] - cum[(start - 1) % self._size]
+        
+        class_n = diff(self._cum_class_n)
+        class_conf = diff(self._cum_class_conf)
+        confidences = self._confidence[self._window_slots(start, stop)]
+        
+        return {
+            "count": n,
+            "class_counts": {
+                name: int(class_n[i]) for i, name in enumerate(self._class_names) if class_n[i] > 0
+            },
+            "class_confidence_sum": {
+                name: float(class_conf[i]) for i, name in enumerate(self._class_names) if class_n[i] > 0
+            },
+            "confidence_sum": float(diff(self._cum_conf)),
+            "confidence_sq_sum": float(diff(self._cum_conf_sq)),
+            "confidence_min": float(confidences.min()),
+            "confidence_max": float(confidences.max()),
+            "processing_time_sum": float(diff(self._cum_time)),
+            "processing_time_n": int(diff(self._cum_time_n)),
+            "first_timestamp": datetime.fromtimestamp(self._timestamp[start % self._size]).isoformat(),
+            "last_timestamp": datetime.fromtimestamp(self._timestamp[last]).isoformat(),
+            "last": self._records[-1] if offset == 0 and self._records else None
+        }
+
+
 class SimpleMonitor:
     """Système de monitoring simple pour logger et analyser les prédictions"""
     
-    def __init__(self, log_file: str = "logs/predictions.jsonl"):
+    def __init__(self,
+                 log_file: str = "logs/predictions.jsonl",
+                 max_bytes: Optional[int] = 50 * 1024 * 1024,
+                 rotate_interval: Optional[float] = None,
+                 backup_count: int = 5,
+                 buffer_capacity: int = 10000,
+                 recent_capacity: int = 100,
+                 async_writes: bool = True):
         self.log_file = Path(log_file)
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        logger.info(f"📊 Monitoring initialisé : {self.log_file}")
+        self.store = JsonlLogStore(
+            self.log_file,
+            max_bytes=max_bytes,
+            rotate_interval=rotate_interval,
+            backup_count=backup_count
+        )
+        # Écriture du JSONL en arrière-plan (hors du chemin des requêtes)
+        self.writer = BufferedLogWriter(self.store) if async_writes else None
+        
+        # Buffer mémoire des dernières prédictions (le JSONL reste la source durable),
+        # initialisé avec la fin du fichier existant
+        self._lock = threading.Lock()
+        self.buffer = PredictionRingBuffer(capacity=buffer_capacity, records_capacity=recent_capacity)
+        for line in self.store.tail(buffer_capacity):
+            try:
+                self.buffer.append(json.loads(line))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Entrée de log ignorée : {e}")
+        logger.info(f"📊 Monitoring initialisé : {self.log_file} ({len(self.buffer)} prédictions en mémoire)")
     
     def log_prediction(self, 
                       signal: List[float],
                       prediction: str,
                       confidence: float,
                       probabilities: Dict[str, float],
-                      processing_time: float = None):
-        """Logger une prédiction avec ses métadonnées"""
+                      processing_time: float = None,
+                      features: Optional[np.ndarray] = None):
+        """
+        Logger une prédiction avec ses métadonnées.
         
-        log_entry = {
+        Si les 16 features du FeatureExtractor sont fournies, les statistiques
+        du signal en sont tirées (features 0-3) au lieu d'être recalculées.
+        """
+        
+        log_entry = self._build_entry(signal, prediction, confidence, probabilities, processing_time, features)
+        self._write_entries([log_entry])
+    
+    def log_predictions(self,
+                        signals: np.ndarray,
+                        predictions: List[str],
+                        confidences: List[float],
+                        probabilities: List[Dict[str, float]],
+                        processing_time: Union[float, List[float]] = None,
+                        features: Optional[np.ndarray] = None):
+        """
+        Logger un batch de prédictions en une seule écriture.
+        
+        `processing_time` est soit un temps commun à tout le batch,
+        soit une liste de temps (un par prédiction). `features` (N, 16)
+        évite de recalculer les statistiques des signaux.
+        """
+        if not isinstance(processing_time, (list, tuple)):
+            processing_time = [processing_time] * len(predictions)
+        if features is None:
+            features = [None] * len(predictions)
+        
+        log_entries = [
+            self._build_entry(signal, prediction, confidence, probas, time_ms, feats)
+            for signal, prediction, confidence, probas, time_ms, feats
+            in zip(signals, predictions, confidences, probabilities, processing_time, features)
+        ]
+        self._write_entries(log_entries)
+    
+    def _build_entry(self, signal, prediction, confidence, probabilities, processing_time,
+                     features=None) -> Dict:
+        """Construire une entrée de log"""
+        if features is not None:
+            # Features 0-3 du FeatureExtractor : mean, std, min, max (déjà calculées)
+            mean, std, min_, max_ = (float(x) for x in features[:4])
+        else:
+            mean, std, min_, max_ = (float(np.mean(signal)), float(np.std(signal)),
+                                     float(np.min(signal)), float(np.max(signal)))
+        
+        entry = {
             "timestamp": datetime.now().isoformat(),
             "prediction": prediction,
             "confidence": float(confidence),
             "probabilities": probabilities,
             "signal_stats": {
-                "mean": float(np.mean(signal)),
-                "std": float(np.std(signal)),
-                "min": float(np.min(signal)),
-                "max": float(np.max(signal)),
+                "mean": mean,
+                "std": std,
+                "min": min_,
+                "max": max_,
                 "length": len(signal)
             },
             "processing_time_ms": processing_time
         }
-        
+        if features is not None:
+            # Skewness/kurtosis NaN pour une époque constante : null (JSON valide)
+            entry["features"] = [float(x) if np.isfinite(x) else None for x in features]
+        return entry
+    
+    def _write_entries(self, log_entries: List[Dict]):
+        """Ajouter des entrées au buffer mémoire et au fichier de log (un seul open/write)"""
+        with self._lock:
+            for entry in log_entries:
+                self.buffer.append(entry)
         try:
-            with open(self.log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            lines = [json.dumps(entry) for entry in log_entries]
+            if self.writer is not None:
+                self.writer.submit(lines)
+            else:
+                self.store.append(lines)
         except Exception as e:
             logger.error(f"Erreur lors du logging : {e}")
     
+    def flush(self):
+        """Attendre l'écriture des logs en file"""
+        if self.writer is not None:
+            self.writer.flush()
+    
+    def close(self):
+        """Écrire les logs en attente et arrêter l'écrivain de fond"""
+        if self.writer is not None:
+            self.writer.close()
+    
+    def get_writer_metrics(self) -> Dict:
+        """Compteurs de l'écrivain de logs (écrits, abandonnés, en attente)"""
+        if self.writer is None:
+            return {"async_writes": False}
+        return {"async_writes": True, **self.writer.get_metrics()}
+    
     def get_recent_logs(self, n: int = 100) -> List[Dict]:
-        """Récupérer les N derniers logs"""
-        if not self.log_file.exists():
-            return []
-        
+        """Récupérer les N derniers logs (mémoire, sinon lecture depuis la fin du fichier)"""
+        with self._lock:
+            if self.buffer.has_records(n):
+                return self.buffer.recent(n)
+        self.flush()
         try:
-            with open(self.log_file, 'r') as f:
-                lines = f.readlines()
-                return [json.loads(line) for line in lines[-n:]]
+            return [json.loads(line) for line in self.store.tail(n)]
         except Exception as e:
             logger.error(f"Erreur lecture logs : {e}")
             return []
     
+    def _in_buffer(self, n: int) -> bool:
+        """Vrai si les N dernières prédictions sont toutes dans le buffer mémoire."""
+        return n <= len(self.buffer) or self.buffer.holds_all()
+    
     def get_statistics(self, last_n: int = 100) -> Dict:
         """Calculer des statistiques sur les dernières prédictions"""
-        logs = self.get_recent_logs(last_n)
+        with self._lock:
+            if self._in_buffer(last_n):
+                n = min(last_n, len(self.buffer))
+                if n <= 0:
+                    return {
+                        "message": "No predictions logged yet",
+                        "total_predictions": 0
+                    }
+                return self._statistics_from_window(self.buffer.window(n))
+        
+        # Fenêtre plus grande que le buffer : relecture du fichier
+        return self._statistics_from_logs(self.get_recent_logs(last_n))
+    
+    def _statistics_from_window(self, window: Dict) -> Dict:
+        """Statistiques à partir des agrégats du buffer (O(1))"""
+        n = window["count"]
+        mean = window["confidence_sum"] / n
+        variance = max(window["confidence_sq_sum"] / n - mean * mean, 0.0)
         
+        return {
+            "total_predictions": n,
+            "time_range": {
+                "first": window["first_timestamp"],
+                "last": window["last_timestamp"]
+            },
+            "class_distribution": dict(sorted(window["class_counts"].items())),
+            "confidence_stats": {
+                "mean": float(mean),
+                "std": float(np.sqrt(variance)),
+                "min": window["confidence_min"],
+                "max": window["confidence_max"]
+            },
+            "confidence_by_class": {
+                cls: total / window["class_counts"][cls]
+                for cls, total in window["class_confidence_sum"].items()
+            },
+            "avg_processing_time_ms": (
+                window["processing_time_sum"] / window["processing_time_n"]
+                if window["processing_time_n"] else 0
+            ),
+            "last_prediction": window["last"]
+        }
+    
+    def _statistics_from_logs(self, logs: List[Dict]) -> Dict:
+        """Statistiques à partir des entrées de log relues du fichier"""
         if not logs:
             return {
                 "message": "No predictions logged yet",
@@ -107,6 +404,11 @@ class SimpleMonitor:
     
     def detect_drift(self, threshold: float = 0.1, window_size: int = 50) -> Dict:
         """Détecter une potentielle dérive du modèle"""
+        with self._lock:
+            if self._in_buffer(window_size * 2):
+                return self._drift_from_buffer(threshold, window_size)
+        
+        # Fenêtres plus grandes que le buffer : relecture du fichier
         logs = self.get_recent_logs(window_size * 2)
         
         if len(logs) < window_size:
@@ -147,4 +449,42 @@ class SimpleMonitor:
                 "older": older_dist
             },
             "recommendation": "Retrain model" if drift else "Model performing normally"
-        }
\ No newline at end of file
+        }
+    
+    def _drift_from_buffer(self, threshold: float, window_size: int) -> Dict:
+        """Détection de drift à partir des agrégats du buffer (O(1))"""
+        available = len(self.buffer)
+        
+        # Il faut au moins une prédiction dans la fenêtre "ancienne"
+        if available <= window_size:
+            return {
+                "drift_detected": False, 
+                "message": "Not enough data for drift detection",
+                "required_samples": window_size,
+                "current_samples": available
+            }
+        
+        recent = self.buffer.window(window_size)
+        older = self.buffer.window(min(window_size, available - window_size), offset=window_size)
+        
+        # Comparer les confidences récentes vs anciennes
+        recent_avg = recent["confidence_sum"] / recent["count"]
+        older_avg = older["confidence_sum"] / older["count"]
+        
+        difference = abs(recent_avg - older_avg)
+        drift = bool(difference > threshold)
+        
+        return {
+            "drift_detected": drift,
+            "confidence_drift": {
+                "recent_avg": float(recent_avg),
+                "older_avg": float(older_avg),
+                "difference": float(difference),
+                "threshold": threshold
+            },
+            "class_distribution_shift": {
+                "recent": dict(sorted(recent["class_counts"].items())),
+                "older": dict(sorted(older["class_counts"].items()))
+            },
+            "recommendation": "Retrain model" if drift else "Model performing normally"
+        }
@@ -0,0 +1,86 @@
+"""
+Cache LRU en mémoire des prédictions (époques identiques).
+
+Le dashboard, les retries après timeout et les uploads en double envoient
+des signaux identiques octet pour octet : le cache évite de repasser dans
+la RandomForest. Clé : (version du modèle, empreinte BLAKE2b de l'époque),
+voir `app.digest`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    Cache LRU borné avec expiration (TTL), thread-safe.
+
+    Les entrées expirées sont supprimées à la lecture ; au-delà de
+    `capacity` entrées, la moins récemment utilisée est évincée.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = 600.0):
+        """
+        Args:
+            capacity: Nombre maximum d'époques en cache
+            ttl: Durée de vie d'une entrée (s), None pour aucune expiration
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé → (expiration, valeur)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retourne la valeur en cache, ou None (absente ou expirée)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Ajoute ou remplace une entrée."""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_metrics(self) -> Dict:
+        """Compteurs du cache : taille, hits, misses, taux de hit, évictions, expirations."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations
+            }
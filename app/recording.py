@@ -0,0 +1,258 @@
+"""
+Scoring d'enregistrements complets (nuit de polysomnographie).
+
+Le signal continu arrive par morceaux (upload streamé, fichier lu par blocs,
+arrays successifs) et est découpé à la volée en époques de 30 s
+(3000 points à 100Hz), regroupées en batchs de taille fixe pour le modèle.
+La mémoire reste bornée à un batch d'époques quelle que soit la durée
+de l'enregistrement.
+
+Utilisation (API Python) :
+    for epoch in score_recording(classifier, chunks, dtype="float32"):
+        print(epoch["epoch"], epoch["predicted_class"])
+
+    for epoch in score_edf(classifier, "SC4001E0-PSG.edf", channel="EEG Fpz-Cz"):
+        ...
+
+    # Hypnogramme lissé (HMM, décodage à retard fixe) : champs smoothed_*
+    smoother = HypnogramSmoother.load("models/hypnogram_transitions.json")
+    for epoch in score_recording(classifier, chunks, smoother=smoother):
+        print(epoch["epoch"], epoch["smoothed_class"])
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+from app.models import to_signal_array
+from app.signal_codec import RAW_DTYPES
+from app.smoothing import CLASS_NAMES, DEFAULT_LAG
+
+# Durée d'une époque (s) pour l'horodatage de l'hypnogramme
+EPOCH_SECONDS = 30.0
+
+
+class EpochAssembler:
+    """
+    Découpe un signal continu reçu par morceaux en batchs d'époques.
+
+    Les morceaux peuvent avoir n'importe quelle taille (y compris couper un
+    flottant en deux pour les octets bruts) : le reliquat est conservé
+    jusqu'au morceau suivant. Chaque batch émis est un nouvel array
+    (N, epoch_len) validé (float64, sans NaN/inf) ; le buffer interne
+    n'est jamais réutilisé après émission.
+    """
+
+    def __init__(self, dtype: str = "float32", epoch_len: int = 3000,
+                 batch_size: int = 256):
+        """
+        Args:
+            dtype: 'float32' ou 'float64' pour les octets bruts little-endian
+            epoch_len: Longueur d'une époque (points)
+            batch_size: Nombre d'époques par batch émis
+        """
+        if dtype not in RAW_DTYPES:
+            raise ValueError(f"dtype non supporté: '{dtype}' (attendu: {', '.join(RAW_DTYPES)})")
+        if batch_size < 1:
+            raise ValueError("batch_size doit être >= 1")
+        self.dtype = RAW_DTYPES[dtype]
+        self.epoch_len = epoch_len
+        self.batch_size = batch_size
+
+        self.n_epochs = 0           # Époques émises
+        self.discarded_samples = 0  # Points d'une époque incomplète en fin de signal
+        self._partial = b""         # Octets d'un flottant incomplet
+        self._new_buffer()
+
+    def _new_buffer(self):
+        self._buffer = np.empty(self.batch_size * self.epoch_len)
+        self._filled = 0
+
+    @property
+    def pending_samples(self) -> int:
+        """Points reçus mais pas encore émis dans un batch."""
+        return self._filled
+
+    def feed_bytes(self, chunk: bytes) -> Iterator[np.ndarray]:
+        """Ajoute des octets bruts et émet les batchs complets."""
+        data = self._partial + bytes(chunk) if self._partial else chunk
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._partial = bytes(data[usable:])
+        if usable:
+            yield from self.feed_samples(np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize))
+
+    def feed_samples(self, samples) -> Iterator[np.ndarray]:
+        """Ajoute des points (array-like 1D) et émet les batchs complets."""
+        samples = np.asarray(samples).reshape(-1)
+        capacity = self._buffer.size
+        while samples.size:
+            take = min(capacity - self._filled, samples.size)
+            self._buffer[self._filled:self._filled + take] = samples[:take]
+            self._filled += take
+            samples = samples[take:]
+            if self._filled == capacity:
+                yield self._emit(self.batch_size)
+
+    def finish(self) -> Iterator[np.ndarray]:
+        """
+        Émet le dernier batch (époques complètes restantes).
+
+        Les points d'une époque incomplète en fin d'enregistrement sont
+        ignorés (voir `discarded_samples`).
+        """
+        n_epochs = self._filled // self.epoch_len
+        self.discarded_samples = self._filled % self.epoch_len + len(self._partial) // self.dtype.itemsize
+        if n_epochs:
+            yield self._emit(n_epochs)
+        self._partial = b""
+        self._new_buffer()
+
+    def _emit(self, n_epochs: int) -> np.ndarray:
+        batch = self._buffer[:n_epochs * self.epoch_len].reshape(n_epochs, self.epoch_len)
+        self._new_buffer()
+        self.n_epochs += n_epochs
+        return to_signal_array(batch)
+
+
+def hypnogram_entries(results: List, first_epoch: int,
+                      epoch_seconds: float = EPOCH_SECONDS) -> List[Dict]:
+    """
+    Convertit les résultats de `SleepStageClassifier.predict_batch`
+    en lignes d'hypnogramme (une par époque).
+    """
+    return [
+        {
+            "epoch": first_epoch + i,
+            "start_s": (first_epoch + i) * epoch_seconds,
+            "predicted_class": predicted_class,
+            "predicted_index": predicted_index,
+            "confidence": confidence,
+            "probabilities": probas
+        }
+        for i, (predicted_class, predicted_index, confidence, probas) in enumerate(results)
+    ]
+
+
+class HypnogramSmoothing:
+    """
+    Lissage en flux des lignes d'hypnogramme (HMM, voir app/smoothing.py).
+
+    Les lignes sont retenues jusqu'à la décision de leur stade lissé
+    (au moins `lag` époques plus tard), complétées par `smoothed_class`
+    et `smoothed_index`, puis émises dans l'ordre.
+    """
+
+    def __init__(self, smoother, lag: int = DEFAULT_LAG):
+        """
+        Args:
+            smoother: HypnogramSmoother (transitions apprises)
+            lag: Contexte futur minimal (époques) avant de décider un stade
+        """
+        self.decoder = smoother.stream(lag)
+        self._pending: List[Dict] = []
+
+    def add(self, entries: List[Dict]) -> List[Dict]:
+        """Ajoute les lignes d'un batch ; retourne les lignes dont le stade lissé est décidé."""
+        self._pending.extend(entries)
+        probabilities = np.array([list(entry["probabilities"].values()) for entry in entries])
+        return self._release(self.decoder.push(probabilities))
+
+    def finish(self) -> List[Dict]:
+        """Lignes restantes, en fin d'enregistrement."""
+        return self._release(self.decoder.finish())
+
+    def _release(self, stages: np.ndarray) -> List[Dict]:
+        released, self._pending = self._pending[:len(stages)], self._pending[len(stages):]
+        for entry, stage in zip(released, stages):
+            entry["smoothed_class"] = CLASS_NAMES[stage]
+            entry["smoothed_index"] = int(stage)
+        return released
+
+
+def score_recording(classifier, chunks: Iterable, dtype: str = "float32",
+                    batch_size: int = 256, epoch_len: int = 3000,
+                    assembler: Optional[EpochAssembler] = None,
+                    smoother=None, lag: int = DEFAULT_LAG) -> Iterator[Dict]:
+    """
+    Score un enregistrement complet et produit l'hypnogramme époque par époque.
+
+    Args:
+        classifier: SleepStageClassifier chargé
+        chunks: Itérable de morceaux du signal continu, `bytes` (flottants
+                little-endian de type `dtype`) ou array-like de points
+        dtype: dtype des morceaux binaires ('float32' ou 'float64')
+        batch_size: Nombre d'époques prédites par appel au modèle
+        epoch_len: Longueur d'une époque (points)
+        assembler: EpochAssembler à utiliser (pour consulter ses compteurs)
+        smoother: HypnogramSmoother pour ajouter le stade lissé (optionnel)
+        lag: Retard du lissage (époques)
+
+    Yields:
+        Dict par époque : epoch, start_s, predicted_class, predicted_index,
+        confidence, probabilities (+ smoothed_class, smoothed_index)
+
+    Raises:
+        ValueError: Si le signal contient des valeurs NaN ou infinies
+    """
+    if assembler is None:
+        assembler = EpochAssembler(dtype=dtype, epoch_len=epoch_len, batch_size=batch_size)
+
+    def batches():
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                yield from assembler.feed_bytes(chunk)
+            else:
+                yield from assembler.feed_samples(chunk)
+        yield from assembler.finish()
+
+    yield from score_epoch_batches(classifier, batches(), smoother, lag)
+
+
+def score_epoch_batches(classifier, batches: Iterable[np.ndarray],
+                        smoother=None, lag: int = DEFAULT_LAG) -> Iterator[Dict]:
+    """
+    Score des batchs d'époques consécutives (N, 3000) d'un même enregistrement.
+
+    Yields:
+        Dict par époque, numérotées en continu d'un batch à l'autre
+        (retardées de `lag` époques avec `smoother`)
+    """
+    smoothing = HypnogramSmoothing(smoother, lag) if smoother is not None else None
+    first_epoch = 0
+    for batch in batches:
+        entries = hypnogram_entries(classifier.predict_batch(batch), first_epoch)
+        yield from smoothing.add(entries) if smoothing is not None else entries
+        first_epoch += len(batch)
+    if smoothing is not None:
+        yield from smoothing.finish()
+
+
+def score_edf(classifier, path, channel=0, batch_size: int = 256,
+              fs: int = 100, epoch_len: int = 3000,
+              smoother=None, lag: int = DEFAULT_LAG) -> Iterator[Dict]:
+    """
+    Score un canal d'un fichier EDF, lu par batchs mappés en mémoire.
+
+    Args:
+        classifier: SleepStageClassifier chargé
+        path: Chemin du fichier .edf (ex. `SC4001E0-PSG.edf`)
+        channel: Index ou nom du canal (ex. 'EEG Fpz-Cz')
+        batch_size: Nombre d'époques lues et prédites à la fois
+        fs: Fréquence d'échantillonnage attendue par le modèle (Hz)
+        epoch_len: Longueur d'une époque (points)
+        smoother: HypnogramSmoother pour ajouter le stade lissé (optionnel)
+        lag: Retard du lissage (époques)
+
+    Raises:
+        ValueError: Si la fréquence du canal ne correspond pas au modèle
+    """
+    from app.edf import EdfReader
+
+    reader = EdfReader(path)
+    signal = reader.signal(channel)
+    if signal.fs != fs:
+        raise ValueError(f"Canal '{signal.label}' à {signal.fs:g} Hz, {fs} Hz attendus")
+    yield from score_epoch_batches(
+        classifier,
+        (to_signal_array(batch) for batch in reader.iter_epoch_batches(channel, batch_size, epoch_len)),
+        smoother, lag
+    )
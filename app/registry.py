@@ -0,0 +1,261 @@
+"""
+Registre des modèles : liste des artefacts disponibles et changement à chaud.
+
+Changer de modèle demandait un redémarrage de l'API (et un démarrage à
+froid). Le registre charge le nouveau modèle dans un thread dédié,
+le préchauffe (premières prédictions : imports paresseux, pages des
+tableaux mappés, caches BLAS), puis le substitue à l'ancien en une seule
+affectation de référence. Les requêtes en cours gardent la référence
+qu'elles ont prise et se terminent sur l'ancien modèle, libéré ensuite
+par le ramasse-miettes.
+
+Artefacts reconnus dans les dossiers scannés :
+    *.joblib          pipeline sklearn (backends 'sklearn', 'flat')
+    dossier/          artefact mappable en mémoire (app/model_artifact.py)
+    *.npz             CNN exporté en NumPy (app/cnn.py, backend 'cnn')
+    *.json            configuration d'ensemble (app/ensemble.py, backend 'ensemble')
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.ensemble import ENSEMBLE_BACKEND, load_classifier
+from app.ml_model import SleepStageClassifier
+from app.model_artifact import is_artifact, read_metadata
+
+logger = logging.getLogger(__name__)
+
+# Backends possibles par type d'artefact (le premier est le défaut)
+_KIND_BACKENDS = {
+    'pipeline': ('sklearn', 'flat'),
+    'artifact': ('flat', 'sklearn'),
+    'cnn': ('cnn',),
+    'ensemble': (ENSEMBLE_BACKEND,)
+}
+
+# Historique des chargements conservé (les plus récents)
+_HISTORY_SIZE = 20
+
+
+class ModelLoadInProgress(RuntimeError):
+    """Un chargement est déjà en cours : un seul à la fois."""
+
+
+class ModelRegistry:
+    """
+    Modèles disponibles, modèle actif et chargement en arrière-plan.
+    
+    `on_swap(classifier)` est appelé avec chaque nouveau modèle actif
+    (l'API y remplace sa référence globale).
+    """
+    
+    def __init__(self, roots: Sequence[Path], on_swap: Callable[[SleepStageClassifier], None],
+                 prediction_cache=None, warmup_epochs: int = 32, base_dir: Optional[Path] = None):
+        """
+        Args:
+            roots: Dossiers scannés pour trouver les modèles
+            on_swap: Appelé avec le nouveau classificateur après le préchauffage
+            prediction_cache: Cache de prédictions rattaché à chaque modèle chargé
+            warmup_epochs: Taille du batch synthétique de préchauffage
+            base_dir: Dossier de référence des identifiants (chemins relatifs)
+        """
+        self.roots = [Path(root) for root in roots]
+        self.on_swap = on_swap
+        self.prediction_cache = prediction_cache
+        self.warmup_epochs = warmup_epochs
+        self.base_dir = Path(base_dir) if base_dir is not None else None
+        self.active: Optional[Dict] = None
+        self.loading: Optional[Dict] = None
+        self.history: List[Dict] = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    
+    def _model_id(self, path: Path) -> str:
+        if self.base_dir is not None:
+            try:
+                return str(path.resolve().relative_to(self.base_dir.resolve()))
+            except ValueError:
+                pass
+        return str(path)
+    
+    def list_models(self) -> List[Dict]:
+        """
+        Artefacts disponibles dans les dossiers scannés, avec leurs métadonnées.
+        
+        Les fichiers non reconnus (paramètres .pkl, résultats) sont ignorés.
+        """
+        models = []
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for path in sorted(root.rglob("*")):
+                # Dossiers temporaires (".nom.tmp") et fichiers internes des artefacts ignorés
+                if path.name.startswith(".") or any(is_artifact(parent) for parent in path.parents):
+                    continue
+                kind = _artifact_kind(path)
+                if kind is None:
+                    continue
+                stat = (path / "metadata.json" if kind == 'artifact' else path).stat()
+                models.append({
+                    "model_id": self._model_id(path),
+                    "path": str(path),
+                    "kind": kind,
+                    "backends": list(_KIND_BACKENDS[kind]),
+                    "size_bytes": _size(path),
+                    "modified": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stat.st_mtime)),
+                    "metadata": _read_metadata(path, kind),
+                    "active": self.active is not None and Path(self.active["path"]).resolve() == path.resolve()
+                })
+        return models
+    
+    def find(self, model_id: str) -> Dict:
+        """
+        Entrée de `list_models` pour cet identifiant.
+        
+        Raises:
+            KeyError: Si aucun artefact ne porte cet identifiant
+        """
+        for entry in self.list_models():
+            if entry["model_id"] == model_id:
+                return entry
+        raise KeyError(model_id)
+    
+    def load(self, path: Path, backend: str) -> Dict:
+        """
+        Charge, préchauffe et active un modèle (bloquant).
+        
+        Returns:
+            Enregistrement du modèle actif (chemin, backend, temps de
+            chargement et de préchauffage en ms)
+        """
+        path = Path(path)
+        record = {
+            "model_id": self._model_id(path), "path": str(path), "backend": backend,
+            "status": "loading", "started_at": time.time()
+        }
+        with self._lock:
+            self.loading = record
+        try:
+            start = time.perf_counter()
+            classifier = load_classifier(path, backend)
+            record["load_time_ms"] = (time.perf_counter() - start) * 1000
+            
+            record["status"] = "warming_up"
+            record["warmup_ms"] = self._warm_up(classifier)
+            classifier.set_prediction_cache(self.prediction_cache)
+        except Exception as e:
+            record.update(status="failed", error=str(e))
+            logger.error(f"❌ Chargement de {path} ({backend}) échoué : {e}")
+            self._finish(record)
+            raise
+        
+        record["status"] = "active"
+        record["activated_at"] = time.time()
+        # Substitution atomique : une seule affectation de référence
+        self.on_swap(classifier)
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+        with self._lock:
+            if self.active is not None:
+                self.active["status"] = "replaced"
+            self.active = record
+        self._finish(record)
+        logger.info(f"🔄 Modèle actif : {record['model_id']} ({backend}), chargé en "
+                    f"{record['load_time_ms']:.0f} ms, préchauffé en {record['warmup_ms']:.0f} ms")
+        return record
+    
+    def load_async(self, model_id: str, backend: Optional[str] = None) -> Future:
+        """
+        Lance le chargement d'un modèle du registre en arrière-plan.
+        
+        Raises:
+            KeyError: Si l'identifiant est inconnu
+            ValueError: Si le backend n'est pas supporté par ce type d'artefact
+            ModelLoadInProgress: Si un chargement est déjà en cours
+        """
+        entry = self.find(model_id)
+        backend = backend or entry["backends"][0]
+        if backend not in entry["backends"]:
+            raise ValueError(f"Backend '{backend}' non supporté pour {model_id} (supportés: {', '.join(entry['backends'])})")
+        with self._lock:
+            if self.loading is not None:
+                raise ModelLoadInProgress(f"Chargement en cours : {self.loading['model_id']}")
+            # Réservé avant la soumission : deux appels simultanés ne chargent pas deux modèles
+            self.loading = {"model_id": model_id, "path": entry["path"], "backend": backend, "status": "queued"}
+        return self._pool.submit(self.load, Path(entry["path"]), backend)
+    
+    def _warm_up(self, classifier: SleepStageClassifier) -> float:
+        """Premières prédictions (1 époque puis un batch) sur des signaux synthétiques ; durée en ms."""
+        signals = np.random.default_rng(0).normal(scale=20.0, size=(self.warmup_epochs, 3000))
+        start = time.perf_counter()
+        classifier.predict_batch(signals[:1])
+        classifier.predict_batch(signals)
+        return (time.perf_counter() - start) * 1000
+    
+    def _finish(self, record: Dict):
+        with self._lock:
+            self.loading = None
+            self.history = (self.history + [record])[-_HISTORY_SIZE:]
+    
+    def get_status(self) -> Dict:
+        """Modèle actif, chargement en cours et historique des chargements."""
+        with self._lock:
+            return {
+                "active": self.active,
+                "loading": self.loading,
+                "history": list(self.history)
+            }
+    
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+def _artifact_kind(path: Path) -> Optional[str]:
+    """Type d'artefact reconnu ('pipeline', 'artifact', 'cnn'), ou None."""
+    if path.is_dir():
+        return 'artifact' if is_artifact(path) else None
+    if path.suffix == '.joblib':
+        return 'pipeline'
+    if path.suffix == '.json':
+        try:
+            config = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return 'ensemble' if isinstance(config, dict) and isinstance(config.get("members"), list) else None
+    if path.suffix == '.npz':
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return 'cnn' if 'header' in data.files else None
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def _read_metadata(path: Path, kind: str) -> Dict:
+    """Métadonnées lisibles sans charger le modèle."""
+    try:
+        if kind == 'artifact':
+            return read_metadata(path)
+        if kind == 'cnn':
+            with np.load(path, allow_pickle=False) as data:
+                return json.loads(str(data["header"])).get("info", {})
+        if kind == 'ensemble':
+            config = json.loads(path.read_text())
+            return {**config.get("info", {}), "members": config["members"]}
+        metadata_file = path.with_name("metadata.json")
+        return json.loads(metadata_file.read_text()) if metadata_file.is_file() else {}
+    except (OSError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+    return path.stat().st_size
@@ -0,0 +1,159 @@
+"""
+Décodage des formats binaires de signaux EEG.
+
+Alternative au JSON `{"signal": [...]}` : le signal est envoyé tel quel
+en mémoire et décodé sans copie avec `np.frombuffer`, sans parser
+3000 nombres JSON ni créer d'objets float Python.
+
+Formats supportés (header Content-Type) :
+- application/octet-stream : float32/float64 little-endian bruts
+- application/base64       : mêmes octets, encodés en base64
+- application/x-npy        : fichier .npy (np.save), dtype et shape inclus ;
+                             shape (epoch_len,) ou (N, epoch_len) uniquement
+"""
+
+import base64
+import io
+import numpy as np
+
+from app.models import to_signal_array
+
+# Types de contenu acceptés
+OCTET_STREAM = "application/octet-stream"
+BASE64 = "application/base64"
+NPY = "application/x-npy"
+SUPPORTED_CONTENT_TYPES = (OCTET_STREAM, BASE64, NPY)
+
+# dtypes acceptés pour les octets bruts (little-endian)
+RAW_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float64": np.dtype("<f8"),
+}
+
+# Taille maximale de l'en-tête d'un fichier .npy (magic + longueur + header 2.0)
+NPY_HEADER_MAX_SIZE = 12 + 65535
+
+_NPY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+class UnsupportedContentType(ValueError):
+    """Type de contenu non supporté par le décodeur."""
+
+
+def decode_signals(body: bytes, content_type: str, dtype: str = "float32",
+                   epoch_len: int = 3000) -> np.ndarray:
+    """
+    Décode un payload binaire en matrice d'époques.
+    
+    Args:
+        body: Octets bruts de la requête
+        content_type: Header Content-Type (paramètres ignorés)
+        dtype: 'float32' ou 'float64' pour les formats bruts/base64
+               (ignoré pour .npy, qui porte son propre dtype)
+        epoch_len: Longueur d'une époque
+    
+    Returns:
+        Array float64 de shape (N, epoch_len), vue en lecture seule sur `body`
+        pour du float64 little-endian
+    
+    Raises:
+        UnsupportedContentType: Si le Content-Type n'est pas supporté
+        ValueError: Si le payload est invalide (taille, dtype, shape .npy, NaN/inf)
+    """
+    media_type = _media_type(content_type)
+    
+    if media_type == OCTET_STREAM:
+        signals = _decode_raw(body, dtype)
+    elif media_type == BASE64:
+        try:
+            raw = base64.b64decode(body, validate=True)
+        except ValueError as e:
+            raise ValueError(f"Payload base64 invalide: {e}")
+        signals = _decode_raw(raw, dtype)
+    elif media_type == NPY:
+        signals = _decode_npy(body, epoch_len)
+    else:
+        raise UnsupportedContentType(
+            f"Content-Type non supporté: '{media_type}' "
+            f"(attendu: {', '.join(SUPPORTED_CONTENT_TYPES)})"
+        )
+    
+    if signals.size == 0 or signals.size % epoch_len != 0:
+        raise ValueError(
+            f"Le nombre de valeurs ({signals.size}) doit être un multiple non nul de {epoch_len}"
+        )
+    signals = signals.reshape(-1, epoch_len)
+    
+    # Même validation que les requêtes JSON ; sans copie pour du float64,
+    # une seule conversion pour du float32 (faite de toute façon par le modèle)
+    return to_signal_array(signals)
+
+
+def max_payload_size(content_type: str, dtype: str, n_epochs: int,
+                     epoch_len: int = 3000) -> int:
+    """
+    Taille maximale (octets) d'un payload de `n_epochs` époques.
+    
+    Permet de rejeter un corps trop grand avant de le lire entièrement
+    et de le décoder (le décodage float32 → float64 double la mémoire).
+    Les fichiers .npy portent leur propre dtype : borne calculée en float64.
+    """
+    media_type = _media_type(content_type)
+    if media_type == NPY:
+        return n_epochs * epoch_len * 8 + NPY_HEADER_MAX_SIZE
+    itemsize = RAW_DTYPES[dtype].itemsize if dtype in RAW_DTYPES else 8
+    raw_size = n_epochs * epoch_len * itemsize
+    if media_type == BASE64:
+        return 4 * -(-raw_size // 3)
+    return raw_size
+
+
+def _media_type(content_type: str) -> str:
+    """Content-Type sans paramètres, en minuscules."""
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def _decode_raw(body: bytes, dtype: str) -> np.ndarray:
+    """Octets little-endian bruts → array 1D (sans copie)."""
+    if dtype not in RAW_DTYPES:
+        raise ValueError(f"dtype non supporté: '{dtype}' (attendu: {', '.join(RAW_DTYPES)})")
+    np_dtype = RAW_DTYPES[dtype]
+    if len(body) % np_dtype.itemsize != 0:
+        raise ValueError(
+            f"Taille du payload ({len(body)} octets) non multiple de {np_dtype.itemsize} ({dtype})"
+        )
+    return np.frombuffer(body, dtype=np_dtype)
+
+
+def _decode_npy(body: bytes, epoch_len: int) -> np.ndarray:
+    """Fichier .npy → array (sans copie, seul l'en-tête est parsé)."""
+    header = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(header)
+        read_header = _NPY_HEADER_READERS.get(version)
+        if read_header is None:
+            raise ValueError(f"version .npy non supportée: {version}")
+        shape, fortran_order, np_dtype = read_header(header)
+    except ValueError as e:
+        raise ValueError(f"Fichier .npy invalide: {e}")
+    
+    if np_dtype.kind != "f":
+        raise ValueError(f"Le fichier .npy doit contenir des flottants, reçu {np_dtype}")
+    
+    # Une époque par ligne : toute autre shape (ex. une époque par colonne)
+    # serait remise à plat dans le mauvais ordre
+    if shape != (epoch_len,) and (len(shape) != 2 or shape[1] != epoch_len):
+        raise ValueError(
+            f"Le fichier .npy doit avoir la shape ({epoch_len},) ou (N, {epoch_len}), reçu {shape}"
+        )
+    
+    count = int(np.prod(shape))
+    offset = header.tell()
+    if len(body) - offset != count * np_dtype.itemsize:
+        raise ValueError("Fichier .npy tronqué ou corrompu")
+    
+    signals = np.frombuffer(body, dtype=np_dtype, count=count, offset=offset)
+    return signals.reshape(shape, order="F" if fortran_order else "C")
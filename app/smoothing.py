@@ -0,0 +1,297 @@
+"""
+Lissage temporel de l'hypnogramme (HMM + Viterbi).
+
+Les stades de sommeil sont fortement autocorrélés (un epoch N2 isolé au
+milieu de N3 est presque toujours une erreur) alors que le classificateur
+score chaque époque seule. Le lissage traite la matrice de probabilités
+(N, 5) d'un enregistrement comme les émissions d'un HMM dont la matrice
+de transition est apprise sur des hypnogrammes d'entraînement, et décode
+la séquence de stades la plus probable (Viterbi).
+
+Émissions : log p(stade | époque) - log p(stade) (vraisemblances
+normalisées d'un modèle hybride). Le pipeline est entraîné sur des
+classes rééquilibrées (SMOTE) : son a priori implicite est uniforme, la
+correction est nulle par défaut (`model_priors`).
+
+Deux modes :
+- `HypnogramSmoother.decode(probabilities)` : nuit entière, une passe ;
+- `smoother.stream(lag)` : décodage à retard fixe, chaque époque est
+  décidée avec au moins `lag` époques de contexte futur (flux NDJSON de
+  /predict/recording).
+
+Les transitions doivent suivre l'ordre des époques dans chaque nuit :
+y_train.npy (split mélangé) ne convient pas, elles sont apprises sur les
+hypnogrammes Sleep-EDF (`*-Hypnogram.edf`, voir fit_transitions.py).
+
+Utilisation :
+    smoother = HypnogramSmoother.load("models/hypnogram_transitions.json")
+    stages = smoother.decode(classifier.predict_proba(epochs))
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Annotations Sleep-EDF → index des classes (N4 fusionné avec N3, comme le preprocessing)
+STAGE_MAPPING = {
+    'Sleep stage W': 0,
+    'Sleep stage 1': 1,
+    'Sleep stage 2': 2,
+    'Sleep stage 3': 3,
+    'Sleep stage 4': 3,
+    'Sleep stage R': 4
+}
+
+CLASS_NAMES = ['Wake', 'N1', 'N2', 'N3', 'REM']
+
+# Retard par défaut du mode flux : 20 époques (10 min)
+DEFAULT_LAG = 20
+
+# Plancher des probabilités avant le log (forêt : probabilités exactement nulles)
+_MIN_PROBABILITY = 1e-6
+
+
+def hypnogram_stages(annotations: Iterable[Tuple[float, float, str]],
+                     epoch_seconds: float = 30.0) -> np.ndarray:
+    """
+    Stade de chaque époque d'un hypnogramme annoté (`EdfReader.annotations`).
+    
+    Returns:
+        Array (n_epochs,) d'index de classes, -1 pour les époques non
+        scorées ou exclues ('Sleep stage ?', 'Movement time')
+    """
+    annotations = list(annotations)
+    if not annotations:
+        return np.empty(0, dtype=np.int64)
+    n_epochs = int(round(max(onset + duration for onset, duration, _ in annotations) / epoch_seconds))
+    stages = np.full(n_epochs, -1, dtype=np.int64)
+    for onset, duration, text in annotations:
+        first = int(round(onset / epoch_seconds))
+        stages[first:first + int(round(duration / epoch_seconds))] = STAGE_MAPPING.get(text, -1)
+    return stages
+
+
+def estimate_transitions(sequences: Iterable[Sequence[int]], n_classes: int = 5,
+                         pseudocount: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Matrice de transition, distribution initiale et fréquences des stades.
+    
+    Seules les paires d'époques consécutives scorées (>= 0) sont comptées ;
+    `pseudocount` (lissage de Laplace) évite les transitions impossibles.
+    
+    Returns:
+        transitions (K, K) (lignes : stade courant), initial (K,),
+        frequencies (K,), n_sequences, n_epochs
+    """
+    transitions = np.full((n_classes, n_classes), float(pseudocount))
+    initial = np.full(n_classes, float(pseudocount))
+    frequencies = np.zeros(n_classes)
+    n_sequences = 0
+    for sequence in sequences:
+        sequence = np.asarray(sequence, dtype=np.int64)
+        scored = sequence[sequence >= 0]
+        if not scored.size:
+            continue
+        n_sequences += 1
+        initial[scored[0]] += 1
+        frequencies += np.bincount(scored, minlength=n_classes)
+        pairs = (sequence[:-1] >= 0) & (sequence[1:] >= 0)
+        np.add.at(transitions, (sequence[:-1][pairs], sequence[1:][pairs]), 1)
+    if not n_sequences:
+        raise ValueError("Aucune époque scorée dans les hypnogrammes")
+    return {
+        'transitions': transitions / transitions.sum(axis=1, keepdims=True),
+        'initial': initial / initial.sum(),
+        'frequencies': frequencies / frequencies.sum(),
+        'n_sequences': n_sequences,
+        'n_epochs': int(frequencies.sum())
+    }
+
+
+class HypnogramSmoother:
+    """
+    HMM à K stades : transitions apprises, émissions = probabilités du classificateur.
+    """
+    
+    def __init__(self, transitions: np.ndarray, initial: Optional[np.ndarray] = None,
+                 model_priors: Optional[np.ndarray] = None, info: Optional[Dict] = None):
+        """
+        Args:
+            transitions: Matrice (K, K) stochastique par ligne
+            initial: Distribution du premier stade (défaut : uniforme)
+            model_priors: A priori des classes du classificateur, retiré
+                des émissions (défaut : uniforme, entraînement rééquilibré)
+            info: Métadonnées (nombre de nuits, d'époques, ...)
+        
+        Raises:
+            ValueError: Si les distributions sont invalides
+        """
+        transitions = np.asarray(transitions, dtype=np.float64)
+        n_classes = len(transitions)
+        if transitions.shape != (n_classes, n_classes) or n_classes > np.iinfo(np.int8).max:
+            raise ValueError(f"Matrice de transition carrée attendue, reçu {transitions.shape}")
+        initial = np.full(n_classes, 1.0 / n_classes) if initial is None else np.asarray(initial, dtype=np.float64)
+        model_priors = (np.full(n_classes, 1.0 / n_classes) if model_priors is None
+                        else np.asarray(model_priors, dtype=np.float64))
+        for name, distribution in (('transitions', transitions), ('initial', initial), ('model_priors', model_priors)):
+            if distribution.shape[-1] != n_classes or np.any(distribution < 0) or \
+                    not np.allclose(distribution.sum(axis=-1), 1.0):
+                raise ValueError(f"'{name}' doit contenir des distributions de probabilité sur {n_classes} classes")
+        
+        self.transitions = transitions
+        self.initial = initial
+        self.model_priors = model_priors
+        self.info = dict(info or {})
+        with np.errstate(divide='ignore'):
+            self.log_transitions = np.log(transitions)
+            self.log_initial = np.log(initial)
+            self._log_priors = np.log(model_priors)
+    
+    @property
+    def n_classes(self) -> int:
+        return len(self.transitions)
+    
+    @classmethod
+    def fit(cls, sequences: Iterable[Sequence[int]], n_classes: int = 5,
+            pseudocount: float = 1.0, **kwargs) -> "HypnogramSmoother":
+        """Apprend le HMM sur des hypnogrammes (séquences d'index, -1 : non scoré)."""
+        estimate = estimate_transitions(sequences, n_classes, pseudocount)
+        info = {
+            'n_sequences': estimate['n_sequences'],
+            'n_epochs': estimate['n_epochs'],
+            'stage_frequencies': estimate['frequencies'].tolist(),
+            'pseudocount': pseudocount
+        }
+        return cls(estimate['transitions'], estimate['initial'], info=info, **kwargs)
+    
+    def save(self, path: Union[str, Path]):
+        """Écrit le HMM en JSON (lisible, versionnable)."""
+        Path(path).write_text(json.dumps({
+            'classes': CLASS_NAMES[:self.n_classes],
+            'transitions': self.transitions.tolist(),
+            'initial': self.initial.tolist(),
+            'model_priors': self.model_priors.tolist(),
+            'info': self.info
+        }, indent=2))
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "HypnogramSmoother":
+        """
+        Relit un HMM écrit par `save`.
+        
+        Raises:
+            ValueError: Si les classes ne sont pas celles du classificateur
+        """
+        config = json.loads(Path(path).read_text())
+        if config.get('classes') != CLASS_NAMES[:len(config['transitions'])]:
+            raise ValueError(f"Classes inattendues: {config.get('classes')}")
+        return cls(config['transitions'], config.get('initial'), config.get('model_priors'), config.get('info'))
+    
+    def emissions(self, probabilities: np.ndarray) -> np.ndarray:
+        """Log-émissions (N, K) à partir des probabilités du classificateur."""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if probabilities.ndim != 2 or probabilities.shape[1] != self.n_classes:
+            raise ValueError(f"Probabilités (N, {self.n_classes}) attendues, reçu {probabilities.shape}")
+        return np.log(np.maximum(probabilities, _MIN_PROBABILITY)) - self._log_priors
+    
+    def decode(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Séquence de stades la plus probable d'un enregistrement complet.
+        
+        Returns:
+            Array (N,) d'index de classes
+        """
+        return viterbi(self.emissions(probabilities), self.log_initial, self.log_transitions)
+    
+    def stream(self, lag: int = DEFAULT_LAG) -> "FixedLagDecoder":
+        """Décodeur à retard fixe pour un enregistrement reçu par batchs."""
+        return FixedLagDecoder(self, lag)
+
+
+class FixedLagDecoder:
+    """
+    Viterbi en flux à retard fixe.
+    
+    Les époques reçues restent en attente tant qu'elles n'ont pas `lag`
+    époques de contexte futur ; le chemin est alors décodé depuis le
+    dernier stade décidé (les stades émis ne changent plus et la séquence
+    émise reste cohérente avec les transitions). Coût par batch :
+    O((lag + batch) × K²). Avec `lag` ≥ longueur de l'enregistrement,
+    le résultat est celui de `HypnogramSmoother.decode`.
+    """
+    
+    def __init__(self, smoother: HypnogramSmoother, lag: int = DEFAULT_LAG):
+        if lag < 0:
+            raise ValueError(f"lag doit être >= 0, reçu {lag}")
+        self.smoother = smoother
+        self.lag = lag
+        self.n_decided = 0
+        self._pending = np.empty((0, smoother.n_classes))
+        self._last_state: Optional[int] = None
+    
+    @property
+    def n_pending(self) -> int:
+        """Époques reçues mais pas encore décidées."""
+        return len(self._pending)
+    
+    def push(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Ajoute les probabilités (N, K) des époques suivantes.
+        
+        Returns:
+            Stades décidés des plus anciennes époques en attente (peut être vide)
+        """
+        self._pending = np.concatenate([self._pending, self.smoother.emissions(probabilities)])
+        return self._decide(len(self._pending) - self.lag)
+    
+    def finish(self) -> np.ndarray:
+        """Décide les époques restantes (fin de l'enregistrement)."""
+        return self._decide(len(self._pending))
+    
+    def _decide(self, n_epochs: int) -> np.ndarray:
+        if n_epochs <= 0:
+            return np.empty(0, dtype=np.int64)
+        start = (self.smoother.log_initial if self._last_state is None
+                 else self.smoother.log_transitions[self._last_state])
+        decided = viterbi(self._pending, start, self.smoother.log_transitions)[:n_epochs]
+        self._pending = self._pending[n_epochs:]
+        self._last_state = int(decided[-1])
+        self.n_decided += n_epochs
+        return decided
+
+
+def viterbi(log_emissions: np.ndarray, log_start: np.ndarray, log_transitions: np.ndarray) -> np.ndarray:
+    """
+    Décodage de Viterbi en log-probabilités.
+    
+    La récurrence est séquentielle dans le temps et vectorisée sur les
+    K × K transitions à chaque pas ; le retour arrière lit un tableau
+    (N, K) de pointeurs int8.
+    
+    Args:
+        log_emissions: (N, K)
+        log_start: (K,) log-probabilité du premier stade (avant émission)
+        log_transitions: (K, K)
+    
+    Returns:
+        Array (N,) d'index de stades (vide si N = 0)
+    """
+    n_epochs, n_classes = log_emissions.shape
+    path = np.empty(n_epochs, dtype=np.int64)
+    if not n_epochs:
+        return path
+    backpointers = np.empty((n_epochs, n_classes), dtype=np.int8)
+    columns = np.arange(n_classes)
+    score = log_start + log_emissions[0]
+    for t in range(1, n_epochs):
+        candidates = score[:, None] + log_transitions
+        best = candidates.argmax(axis=0)
+        backpointers[t] = best
+        score = candidates[best, columns] + log_emissions[t]
+    
+    path[-1] = score.argmax()
+    for t in range(n_epochs - 1, 0, -1):
+        path[t - 1] = backpointers[t, path[t]]
+    return path
@@ -0,0 +1,314 @@
+"""
+Extraction incrémentale des features sur fenêtre glissante (EEG en direct).
+
+En chevet ou en direct, le signal arrive en continu et une estimation du
+stade est attendue toutes les quelques secondes sur les 30 dernières
+secondes. Recalculer `FeatureExtractor` sur chaque fenêtre refait presque
+tout le travail : deux fenêtres successives partagent 3000 - hop points.
+
+`StreamingFeatureExtractor` met à jour les 16 features à chaque pas (hop) :
+
+- moyenne, écart-type, skewness, kurtosis : sommes glissantes des
+  puissances 1 à 4 de (x - décalage), recalculées exactement toutes les
+  `refresh_every` fenêtres pour borner la dérive numérique ;
+- min, max, Q1, Q3 : fenêtre triée tenue à jour (recherche dichotomique
+  des points sortants et entrants, un seul décalage mémoire par pas) ;
+- puissances de bandes : périodogramme de chaque segment de Welch
+  (256 points, pas de 128) calculé une seule fois, puis réutilisé par les
+  fenêtres suivantes ; seule la somme glissante des périodogrammes est
+  mise à jour.
+
+Les segments de Welch sont alignés sur le début de la fenêtre : pour que
+les fenêtres successives partagent leurs segments (et que les features
+restent celles du modèle entraîné), le hop doit être un multiple du pas
+de Welch (128 points = 1.28 s à 100Hz). Les features sont égales à celles
+de `FeatureExtractor.transform` à une tolérance relative de ~1e-9 près.
+
+Utilisation :
+    extractor = StreamingFeatureExtractor(hop=256)
+    for chunk in acquisition:
+        features = extractor.push(chunk)   # (n_fenêtres_complétées, 16)
+    
+    scorer = LiveScorer(classifier, hop=256)
+    entries, features = scorer.feed_bytes(frame)   # une estimation par fenêtre
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+
+from app.feature_extractor import FeatureExtractor, SpectralPlan
+from app.ml_model import SleepStageClassifier
+from app.signal_codec import RAW_DTYPES
+
+# Pas par défaut entre deux estimations : 2 segments de Welch (2.56 s à 100Hz)
+DEFAULT_HOP = 256
+
+# Quantiles Q1 / Q3 (np.percentile, interpolation linéaire)
+QUANTILES = (0.25, 0.75)
+
+
+class StreamingFeatureExtractor:
+    """
+    Features des fenêtres glissantes d'un signal continu.
+    
+    La première fenêtre est émise après `window` points, les suivantes
+    tous les `hop` points. Les morceaux reçus peuvent avoir n'importe
+    quelle taille ; un morceau peut compléter plusieurs fenêtres.
+    """
+    
+    def __init__(self, fs: int = 100, window: int = 3000, hop: int = DEFAULT_HOP,
+                 dtype: str = "float32", refresh_every: Optional[int] = None):
+        """
+        Args:
+            fs: Fréquence d'échantillonnage (Hz)
+            window: Longueur de la fenêtre (points, 30 s à 100Hz)
+            hop: Pas entre deux fenêtres (multiple du pas de Welch)
+            dtype: 'float32' ou 'float64' pour les octets bruts (`feed_bytes`)
+            refresh_every: Fenêtres entre deux recalculs exacts des sommes
+                glissantes (défaut : une fenêtre complète renouvelée)
+        
+        Raises:
+            ValueError: Si le hop ou le dtype sont invalides
+        """
+        if dtype not in RAW_DTYPES:
+            raise ValueError(f"dtype non supporté: '{dtype}' (attendu: {', '.join(RAW_DTYPES)})")
+        plan = SpectralPlan(fs, window)
+        if hop < plan.step or hop > window or hop % plan.step:
+            raise ValueError(
+                f"hop doit être un multiple de {plan.step} points entre {plan.step} et {window}, reçu {hop}"
+            )
+        self.fs = fs
+        self.window = window
+        self.hop = hop
+        self.dtype = RAW_DTYPES[dtype]
+        self.refresh_every = refresh_every or -(-window // hop)
+        self.plan = plan
+        
+        self.n_samples = 0     # Points reçus
+        self.n_windows = 0     # Fenêtres émises
+        self._partial = b""    # Octets d'un flottant incomplet
+        # Tampon contigu : la fenêtre courante est _buffer[_end - window:_end],
+        # précédée des `hop` points qui en sortent au pas suivant
+        self._buffer = np.empty(2 * (window + hop))
+        self._end = 0
+        
+        # États incrémentaux (initialisés par la première fenêtre)
+        self._shift = 0.0
+        self._sums = np.zeros(4)
+        self._sorted = None
+        self._powers = np.zeros((plan.n_segments, len(plan.freqs)))
+        self._power_sum = np.zeros(len(plan.freqs))
+        self._since_refresh = 0
+    
+    def window_end_s(self, index: int) -> float:
+        """Fin (s depuis le début du flux) de la fenêtre numéro `index`."""
+        return (self.window + index * self.hop) / self.fs
+    
+    def feed_bytes(self, chunk: bytes, return_windows: bool = False):
+        """Ajoute des octets bruts little-endian (voir `push`)."""
+        data = self._partial + bytes(chunk) if self._partial else chunk
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._partial = bytes(data[usable:])
+        samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        return self.push(samples, return_windows=return_windows)
+    
+    def push(self, samples, return_windows: bool = False
+             ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Ajoute des points et calcule les features des fenêtres complétées.
+        
+        Args:
+            samples: Points (array-like 1D)
+            return_windows: Retourner aussi les fenêtres (copies) pour les
+                modèles qui travaillent sur le signal brut
+        
+        Returns:
+            features (n, 16), ou tuple (features, fenêtres (n, window))
+        
+        Raises:
+            ValueError: Si le morceau contient des NaN/inf (rien n'est ajouté)
+        """
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1)
+        if not np.all(np.isfinite(samples)):
+            raise ValueError("Le signal contient des valeurs NaN ou infinies")
+        
+        features, windows = [], []
+        while samples.size:
+            # Points manquants avant la prochaine fenêtre
+            target = self.window + self.n_windows * self.hop
+            take = min(target - self.n_samples, samples.size)
+            self._append(samples[:take])
+            samples = samples[take:]
+            if self.n_samples == target:
+                features.append(self._emit())
+                if return_windows:
+                    windows.append(self._current().copy())
+        
+        features = np.array(features).reshape(-1, 16)
+        if return_windows:
+            return features, np.array(windows).reshape(-1, self.window)
+        return features
+    
+    def _append(self, samples: np.ndarray):
+        if self._end + samples.size > self._buffer.size:
+            # Tampon plein : les derniers points utiles reviennent au début (coût amorti O(1) par point)
+            keep = min(self._end, self.window + self.hop)
+            self._buffer[:keep] = self._buffer[self._end - keep:self._end]
+            self._end = keep
+        self._buffer[self._end:self._end + samples.size] = samples
+        self._end += samples.size
+        self.n_samples += samples.size
+    
+    def _current(self) -> np.ndarray:
+        return self._buffer[self._end - self.window:self._end]
+    
+    def _emit(self) -> np.ndarray:
+        window = self._current()
+        if self.n_windows == 0:
+            self._sorted = np.sort(window)
+            self._powers[:] = self._segment_powers(window, self.plan.n_segments)
+            self._refresh(window)
+        else:
+            leaving = self._buffer[self._end - self.window - self.hop:self._end - self.window]
+            entering = window[-self.hop:]
+            self._slide_moments(leaving, entering)
+            self._slide_sorted(leaving, entering)
+            self._slide_powers(window)
+            self._since_refresh += 1
+            if self._since_refresh >= self.refresh_every:
+                self._refresh(window)
+        self.n_windows += 1
+        return self._features()
+    
+    def _refresh(self, window: np.ndarray):
+        """Recalcule exactement les sommes glissantes (décalage = moyenne courante)."""
+        self._shift = float(np.mean(window))
+        centered = window - self._shift
+        sq = centered * centered
+        self._sums = np.array([centered.sum(), sq.sum(), (sq * centered).sum(), (sq * sq).sum()])
+        self._power_sum = self._powers.sum(axis=0)
+        self._since_refresh = 0
+    
+    def _slide_moments(self, leaving: np.ndarray, entering: np.ndarray):
+        old = leaving - self._shift
+        new = entering - self._shift
+        old_sq, new_sq = old * old, new * new
+        self._sums += [new.sum() - old.sum(), new_sq.sum() - old_sq.sum(),
+                       (new_sq * new).sum() - (old_sq * old).sum(), (new_sq * new_sq).sum() - (old_sq * old_sq).sum()]
+    
+    def _slide_sorted(self, leaving: np.ndarray, entering: np.ndarray):
+        """Retire les points sortants et insère les entrants dans la fenêtre triée."""
+        leaving = np.sort(leaving)
+        # Valeurs répétées : une position distincte par occurrence
+        rank = np.arange(leaving.size) - np.searchsorted(leaving, leaving, side='left')
+        positions = np.searchsorted(self._sorted, leaving, side='left') + rank
+        kept = np.delete(self._sorted, positions)
+        entering = np.sort(entering)
+        self._sorted = np.insert(kept, np.searchsorted(kept, entering), entering)
+    
+    def _slide_powers(self, window: np.ndarray):
+        """Périodogrammes des seuls segments entrés dans la fenêtre (anneau indexé par segment absolu)."""
+        n_segments = self.plan.n_segments
+        n_new = min(self.hop // self.plan.step, n_segments)
+        first = self.n_windows * self.hop // self.plan.step
+        slots = np.arange(first + n_segments - n_new, first + n_segments) % n_segments
+        new = self._segment_powers(window, n_new)
+        self._power_sum += new.sum(axis=0) - self._powers[slots].sum(axis=0)
+        self._powers[slots] = new
+    
+    def _segment_powers(self, window: np.ndarray, n_last: int) -> np.ndarray:
+        """Périodogrammes des `n_last` derniers segments de Welch de la fenêtre."""
+        plan = self.plan
+        segments = np.lib.stride_tricks.sliding_window_view(window, plan.nperseg)[::plan.step][:plan.n_segments]
+        return plan.segment_powers(segments[plan.n_segments - n_last:])
+    
+    def _features(self) -> np.ndarray:
+        """16 features de la fenêtre courante, dans l'ordre de `FeatureExtractor`."""
+        features = np.empty(16)
+        n = self.window
+        s1, s2, s3, s4 = self._sums / n
+        d = s1
+        features[0] = self._shift + d
+        m2 = s2 - d * d
+        m3 = s3 - 3 * d * s2 + 2 * d ** 3
+        m4 = s4 - 4 * d * s3 + 6 * d * d * s2 - 3 * d ** 4
+        features[1] = np.sqrt(max(m2, 0.0))
+        features[2] = self._sorted[0]
+        features[3] = self._sorted[-1]
+        features[4:6] = [_sorted_quantile(self._sorted, q) for q in QUANTILES]
+        with np.errstate(all='ignore'):
+            # Signal constant → NaN, comme FeatureExtractor
+            constant = m2 <= (np.finfo(np.float64).resolution * features[0]) ** 2
+            features[6] = np.nan if constant else m3 / m2 ** 1.5
+            features[7] = np.nan if constant else m4 / m2 ** 2 - 3.0
+        
+        psd = self._power_sum[np.newaxis] / self.plan.n_segments * self.plan.bin_weights
+        features[8:13] = self.plan.band_powers_from_psd(psd)[0]
+        total_power = features[8:13].sum()
+        features[13:16] = features[8:11] / total_power if total_power > 0 else 0.0
+        return features
+
+
+def _sorted_quantile(sorted_values: np.ndarray, q: float) -> float:
+    """Quantile d'un tableau trié, interpolation linéaire de np.percentile (même formule)."""
+    position = (sorted_values.size - 1) * q
+    low = int(np.floor(position))
+    high = min(low + 1, sorted_values.size - 1)
+    t = position - low
+    a, b = sorted_values[low], sorted_values[high]
+    # np.lib : a + (b - a) t, ou b - (b - a)(1 - t) pour t >= 0.5
+    return float(b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t)
+
+
+class LiveScorer:
+    """
+    Estimations du stade sur fenêtre glissante pour un flux EEG en direct.
+    
+    Les modèles à features (forêt, sklearn ou aplatie) reçoivent les
+    features incrémentales ; les autres (CNN, ensemble) reçoivent la
+    fenêtre brute, prédite en entier à chaque pas.
+    """
+    
+    def __init__(self, classifier: SleepStageClassifier, hop: int = DEFAULT_HOP, dtype: str = "float32"):
+        """
+        Raises:
+            ValueError: Si le hop ou le dtype sont invalides
+        """
+        self.classifier = classifier
+        extractor = classifier.feature_extractor
+        self.uses_features = (classifier.input_kind == 'features' and
+                              extractor.cache_namespace() == FeatureExtractor().cache_namespace())
+        self.extractor = StreamingFeatureExtractor(hop=hop, dtype=dtype)
+    
+    def feed_bytes(self, chunk: bytes) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """
+        Ajoute des octets bruts et prédit les fenêtres complétées.
+        
+        Returns:
+            Une ligne par fenêtre (window, end_s, predicted_class,
+            predicted_index, confidence, probabilities) et les features (n, 16)
+        """
+        first = self.extractor.n_windows
+        if self.uses_features:
+            features = self.extractor.feed_bytes(chunk)
+            if not len(features):
+                return [], features
+            results = self.classifier.format_results(self.classifier.predict_proba_from_features(features))
+        else:
+            features, windows = self.extractor.feed_bytes(chunk, return_windows=True)
+            if not len(features):
+                return [], features
+            results = self.classifier.predict_batch(windows)
+        
+        entries = [
+            {
+                "window": first + i,
+                "end_s": self.extractor.window_end_s(first + i),
+                "predicted_class": predicted_class,
+                "predicted_index": predicted_index,
+                "confidence": confidence,
+                "probabilities": probas
+            }
+            for i, (predicted_class, predicted_index, confidence, probas) in enumerate(results)
+        ]
+        return entries, features
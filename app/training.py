@@ -0,0 +1,142 @@
+"""
+Entraînement du pipeline à partir des arrays mappés en mémoire.
+
+`X_train.npy` (float64, N × 3000) est ouvert avec `mmap_mode='r'` et les
+16 features sont calculées par chunks : seule la matrice de features
+(N × 16) est gardée en RAM. SMOTE, le StandardScaler et la RandomForest
+sont entraînés sur ces features, puis assemblés avec le FeatureExtractor
+en un Pipeline identique à celui servi par l'API.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, cohen_kappa_score, f1_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.feature_extractor import FeatureExtractor
+
+logger = logging.getLogger(__name__)
+
+# Hyperparamètres du modèle de production (rf_v2)
+DEFAULT_RF_PARAMS = {
+    'n_estimators': 500,
+    'max_depth': 50,
+    'min_samples_split': 2,
+    'min_samples_leaf': 1,
+    'max_features': 'sqrt',
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+
+def load_split(data_dir, split: str = 'train') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ouvre `X_{split}.npy` mappé en mémoire et charge `y_{split}.npy`.
+
+    Returns:
+        X (memmap lecture seule, N × 3000), y (N,)
+    """
+    data_dir = Path(data_dir)
+    X = np.load(data_dir / f'X_{split}.npy', mmap_mode='r')
+    y = np.load(data_dir / f'y_{split}.npy')
+    if len(X) != len(y):
+        raise ValueError(f"X_{split} ({len(X)}) et y_{split} ({len(y)}) de tailles différentes")
+    return X, y
+
+
+def featurize(X, extractor: Optional[FeatureExtractor] = None,
+              chunk_size: int = 2048) -> np.ndarray:
+    """
+    Calcule les 16 features de X par chunks.
+
+    Seul un chunk de signaux bruts est matérialisé à la fois : X peut être
+    un memmap plus grand que la RAM.
+
+    Returns:
+        features : array (N, 16)
+    """
+    if extractor is None:
+        extractor = FeatureExtractor().fit(None)
+    features = np.empty((len(X), 16))
+    for start in range(0, len(X), chunk_size):
+        features[start:start + chunk_size] = extractor.transform(X[start:start + chunk_size])
+    return features
+
+
+def resample_smote(features: np.ndarray, y: np.ndarray,
+                   random_state: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rééquilibre les classes avec SMOTE, appliqué aux features.
+
+    Returns:
+        features et labels rééquilibrés
+    
+    Raises:
+        ImportError: Si imbalanced-learn n'est pas installé (utiliser
+            `smote=False` pour entraîner sans rééquilibrage)
+    """
+    from imblearn.over_sampling import SMOTE
+    
+    resampled, labels = SMOTE(random_state=random_state).fit_resample(features, y)
+    logger.info(f"SMOTE : {len(y)} → {len(labels)} époques")
+    return resampled, labels
+
+
+def fit_pipeline(X, y, rf_params: Optional[Dict] = None, smote: bool = True,
+                 chunk_size: int = 2048, feature_cache=None) -> Pipeline:
+    """
+    Entraîne le pipeline FeatureExtractor → StandardScaler → RandomForest.
+
+    Les features sont calculées une seule fois par chunks ; SMOTE, le scaler
+    et la forêt ne voient que la matrice (N, 16), jamais les signaux bruts.
+
+    Args:
+        X: Signaux (N, 3000), typiquement un memmap (`load_split`)
+        y: Labels (N,)
+        rf_params: Hyperparamètres de la RandomForest (DEFAULT_RF_PARAMS par défaut)
+        smote: Rééquilibrer les classes avec SMOTE (sur les features)
+        chunk_size: Nombre d'époques featurisées à la fois
+        feature_cache: FeatureCache optionnel (features réutilisées d'un
+            entraînement à l'autre ; non rattaché au pipeline retourné)
+
+    Returns:
+        Pipeline entraîné, sérialisable et servi tel quel par l'API
+    """
+    extractor = FeatureExtractor(fs=100, expected_len=X.shape[1]).fit(None)
+    extractor.set_cache(feature_cache)
+    try:
+        features = featurize(X, extractor, chunk_size)
+    finally:
+        extractor.set_cache(None)
+    labels = np.asarray(y)
+    if smote:
+        features, labels = resample_smote(features, labels)
+
+    scaler = StandardScaler().fit(features)
+    classifier = RandomForestClassifier(**(rf_params or DEFAULT_RF_PARAMS))
+    classifier.fit(scaler.transform(features), labels)
+
+    return Pipeline([
+        ('feature_extractor', extractor),
+        ('scaler', scaler),
+        ('classifier', classifier)
+    ])
+
+
+def evaluate(pipeline: Pipeline, X, y, chunk_size: int = 2048) -> Dict:
+    """
+    Évalue un pipeline par chunks (accuracy, F1 macro, kappa de Cohen).
+    """
+    predictions = np.concatenate([
+        pipeline.predict(X[start:start + chunk_size])
+        for start in range(0, len(X), chunk_size)
+    ])
+    return {
+        'accuracy': float(accuracy_score(y, predictions)),
+        'f1_score': float(f1_score(y, predictions, average='macro')),
+        'cohens_kappa': float(cohen_kappa_score(y, predictions))
+    }
@@ -0,0 +1,76 @@
+"""
+Benchmark du CNN : runtime NumPy (app/cnn.py) vs modèle Keras de référence.
+
+La référence Keras n'est mesurée que si TensorFlow/Keras est installé
+(l'image de l'API n'en a pas besoin) ; le script affiche alors aussi
+l'écart maximal des probabilités.
+
+Usage :
+    python benchmark_cnn.py
+    python benchmark_cnn.py notebooks/models/cnn_regularizedlight_20251015_202037
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.cnn import NumpyCNN, prepare_signals
+
+
+def time_it(fn, repeat=5):
+    """Retourne le meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_keras(model_dir):
+    """Modèle Keras de référence, ou None si Keras n'est pas installé."""
+    try:
+        import keras
+    except ImportError:
+        return None
+    return keras.saving.load_model(model_dir / "cnn_model.keras")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("⏱️  BENCHMARK CNN : runtime NumPy vs Keras")
+    print("=" * 70)
+    
+    model_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "notebooks/models/cnn_regularizedlight_20251015_202037")
+    start = time.perf_counter()
+    cnn = NumpyCNN.load(model_dir / "cnn_model.npz")
+    print(f"🧠 Runtime NumPy chargé en {(time.perf_counter() - start) * 1000:.1f} ms ({cnn.n_parameters} paramètres)")
+    
+    start = time.perf_counter()
+    keras_model = load_keras(model_dir)
+    if keras_model is None:
+        print("⚠️  Keras non installé : runtime NumPy seul")
+    else:
+        print(f"🧠 Modèle Keras chargé en {time.perf_counter() - start:.2f} s")
+    
+    rng = np.random.default_rng(42)
+    signals = rng.normal(size=(554, 3000)) * rng.uniform(1, 50, size=(554, 1))
+    X = prepare_signals(signals)
+    
+    print(f"\n{'N':>6} | {'NumPy (ms)':>11} | {'Keras (ms)':>11} | {'speedup':>8} | {'écart max':>10}")
+    print("-" * 70)
+    for n in (1, 32, 128, 554):
+        batch = X[:n]
+        t_numpy = time_it(lambda: cnn.predict_proba(batch))
+        if keras_model is None:
+            print(f"{n:>6} | {t_numpy * 1000:>11.2f} | {'-':>11} | {'-':>8} | {'-':>10}")
+            continue
+        reference = np.asarray(keras_model(batch, training=False))
+        t_keras = time_it(lambda: keras_model(batch, training=False))
+        difference = np.abs(cnn.predict_proba(batch) - reference).max()
+        print(f"{n:>6} | {t_numpy * 1000:>11.2f} | {t_keras * 1000:>11.2f} | "
+              f"{t_keras / t_numpy:>7.1f}x | {difference:>10.1e}")
+    
+    print("=" * 70)
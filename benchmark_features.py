@@ -0,0 +1,53 @@
+"""
+Benchmark de l'extraction de features : chemin vectorisé vs époque par époque.
+
+Usage :
+    python benchmark_features.py
+"""
+
+import time
+import numpy as np
+
+from app.feature_extractor import FeatureExtractor
+
+
+def time_it(fn, repeat=3):
+    """Retourne le meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_epoch(extractor, X):
+    return np.vstack([extractor._extract_features_from_signal(s) for s in X])
+
+
+if __name__ == "__main__":
+    extractor = FeatureExtractor(fs=100, expected_len=3000)
+    rng = np.random.default_rng(42)
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK FEATURE EXTRACTOR")
+    print("=" * 70)
+    print(f"{'N':>8} | {'par époque (ms)':>16} | {'vectorisé (ms)':>15} | {'speedup':>8} | {'écart max':>10}")
+    print("-" * 70)
+
+    for n in (1, 100, 10_000):
+        X = rng.normal(scale=20.0, size=(n, 3000))
+        repeat = 1 if n >= 10_000 else 5
+        extractor.transform(X[:1])  # warm-up
+
+        t_loop = time_it(lambda: per_epoch(extractor, X), repeat)
+        t_vec = time_it(lambda: extractor.transform(X), repeat)
+
+        ref = per_epoch(extractor, X)
+        vec = extractor.transform(X)
+        max_rel = float(np.max(np.abs(vec - ref) / np.maximum(np.abs(ref), 1e-12)))
+
+        print(f"{n:>8} | {t_loop * 1000:>16.2f} | {t_vec * 1000:>15.2f} | "
+              f"{t_loop / t_vec:>7.1f}x | {max_rel:>10.1e}")
+
+    print("=" * 70)
@@ -0,0 +1,75 @@
+"""
+Benchmark de l'inférence de la forêt : sklearn (StandardScaler + RandomForest)
+vs forêt aplatie (app/forest.py), à partir des features.
+
+Usage :
+    python benchmark_forest.py                                  # forêt synthétique 500 arbres
+    python benchmark_forest.py models/rf_v2_final_pipeline.joblib
+"""
+
+import sys
+import time
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.feature_extractor import FeatureExtractor
+from app.forest import FlatForest
+
+
+def time_it(fn, repeat=5):
+    """Retourne le meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_head(n_estimators=500):
+    """Scaler + forêt (profondeur 50) entraînés sur des features de signaux aléatoires."""
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(5000, 3000)) * rng.uniform(1, 50, size=(5000, 1))
+    features = FeatureExtractor().transform(X)
+    y = np.digitize(features[:, 1], np.quantile(features[:, 1], [0.2, 0.4, 0.6, 0.8]))
+    y = np.where(rng.uniform(size=len(y)) < 0.2, rng.integers(5, size=len(y)), y)
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('classifier', RandomForestClassifier(n_estimators=n_estimators, max_depth=50,
+                                              random_state=42, n_jobs=-1))
+    ]).fit(features, y), features
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("⏱️  BENCHMARK FORÊT : sklearn vs tableaux plats")
+    print("=" * 70)
+
+    if len(sys.argv) > 1:
+        pipeline = joblib.load(sys.argv[1])
+        head = pipeline[1:]
+        rng = np.random.default_rng(42)
+        features = pipeline[0].transform(rng.normal(scale=20.0, size=(2000, 3000)))
+    else:
+        head, features = synthetic_head()
+
+    start = time.perf_counter()
+    forest = FlatForest.from_pipeline(head)
+    print(f"🌲 {forest.n_trees} arbres, {forest.n_nodes} nœuds, profondeur max {forest.max_depth}")
+    print(f"   Export : {time.perf_counter() - start:.2f} s, {forest.nbytes / 1024**2:.1f} MB")
+
+    print(f"\n{'N':>8} | {'sklearn (ms)':>13} | {'plat (ms)':>10} | {'speedup':>8} | {'écart max':>10}")
+    print("-" * 70)
+    for n in (1, 32, 128, 1000):
+        X = features[:n]
+        reference = head.predict_proba(X)
+        flat = forest.predict_proba(X)
+        t_sklearn = time_it(lambda: head.predict_proba(X))
+        t_flat = time_it(lambda: forest.predict_proba(X))
+        print(f"{n:>8} | {t_sklearn * 1000:>13.2f} | {t_flat * 1000:>10.2f} | "
+              f"{t_sklearn / t_flat:>7.1f}x | {np.abs(flat - reference).max():>10.1e}")
+
+    print("=" * 70)
@@ -0,0 +1,84 @@
+"""
+Benchmark du démarrage d'un worker : pipeline .joblib vs artefact mappé.
+
+Lance W workers en parallèle pour chaque configuration, mesure le temps
+de chargement du SleepStageClassifier puis la mémoire de chaque worker
+(/proc/<pid>/smaps_rollup, Linux) : RSS, PSS (pages partagées divisées
+entre workers) et mémoire privée (anonyme, non partageable).
+
+Usage :
+    python export_model_artifact.py models/rf_v2_final_pipeline.joblib models/rf_v2_final
+    python benchmark_startup.py models/rf_v2_final_pipeline.joblib models/rf_v2_final --workers 2
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from app.ml_model import SleepStageClassifier
+model = SleepStageClassifier(sys.argv[1], backend=sys.argv[2])
+model.predict_batch(__import__('numpy').zeros((1, 3000)))  # warm-up
+print(json.dumps({"load_s": time.perf_counter() - start}), flush=True)
+sys.stdin.readline()
+"""
+
+
+def memory_mb(pid: int) -> dict:
+    """RSS, PSS et mémoire anonyme d'un processus (MB)."""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        values[name] = int(value.split()[0]) / 1024
+    return {"rss": values["Rss"], "pss": values["Pss"], "anon": values["Anonymous"]}
+
+
+def run(model_path: str, backend: str, n_workers: int) -> list:
+    """Démarre les workers, mesure, puis les arrête."""
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, model_path, backend],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                         cwd=Path(__file__).parent)
+        for _ in range(n_workers)
+    ]
+    results = []
+    try:
+        for worker in workers:
+            results.append(json.loads(worker.stdout.readline()))
+        for worker, result in zip(workers, results):
+            result.update(memory_mb(worker.pid))
+    finally:
+        for worker in workers:
+            worker.communicate("\n")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Temps de démarrage et mémoire par worker")
+    parser.add_argument("pipeline", help="Pipeline .joblib")
+    parser.add_argument("artifact", help="Artefact (dossier) du même pipeline")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    configs = [
+        ("joblib", args.pipeline, "sklearn"),
+        ("artefact", args.artifact, "sklearn"),
+        ("artefact", args.artifact, "flat"),
+    ]
+
+    print("=" * 78)
+    print(f"🚀 DÉMARRAGE À FROID : {args.workers} workers par configuration")
+    print("=" * 78)
+    print(f"{'format':>9} | {'backend':>7} | {'chargement (s)':>14} | {'RSS (MB)':>9} | "
+          f"{'PSS (MB)':>9} | {'privé (MB)':>10}")
+    print("-" * 78)
+    for name, path, backend in configs:
+        results = run(path, backend, args.workers)
+        mean = {key: sum(r[key] for r in results) / len(results) for key in results[0]}
+        print(f"{name:>9} | {backend:>7} | {mean['load_s']:>14.2f} | {mean['rss']:>9.0f} | "
+              f"{mean['pss']:>9.0f} | {mean['anon']:>10.0f}")
+    print("=" * 78)
@@ -0,0 +1,135 @@
+"""
+Script de compaction du modèle : compromis vitesse / qualité.
+
+Pour chaque combinaison (nombre d'arbres, profondeur maximale), le script
+compacte le pipeline (app/compaction.py), aplatit la forêt aux types
+réduits (seuils float32, features int8, index int32) et affiche :
+taille de la forêt, accuracy / kappa sur X_test.npy (écart au modèle
+complet), accord avec le modèle complet et latence de la forêt.
+
+Usage:
+    python compact_model.py models/rf_v2_final_pipeline.joblib --data-dir data/processed
+    python compact_model.py models/rf_v2_final_pipeline.joblib --trees 100 --depths 20 --output models/rf_v2_compact
+    SLEEPAI_MODEL_PATH=models/rf_v2_compact SLEEPAI_MODEL_BACKEND=flat uvicorn app.main:app
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score, cohen_kappa_score
+
+# Ajouter app/ au path pour importer les modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.compaction import compact_pipeline
+from app.forest import FlatForest
+from app.model_artifact import save_artifact
+from app.training import featurize, load_split
+
+
+def parse_depth(value: str):
+    """Profondeur maximale ('none' : pas de limite)."""
+    return None if value.lower() == "none" else int(value)
+
+
+def time_it(fn, repeat=5):
+    """Retourne le meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+parser = argparse.ArgumentParser(description="Compaction du pipeline SleepAI (arbres, profondeur, types)")
+parser.add_argument("pipeline", help="Pipeline .joblib (FeatureExtractor → StandardScaler → RandomForest)")
+parser.add_argument("--data-dir", default="data/processed", help="Dossier contenant X_test.npy / y_test.npy")
+parser.add_argument("--trees", type=int, nargs="+", default=[500, 200, 100, 50, 25])
+parser.add_argument("--depths", type=parse_depth, nargs="+", default=[None, 25, 20, 15, 10],
+                    help="Profondeurs maximales ('none' : inchangée)")
+parser.add_argument("--float64", action="store_true", help="Garder la forêt aplatie en float64 (pas de types réduits)")
+parser.add_argument("--output", default=None,
+                    help="Dossier d'artefact à écrire (une seule valeur de --trees et de --depths)")
+args = parser.parse_args()
+
+if args.output and (len(args.trees) != 1 or len(args.depths) != 1):
+    parser.error("--output demande une seule valeur de --trees et de --depths")
+
+print("=" * 70)
+print("🗜️  COMPACTION DU MODÈLE : vitesse vs qualité")
+print("=" * 70)
+
+pipeline = joblib.load(args.pipeline)
+n_total = len(pipeline[-1].estimators_)
+print(f"\n📂 Pipeline : {args.pipeline} ({n_total} arbres)")
+
+# ============================================================================
+# Données de test
+# ============================================================================
+
+try:
+    X_test, y_test = load_split(args.data_dir, 'test')
+    print(f"📊 Évaluation sur X_test.npy : {len(y_test)} époques")
+except FileNotFoundError:
+    rng = np.random.default_rng(42)
+    X_test, y_test = rng.normal(size=(2000, 3000)) * rng.uniform(1, 50, size=(2000, 1)), None
+    print("⚠️  X_test.npy non trouvé : signaux aléatoires, accord avec le modèle complet seulement")
+features = featurize(X_test, pipeline[0])
+
+reference = FlatForest.from_pipeline(pipeline)
+reference_predictions = reference.predict(features)
+reference_scores = None
+if y_test is not None:
+    reference_scores = (accuracy_score(y_test, reference_predictions),
+                        cohen_kappa_score(y_test, reference_predictions))
+
+# ============================================================================
+# Balayage
+# ============================================================================
+
+print(f"\n{'arbres':>6} | {'prof.':>5} | {'nœuds':>9} | {'MB':>6} | {'accuracy':>15} | {'kappa':>15} | "
+      f"{'accord':>6} | {'1 ép. (ms)':>10} | {'128 ép. (ms)':>12}")
+print("-" * 110)
+for n_trees in args.trees:
+    for max_depth in args.depths:
+        if n_trees > n_total:
+            continue
+        forest = FlatForest.from_pipeline(compact_pipeline(pipeline, n_trees=n_trees, max_depth=max_depth))
+        if not args.float64:
+            forest = forest.compact_dtypes()
+        predictions = forest.predict(features)
+        
+        accuracy = kappa = "-"
+        if reference_scores is not None:
+            acc = accuracy_score(y_test, predictions)
+            kap = cohen_kappa_score(y_test, predictions)
+            accuracy = f"{acc:.4f} ({acc - reference_scores[0]:+.4f})"
+            kappa = f"{kap:.4f} ({kap - reference_scores[1]:+.4f})"
+        agreement = np.mean(predictions == reference_predictions)
+        t_one = time_it(lambda: forest.predict_proba(features[:1]))
+        t_batch = time_it(lambda: forest.predict_proba(features[:128]))
+        print(f"{n_trees:>6} | {'-' if max_depth is None else max_depth:>5} | {forest.n_nodes:>9} | "
+              f"{forest.nbytes / 1024**2:>6.1f} | {accuracy:>15} | {kappa:>15} | {agreement:>6.1%} | "
+              f"{t_one * 1000:>10.2f} | {t_batch * 1000:>12.2f}")
+
+print(f"\nRéférence : {n_total} arbres, float64, {reference.nbytes / 1024**2:.1f} MB")
+
+# ============================================================================
+# Export
+# ============================================================================
+
+if args.output:
+    compact = compact_pipeline(pipeline, n_trees=args.trees[0], max_depth=args.depths[0])
+    try:
+        metadata = save_artifact(compact, args.output, compact_dtypes=not args.float64)
+    except (FileExistsError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"\n💾 Artefact écrit : {args.output} ({metadata['n_trees']} arbres, "
+          f"{metadata['n_nodes']} nœuds, forêt {metadata['forest_bytes'] / 1024**2:.1f} MB)")
+print("=" * 70)
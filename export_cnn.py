@@ -0,0 +1,44 @@
+"""
+Script pour exporter le CNN Keras en runtime NumPy (voir app/cnn.py).
+
+Ne nécessite que h5py (lecture de model.weights.h5), pas TensorFlow ;
+l'API n'a ensuite besoin que du .npz produit.
+
+Usage:
+    python export_cnn.py notebooks/models/cnn_regularizedlight_20251015_202037
+    SLEEPAI_MODEL_BACKEND=cnn uvicorn app.main:app
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter app/ au path pour importer les modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.cnn import NumpyCNN
+
+parser = argparse.ArgumentParser(description="Export du CNN Keras en runtime NumPy")
+parser.add_argument("model_dir", help="Dossier du modèle (cnn_model.keras, metadata.json, normalization_params.json)")
+parser.add_argument("--output", default=None, help="Fichier .npz à écrire (défaut : <model_dir>/cnn_model.npz)")
+args = parser.parse_args()
+
+print("=" * 70)
+print("📦 EXPORT DU CNN EN RUNTIME NUMPY")
+print("=" * 70)
+
+try:
+    cnn = NumpyCNN.from_keras(args.model_dir)
+except ImportError as e:
+    print(f"❌ h5py indisponible ({e}) : pip install h5py")
+    sys.exit(1)
+except ValueError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+output = Path(args.output or Path(args.model_dir) / "cnn_model.npz")
+cnn.save(output)
+print(f"\n🧠 {cnn.info['model_type']} : {' → '.join(layer['type'] for layer in cnn.layers)}")
+print(f"   {cnn.n_parameters} paramètres, accuracy test {cnn.info['accuracy']:.2%}")
+print(f"💾 Runtime écrit : {output} ({output.stat().st_size / 1024:.0f} KB)")
+print("=" * 70)
@@ -0,0 +1,45 @@
+"""
+Script pour convertir un pipeline .joblib en artefact mappable en mémoire
+(voir app/model_artifact.py).
+
+Usage:
+    python export_model_artifact.py models/rf_v2_final_pipeline.joblib models/rf_v2_final
+    SLEEPAI_MODEL_PATH=models/rf_v2_final SLEEPAI_MODEL_BACKEND=flat uvicorn app.main:app
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+
+# Ajouter app/ au path pour importer les modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.model_artifact import save_artifact
+
+parser = argparse.ArgumentParser(description="Export d'un pipeline en artefact mappable en mémoire")
+parser.add_argument("pipeline", help="Pipeline .joblib (FeatureExtractor → StandardScaler → RandomForest)")
+parser.add_argument("output", help="Dossier de l'artefact à créer")
+args = parser.parse_args()
+
+print("=" * 70)
+print("📦 EXPORT DE L'ARTEFACT DU MODÈLE")
+print("=" * 70)
+
+start = time.perf_counter()
+pipeline = joblib.load(args.pipeline)
+print(f"\n📂 Pipeline chargé en {time.perf_counter() - start:.2f} s : {args.pipeline}")
+
+start = time.perf_counter()
+try:
+    metadata = save_artifact(pipeline, args.output)
+except (FileExistsError, ValueError) as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+print(f"✅ Artefact écrit en {time.perf_counter() - start:.2f} s : {args.output}")
+print(f"   {metadata['n_trees']} arbres, {metadata['n_nodes']} nœuds, "
+      f"forêt aplatie {metadata['forest_bytes'] / 1024**2:.1f} MB")
+print("=" * 70)
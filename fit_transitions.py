@@ -0,0 +1,86 @@
+"""
+Script pour apprendre la matrice de transition du lissage HMM (app/smoothing.py).
+
+Les transitions sont comptées sur les hypnogrammes Sleep-EDF dans l'ordre
+des époques de chaque nuit (`*-Hypnogram.edf`) : y_train.npy, issu d'un
+split mélangé, ne conserve pas cet ordre.
+
+Usage:
+    python fit_transitions.py data/raw --output models/hypnogram_transitions.json
+    SLEEPAI_TRANSITIONS_PATH=models/hypnogram_transitions.json uvicorn app.main:app
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter app/ au path pour importer les modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.edf import EdfReader
+from app.smoothing import CLASS_NAMES, HypnogramSmoother, hypnogram_stages
+
+
+def trim_wake(stages: np.ndarray, margin: int) -> np.ndarray:
+    """Garde `margin` époques d'éveil avant le premier et après le dernier stade de sommeil."""
+    asleep = np.flatnonzero(stages > 0)
+    if not asleep.size:
+        return stages[:0]
+    return stages[max(asleep[0] - margin, 0):asleep[-1] + margin + 1]
+
+
+parser = argparse.ArgumentParser(description="Apprentissage des transitions entre stades (lissage HMM)")
+parser.add_argument("inputs", nargs="+", help="Fichiers *-Hypnogram.edf ou dossiers les contenant")
+parser.add_argument("--output", default="models/hypnogram_transitions.json", help="Fichier JSON à écrire")
+parser.add_argument("--pseudocount", type=float, default=1.0, help="Lissage de Laplace des comptes")
+parser.add_argument("--wake-margin", type=int, default=60,
+                    help="Époques d'éveil gardées autour de la nuit (enregistrements Sleep-EDF de ~20 h ; "
+                         "-1 : pas de découpe)")
+args = parser.parse_args()
+
+print("=" * 70)
+print("🔗 APPRENTISSAGE DES TRANSITIONS ENTRE STADES")
+print("=" * 70)
+
+files = []
+for item in map(Path, args.inputs):
+    files.extend(sorted(item.rglob("*Hypnogram.edf")) if item.is_dir() else [item])
+if not files:
+    print("❌ Aucun hypnogramme trouvé (*-Hypnogram.edf)")
+    sys.exit(1)
+
+sequences, used = [], []
+for path in files:
+    try:
+        stages = hypnogram_stages(EdfReader(path).annotations())
+    except ValueError as e:
+        print(f"⚠️  {path.name} ignoré : {e}")
+        continue
+    if args.wake_margin >= 0:
+        stages = trim_wake(stages, args.wake_margin)
+    sequences.append(stages)
+    used.append(path.name)
+print(f"\n📂 {len(sequences)} hypnogrammes, {sum(len(s) for s in sequences)} époques")
+
+try:
+    smoother = HypnogramSmoother.fit(sequences, pseudocount=args.pseudocount)
+except ValueError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+smoother.info["wake_margin"] = args.wake_margin
+smoother.info["files"] = used
+
+print(f"\n{'de → vers':>9} | " + " | ".join(f"{name:>5}" for name in CLASS_NAMES))
+print("-" * 50)
+for name, row in zip(CLASS_NAMES, smoother.transitions):
+    print(f"{name:>9} | " + " | ".join(f"{p:>5.3f}" for p in row))
+print("\nFréquence des stades : " + ", ".join(
+    f"{name} {p:.1%}" for name, p in zip(CLASS_NAMES, smoother.info["stage_frequencies"])))
+
+output = Path(args.output)
+output.parent.mkdir(parents=True, exist_ok=True)
+smoother.save(output)
+print(f"\n💾 Transitions écrites : {output}")
+print("=" * 70)
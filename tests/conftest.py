@@ -18,14 +18,15 @@ def mock_model():
     # Configurer le comportement du mock
     def mock_predict(X):
         # Retourner une prédiction aléatoire mais cohérente
-        return np.array([2])  # Toujours prédire "N2" pour simplicité
+        return np.full(len(X), 2)  # Toujours prédire "N2" pour simplicité
     
     def mock_predict_proba(X):
         # Retourner des probabilités fictives
-        return np.array([[0.1, 0.15, 0.5, 0.2, 0.05]])  # Wake, N1, N2, N3, REM
+        return np.tile([0.1, 0.15, 0.5, 0.2, 0.05], (len(X), 1))  # Wake, N1, N2, N3, REM
     
     mock_pipeline.predict = mock_predict
     mock_pipeline.predict_proba = mock_predict_proba
+    mock_pipeline.named_steps = {'feature_extractor': Mock(), 'scaler': Mock(), 'classifier': Mock()}
     
     # Patcher le chargement du modèle
     with patch('joblib.load', return_value=mock_pipeline):
@@ -33,4 +34,39 @@ def mock_model():
         if 'app.main' in sys.modules:
             del sys.modules['app.main']
         
-        yield mock_pipeline
\ No newline at end of file
+        yield mock_pipeline
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    """SleepStageClassifier chargé avec le pipeline mocké"""
+    from app.ml_model import SleepStageClassifier
+    
+    model_file = tmp_path / "model.joblib"
+    model_file.touch()
+    return SleepStageClassifier(model_path=str(model_file))
+
+
+@pytest.fixture
+def real_pipeline():
+    """Petit pipeline réel (FeatureExtractor + StandardScaler + RandomForest)"""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.ensemble import RandomForestClassifier
+    from app.feature_extractor import FeatureExtractor
+    
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3000)) * rng.uniform(1, 50, size=(60, 1))
+    y = np.arange(60) % 5
+    return Pipeline([
+        ('feature_extractor', FeatureExtractor()),
+        ('scaler', StandardScaler()),
+        ('classifier', RandomForestClassifier(n_estimators=10, random_state=0))
+    ]).fit(X, y)
+
+
+@pytest.fixture
+def real_joblib_load(monkeypatch):
+    """joblib.load réel (mocké par `mock_model` pour le reste des tests)"""
+    import joblib
+    monkeypatch.setattr(joblib, "load", joblib.numpy_pickle.load)
@@ -1,10 +1,20 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app import main as api
+from app.monitoring import SimpleMonitor
 import numpy as np
 
 client = TestClient(app)
 
+
+@pytest.fixture
+def loaded_model(classifier, tmp_path, monkeypatch):
+    """Charge le pipeline mocké et redirige les logs vers tmp_path"""
+    monkeypatch.setattr(api, "model", classifier)
+    monkeypatch.setattr(api, "monitor", SimpleMonitor(str(tmp_path / "predictions.jsonl")))
+    return classifier
+
 def test_api_running():
     """Test que l'API démarre"""
     response = client.get("/health")
@@ -57,6 +67,18 @@ def test_predict_validation_missing():
     assert response.status_code == 422
     print("✅ Missing field validation works")
 
+def test_predict_request_signal_array():
+    """Test validation vectorisée : array (1, 3000) et rejet NaN/inf"""
+    from pydantic import ValidationError
+    from app.models import PredictionRequest
+    
+    request = PredictionRequest(signal=[0.5] * 3000)
+    assert request.signal_array.shape == (1, 3000)
+    
+    with pytest.raises(ValidationError):
+        PredictionRequest(signal=[float("inf")] + [0.0] * 2999)
+    print("✅ Vectorized signal validation works")
+
 # Tests conditionnels - seulement si le modèle est chargé
 def test_model_info_if_loaded():
     """Test /model-info si le modèle est chargé"""
@@ -91,5 +113,190 @@ def test_predict_if_loaded():
     assert 0 <= data["confidence"] <= 1
     print(f"✅ Prediction - Predicted: {data['predicted_class']}")
 
+def test_predict_batch_validation_empty():
+    """Test validation batch - liste vide"""
+    response = client.post("/predict/batch", json={"signals": []})
+    assert response.status_code == 422
+    print("✅ Empty batch validation works")
+
+def test_predict_batch_validation_short_epoch():
+    """Test validation batch - époque trop courte"""
+    response = client.post("/predict/batch", json={"signals": [[0.0] * 3000, [1, 2, 3]]})
+    assert response.status_code == 422
+    print("✅ Short epoch validation works")
+
+def test_predict_batch(loaded_model):
+    """Test prédiction batch avec le pipeline mocké"""
+    np.random.seed(42)
+    signals = np.random.randn(4, 3000).tolist()
+    
+    response = client.post("/predict/batch", json={"signals": signals})
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["n_epochs"] == 4
+    assert len(data["predictions"]) == 4
+    assert all(p["predicted_class"] == "N2" for p in data["predictions"])
+    assert len(api.monitor.get_recent_logs(10)) == 4
+    print("✅ Batch prediction works")
+
+def test_predict_batch_too_large(loaded_model, monkeypatch):
+    """Test limite de taille de batch, vérifiée avant la validation des époques"""
+    from app import models
+    monkeypatch.setattr(models, "MAX_BATCH_SIZE", 2)
+    monkeypatch.setattr(models, "to_signal_array", lambda values: pytest.fail("époques validées"))
+    signals = np.zeros((3, 3000)).tolist()
+    
+    response = client.post("/predict/batch", json={"signals": signals})
+    assert response.status_code == 413
+    assert "max 2" in response.json()["detail"]
+    print("✅ Batch size limit works")
+
+def test_predict_single(loaded_model):
+    """Test /predict avec le pipeline mocké (exécuté dans le pool d'inférence)"""
+    response = client.post("/predict", json={"signal": np.random.randn(3000).tolist()})
+    assert response.status_code == 200
+    assert response.json()["predicted_class"] == "N2"
+    assert len(api.monitor.get_recent_logs(10)) == 1
+    print("✅ Single prediction works")
+
+def test_predict_overloaded(loaded_model, monkeypatch):
+    """Test backpressure : 503 + Retry-After quand la file est pleine"""
+    from app.inference import InferenceExecutor
+    monkeypatch.setattr(api.micro_batcher, "executor", InferenceExecutor(max_workers=1, max_pending=0))
+    
+    response = client.post("/predict", json={"signal": [0.0] * 3000})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    print("✅ Backpressure works")
+
+def test_predict_raw(loaded_model):
+    """Test prédiction à partir d'octets float32 bruts"""
+    body = np.random.randn(3000).astype("<f4").tobytes()
+    
+    response = client.post(
+        "/predict/raw",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert response.json()["predicted_class"] == "N2"
+    print("✅ Raw prediction works")
+
+def test_predict_batch_raw_npy(loaded_model):
+    """Test prédiction batch à partir d'un fichier .npy"""
+    import io
+    buffer = io.BytesIO()
+    np.save(buffer, np.random.randn(5, 3000))
+    
+    response = client.post(
+        "/predict/batch/raw",
+        content=buffer.getvalue(),
+        headers={"Content-Type": "application/x-npy"}
+    )
+    assert response.status_code == 200
+    assert response.json()["n_epochs"] == 5
+    print("✅ Raw batch prediction works")
+
+def test_predict_batch_raw_too_large_not_decoded(loaded_model, monkeypatch):
+    """Test 413 sur la taille du corps binaire, avant tout décodage"""
+    monkeypatch.setattr(api, "MAX_BATCH_SIZE", 2)
+    monkeypatch.setattr(api, "decode_signals", lambda *args, **kwargs: pytest.fail("corps décodé"))
+    body = np.zeros((3, 3000), dtype="<f4").tobytes()
+    
+    response = client.post("/predict/batch/raw", content=body, headers={"Content-Type": "application/octet-stream"})
+    assert response.status_code == 413
+    print("✅ Raw batch size checked before decoding")
+
+def test_predict_raw_too_large_not_decoded(loaded_model, monkeypatch):
+    """Test /predict/raw : corps de plus d'une époque rejeté avant décodage"""
+    monkeypatch.setattr(api, "decode_signals", lambda *args, **kwargs: pytest.fail("corps décodé"))
+    body = np.zeros((2, 3000), dtype="<f4").tobytes()
+    
+    response = client.post("/predict/raw", content=body, headers={"Content-Type": "application/octet-stream"})
+    assert response.status_code == 413
+    print("✅ Raw size checked before decoding")
+
+def test_predict_raw_unsupported_type(loaded_model):
+    """Test Content-Type non supporté"""
+    response = client.post("/predict/raw", content=b"1,2,3", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
+    print("✅ Unsupported content type rejected")
+
+
+def test_flat_signal_keeps_monitoring_json(loaded_model, real_pipeline):
+    """Test époque constante (skew/kurtosis NaN) puis endpoints de monitoring"""
+    loaded_model.pipeline = real_pipeline
+    loaded_model._split_pipeline()
+    response = client.post("/predict", json={"signal": [0.0] * 3000})
+    assert response.status_code == 200
+    
+    recent = client.get("/monitoring/recent?n=1")
+    assert recent.status_code == 200
+    assert recent.json()["predictions"][0]["features"][6] is None
+    assert client.get("/monitoring/stats").status_code == 200
+    print("✅ Flat signal logged as valid JSON")
+
+def test_predict_recording_streams_ndjson(loaded_model, monkeypatch):
+    """Test /predict/recording : une ligne par époque puis un résumé"""
+    import json
+    import threading
+    monkeypatch.setattr(api, "RECORDING_BATCH_SIZE", 2)
+    payload = np.random.randn(3000 * 5 + 10).astype("<f4").tobytes()
+    
+    def chunks():
+        for start in range(0, len(payload), 5000):
+            yield payload[start:start + 5000]
+    
+    # Timeout : un corps jamais lu bloquerait la requête indéfiniment
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(response=client.post(
+            "/predict/recording",
+            content=chunks(),
+            headers={"Content-Type": "application/octet-stream"}
+        )),
+        daemon=True
+    )
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "/predict/recording bloqué (corps de requête jamais lu)"
+    response = result["response"]
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["epoch"] for line in lines[:-1]] == [0, 1, 2, 3, 4]
+    assert lines[-1]["summary"]["n_epochs"] == 5
+    assert lines[-1]["summary"]["discarded_samples"] == 10
+    print("✅ Recording streamed as NDJSON")
+
+def test_predict_recording_smoothing(loaded_model, monkeypatch):
+    """Test /predict/recording?smooth=true : stade lissé sur chaque ligne, 503 sans transitions"""
+    import json
+    from app.smoothing import HypnogramSmoother
+    payload = np.random.randn(3000 * 5).astype("<f4").tobytes()
+    headers = {"Content-Type": "application/octet-stream"}
+    
+    monkeypatch.setattr(api, "smoother", None)
+    response = client.post("/predict/recording?smooth=true", content=payload, headers=headers)
+    assert response.status_code == 503
+    
+    monkeypatch.setattr(api, "smoother", HypnogramSmoother(np.full((5, 5), 0.2)))
+    monkeypatch.setattr(api, "RECORDING_BATCH_SIZE", 2)
+    monkeypatch.setattr(api, "SMOOTHING_LAG", 3)
+    response = client.post("/predict/recording?smooth=true", content=payload, headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["epoch"] for line in lines[:-1]] == [0, 1, 2, 3, 4]
+    assert all(line["smoothed_class"] == "N2" for line in lines[:-1])
+    assert lines[-1]["summary"]["smoothing_lag"] == 3
+    print("✅ Recording smoothed")
+
+def test_predict_recording_unsupported_type(loaded_model):
+    """Test /predict/recording n'accepte que des octets bruts"""
+    response = client.post("/predict/recording", content=b"[]", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415
+    print("✅ Recording content type checked")
+
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s"])
\ No newline at end of file
+    pytest.main([__file__, "-v", "-s"])
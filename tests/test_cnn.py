@@ -0,0 +1,140 @@
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.cnn import NumpyCNN, _convert_layer, prepare_signals
+from app.ml_model import SleepStageClassifier
+
+MODEL_DIR = Path(__file__).parent.parent / "notebooks" / "models" / "cnn_regularizedlight_20251015_202037"
+
+CONV = {"strides": [1], "dilation_rate": [1], "groups": 1, "padding": "same", "use_bias": True}
+BATCH_NORM = {"epsilon": 0.001, "scale": True, "center": True}
+
+
+@pytest.fixture(scope="module")
+def keras_variables():
+    """Variables au format Keras d'un petit CNN (même architecture, moins de filtres)"""
+    rng = np.random.default_rng(0)
+    f32 = lambda *shape: rng.normal(size=shape).astype(np.float32)
+    return {
+        "conv1": [f32(3, 6, 8) * 0.3, f32(8) * 0.1],
+        "bn1": [f32(8) + 1, f32(8), f32(8) * 0.1, np.abs(f32(8)) + 0.5],
+        "conv2": [f32(3, 8, 12) * 0.3, f32(12) * 0.1],
+        "bn2": [f32(12) + 1, f32(12), f32(12) * 0.1, np.abs(f32(12)) + 0.5],
+        "dense1": [f32(12, 10) * 0.3, f32(10) * 0.1],
+        "dense2": [f32(10, 5) * 0.3, f32(5) * 0.1]
+    }
+
+
+def small_cnn(v):
+    layers = [
+        _convert_layer("Conv1D", {**CONV, "activation": "relu"}, v["conv1"]),
+        _convert_layer("BatchNormalization", BATCH_NORM, v["bn1"]),
+        _convert_layer("MaxPooling1D", {"pool_size": [2], "strides": [2], "padding": "valid"}, []),
+        _convert_layer("Conv1D", {**CONV, "activation": "relu"}, v["conv2"]),
+        _convert_layer("BatchNormalization", BATCH_NORM, v["bn2"]),
+        _convert_layer("MaxPooling1D", {"pool_size": [2], "strides": [2], "padding": "valid"}, []),
+        _convert_layer("GlobalAveragePooling1D", {}, []),
+        _convert_layer("Dense", {"activation": "relu", "use_bias": True}, v["dense1"]),
+        _convert_layer("Dense", {"activation": "softmax", "use_bias": True}, v["dense2"])
+    ]
+    return NumpyCNN(layers, {"mean": 0.0, "std": 1.0}, ["Wake", "N1", "N2", "N3", "REM"])
+
+
+def reference_forward(x, v):
+    """Implémentation directe (boucles, float64) de la sémantique Keras"""
+    def conv(x, kernel, bias):
+        padded = np.pad(x, ((0, 0), (1, 1), (0, 0)))
+        out = sum(padded[:, j:j + x.shape[1]] @ kernel[j] for j in range(kernel.shape[0]))
+        return np.maximum(out + bias, 0)
+    
+    def batch_norm(x, gamma, beta, mean, variance):
+        return (x - mean) / np.sqrt(variance + 0.001) * gamma + beta
+    
+    def pool(x):
+        return np.maximum(x[:, 0::2], x[:, 1::2])
+    
+    x = pool(batch_norm(conv(x, *v["conv1"]), *v["bn1"]))
+    x = pool(batch_norm(conv(x, *v["conv2"]), *v["bn2"]))
+    x = np.maximum(x.mean(axis=1) @ v["dense1"][0] + v["dense1"][1], 0)
+    logits = x @ v["dense2"][0] + v["dense2"][1]
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def test_matches_reference_implementation(keras_variables):
+    """Test conv (im2col), BatchNorm pré-calculée, pooling et dense contre l'implémentation directe"""
+    X = np.random.default_rng(1).normal(size=(40, 500, 6)).astype(np.float32)
+    expected = reference_forward(X.astype(np.float64), keras_variables)
+    probabilities = small_cnn(keras_variables).predict_proba(X)
+    
+    assert probabilities.shape == (40, 5)
+    np.testing.assert_allclose(probabilities, expected, atol=1e-5)
+
+
+def test_save_load_roundtrip(keras_variables, tmp_path):
+    """Test export .npz (sans pickle) et rechargement"""
+    cnn = small_cnn(keras_variables)
+    cnn.save(tmp_path / "cnn.npz")
+    loaded = NumpyCNN.load(tmp_path / "cnn.npz")
+    
+    X = np.random.default_rng(2).normal(size=(300, 500, 6)).astype(np.float32)  # plusieurs chunks
+    np.testing.assert_array_equal(loaded.predict_proba(X), cnn.predict_proba(X))
+    assert loaded.n_parameters == cnn.n_parameters
+
+
+def test_prepare_signals():
+    """Test z-score par époque et repli en (500, 6) comme X.reshape(-1, 500, 6)"""
+    signals = np.random.default_rng(3).normal(size=(3, 3000)) * 40 + 7
+    signals[2] = 5.0  # époque constante : centrée, pas de NaN
+    X = prepare_signals(signals)
+    
+    assert X.shape == (3, 500, 6) and X.dtype == np.float32
+    expected = (signals[0] - signals[0].mean()) / signals[0].std()
+    np.testing.assert_allclose(X[0], expected.reshape(500, 6), rtol=1e-5, atol=1e-6)
+    assert np.all(X[2] == 0)
+    with pytest.raises(ValueError):
+        prepare_signals(np.zeros((2, 2999)))
+
+
+def test_shipped_model_matches_keras_config():
+    """Test runtime livré : mêmes couches que config.json du modèle Keras"""
+    with zipfile.ZipFile(MODEL_DIR / "cnn_model.keras") as archive:
+        config = json.loads(archive.read("config.json"))
+    keras_layers = [layer["class_name"] for layer in config["config"]["layers"]
+                    if layer["class_name"] not in ("InputLayer", "Dropout")]
+    cnn = NumpyCNN.load(MODEL_DIR / "cnn_model.npz")
+    
+    assert [layer["type"] for layer in cnn.layers] == [
+        "conv1d", "batch_norm", "max_pool", "conv1d", "batch_norm", "max_pool",
+        "global_avg_pool", "dense", "dense"
+    ]
+    assert len(keras_layers) == len(cnn.layers)
+    assert cnn.layers[3]["kernel"].shape == (48 * 3, 96)
+
+
+def test_export_matches_shipped_model():
+    """Test export depuis cnn_model.keras (nécessite h5py) identique au .npz livré"""
+    pytest.importorskip("h5py")
+    exported = NumpyCNN.from_keras(MODEL_DIR)
+    shipped = NumpyCNN.load(MODEL_DIR / "cnn_model.npz")
+    X = prepare_signals(np.random.default_rng(4).normal(size=(8, 3000)))
+    np.testing.assert_array_equal(exported.predict_proba(X), shipped.predict_proba(X))
+
+
+def test_classifier_cnn_backend():
+    """Test backend 'cnn' du classificateur : probabilités du runtime, pas de features"""
+    classifier = SleepStageClassifier(str(MODEL_DIR / "cnn_model.npz"), backend="cnn")
+    signals = np.random.default_rng(5).normal(size=(4, 3000)) * 30
+    
+    results, features = classifier.predict_batch(signals, return_features=True)
+    assert features is None
+    expected = NumpyCNN.load(MODEL_DIR / "cnn_model.npz").predict_proba(prepare_signals(signals))
+    np.testing.assert_allclose([list(p.values()) for *_, p in results], expected, rtol=1e-6)
+    
+    info = classifier.get_model_info()
+    assert info["model_type"] == "CNN_RegularizedLight"
+    assert info["backend"] == "cnn" and info["model_loaded"]
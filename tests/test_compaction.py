@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.compaction import compact_pipeline, node_depths, truncate_tree
+from app.forest import FlatForest
+from app.model_artifact import load_flat_model, save_artifact
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    """Scaler + forêt de 20 arbres profonds (labels bruités)"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, 8)) * rng.uniform(0.1, 100, size=8)
+    y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 0) + (rng.uniform(size=1500) < 0.2)
+    pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('classifier', RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1))
+    ]).fit(X, y)
+    return pipeline, rng.normal(size=(500, 8)) * X.std(axis=0)
+
+
+def test_truncated_tree_matches_leaf_distribution(fitted):
+    """Test troncature : profondeur bornée, feuilles = distribution du nœud coupé"""
+    pipeline, X = fitted
+    estimator = pipeline[-1].estimators_[0]
+    tree = estimator.tree_
+    truncated = truncate_tree(tree, 3)
+    
+    assert truncated.max_depth == 3
+    assert node_depths(truncated).max() == 3
+    Xs = pipeline[0].transform(X).astype(np.float32)
+    # Nœud atteint à la profondeur 3 dans l'arbre d'origine
+    path = estimator.decision_path(Xs).toarray().astype(bool)
+    at_depth = np.array([np.flatnonzero(p & (node_depths(tree) == 3))[0] for p in path])
+    expected = tree.value[at_depth, 0] / tree.value[at_depth, 0].sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(truncated.predict(Xs).reshape(len(Xs), -1), expected)
+
+
+def test_compact_pipeline_keeps_original(fitted):
+    """Test pipeline d'origine intact ; sans paramètre, mêmes probabilités"""
+    pipeline, X = fitted
+    reference = pipeline.predict_proba(X)
+    
+    np.testing.assert_array_equal(compact_pipeline(pipeline).predict_proba(X), reference)
+    small = compact_pipeline(pipeline, n_trees=5, max_depth=4)
+    assert len(small[-1].estimators_) == 5
+    assert max(e.tree_.max_depth for e in small[-1].estimators_) <= 4
+    np.testing.assert_array_equal(pipeline.predict_proba(X), reference)
+    assert len(pipeline[-1].estimators_) == 20
+
+
+def test_dropped_trees_are_reweighted(fitted):
+    """Test n_trees : moyenne des k premiers arbres"""
+    pipeline, X = fitted
+    Xs = pipeline[0].transform(X)
+    expected = np.mean([tree.predict_proba(Xs) for tree in pipeline[-1].estimators_[:7]], axis=0)
+    np.testing.assert_allclose(compact_pipeline(pipeline, n_trees=7).predict_proba(X), expected)
+
+
+def test_flat_forest_of_compacted_pipeline(fitted):
+    """Test forêt aplatie d'un pipeline tronqué : identique à sklearn"""
+    pipeline, X = fitted
+    small = compact_pipeline(pipeline, n_trees=8, max_depth=6)
+    forest = FlatForest.from_pipeline(small)
+    assert forest.max_depth <= 6
+    np.testing.assert_array_equal(forest.predict_proba(X), small.predict_proba(X))
+
+
+def test_compact_dtypes(fitted):
+    """Test types réduits : float32/int8, seuils arrondis vers le bas, prédictions proches"""
+    pipeline, X = fitted
+    forest = FlatForest.from_pipeline(pipeline)
+    compact = forest.compact_dtypes()
+    
+    assert compact.threshold.dtype == np.float32 and compact.value.dtype == np.float32
+    assert compact.feature.dtype == np.int8 and compact.children.dtype == np.int32
+    assert compact.nbytes < 0.7 * forest.nbytes
+    assert np.all(compact.threshold.astype(np.float64) <= forest.threshold)
+    np.testing.assert_allclose(compact.predict_proba(X), forest.predict_proba(X), atol=0.11)
+    assert np.mean(compact.predict(X) == forest.predict(X)) > 0.98
+
+
+def test_artifact_with_compact_dtypes(real_pipeline, tmp_path, real_joblib_load):
+    """Test artefact aux types réduits : forêt float32 rechargée telle quelle"""
+    metadata = save_artifact(real_pipeline, tmp_path / "model", compact_dtypes=True)
+    assert metadata["compact_dtypes"]
+    
+    extractor, loaded = load_flat_model(tmp_path / "model")
+    assert loaded.threshold.dtype == np.float32
+    features = extractor.transform(np.random.default_rng(2).normal(size=(20, 3000)) * 20)
+    expected = FlatForest.from_pipeline(real_pipeline).compact_dtypes().predict_proba(features)
+    np.testing.assert_array_equal(loaded.predict_proba(features), expected)
+
+
+def test_invalid_parameters(fitted):
+    """Test n_trees hors bornes"""
+    pipeline, _ = fitted
+    with pytest.raises(ValueError):
+        compact_pipeline(pipeline, n_trees=0)
+    with pytest.raises(ValueError):
+        compact_pipeline(pipeline, n_trees=21)
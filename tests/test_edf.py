@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from app.edf import EdfReader
+from app.feature_extractor import FeatureExtractor
+from app.recording import score_edf
+
+
+def write_edf(path, signals, fs, record_duration=1.0, physical=(-500.0, 500.0), digital=(-32768, 32767),
+              annotations=b""):
+    """Écrit un EDF minimal : un canal par signal int16, plus un canal d'annotations (TAL du premier record)"""
+    n_records = len(signals[0]) // int(fs[0] * record_duration)
+    labels = [f"EEG {i}" for i in range(len(signals))] + ["EDF Annotations"]
+    annotation_samples = max(30, -(-len(annotations) // 2))
+    samples = [int(f * record_duration) for f in fs] + [annotation_samples]
+    ns = len(labels)
+    
+    def field(value, size):
+        return str(value).ljust(size)[:size].encode("ascii")
+    
+    header = b"".join([
+        field(0, 8), field("X", 80), field("Startdate X", 80), field("01.01.25", 8),
+        field("22.00.00", 8), field(256 * (ns + 1), 8), field("EDF+C", 44),
+        field(n_records, 8), field(record_duration, 8), field(ns, 4),
+    ])
+    columns = [
+        [field(label, 16) for label in labels],
+        [field("", 80)] * ns,
+        [field("uV", 8)] * ns,
+        [field(physical[0], 8)] * ns,
+        [field(physical[1], 8)] * ns,
+        [field(digital[0], 8)] * ns,
+        [field(digital[1], 8)] * ns,
+        [field("", 80)] * ns,
+        [field(n, 8) for n in samples],
+        [field("", 32)] * ns,
+    ]
+    header += b"".join(b"".join(column) for column in columns)
+    
+    records = []
+    for r in range(n_records):
+        for signal, n in zip(signals, samples):
+            records.append(np.asarray(signal[r * n:(r + 1) * n], dtype="<i2").tobytes())
+        records.append((annotations if r == 0 else b"").ljust(2 * annotation_samples, b"\x00"))
+    path.write_bytes(header + b"".join(records))
+
+
+@pytest.fixture
+def edf_file(tmp_path):
+    """Enregistrement synthétique : 10 époques + 5 s à 100 Hz, second canal à 50 Hz"""
+    rng = np.random.default_rng(0)
+    eeg = rng.integers(-30000, 30000, size=3000 * 10 + 500)
+    other = rng.integers(-100, 100, size=len(eeg) // 2)
+    path = tmp_path / "SC4001E0-PSG.edf"
+    write_edf(path, [eeg, other], fs=[100, 50])
+    return path, eeg
+
+
+def test_header_and_channels(edf_file):
+    """Test en-tête : canaux, fréquences, nombre d'époques"""
+    path, eeg = edf_file
+    reader = EdfReader(path)
+    
+    assert reader.labels == ["EEG 0", "EEG 1", "EDF Annotations"]
+    assert reader.signal("EEG 0").fs == 100
+    assert reader.signal(1).fs == 50
+    assert reader.n_records == 305
+    assert reader.n_epochs("EEG 0") == 10
+    with pytest.raises(ValueError):
+        reader.signal("EDF Annotations")
+
+
+def test_epochs_in_physical_units(edf_file):
+    """Test époques (records d'1 s à cheval) converties en unités physiques"""
+    path, eeg = edf_file
+    reader = EdfReader(path)
+    signal = reader.signal(0)
+    expected = (eeg[:30000] * signal.gain + signal.offset).reshape(10, 3000)
+    
+    batches = list(reader.iter_epoch_batches("EEG 0", batch_size=4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    np.testing.assert_allclose(np.vstack(batches), expected)
+    np.testing.assert_allclose(reader.read_epochs(0, 3, 5), expected[3:5])
+    assert isinstance(reader.digital(0), np.memmap)
+
+
+def test_batches_feed_feature_extractor(edf_file):
+    """Test batchs EDF → FeatureExtractor.transform"""
+    path, _ = edf_file
+    batch = next(EdfReader(path).iter_epoch_batches(0, batch_size=3))
+    assert FeatureExtractor().transform(batch).shape == (3, 16)
+
+
+def test_score_edf(edf_file, classifier):
+    """Test hypnogramme d'un fichier EDF"""
+    path, _ = edf_file
+    epochs = list(score_edf(classifier, path, channel="EEG 0", batch_size=4))
+    assert [e["epoch"] for e in epochs] == list(range(10))
+    
+    with pytest.raises(ValueError):
+        list(score_edf(classifier, path, channel="EEG 1"))  # 50 Hz
+
+
+def test_rejects_degenerate_digital_range(tmp_path):
+    """Test digital_min = digital_max : ValueError à l'ouverture, pas ZeroDivisionError à la lecture"""
+    path = tmp_path / "broken.edf"
+    write_edf(path, [np.zeros(3000)], fs=[100], digital=(0, 0))
+    with pytest.raises(ValueError, match="digital_min"):
+        EdfReader(path)
+
+
+def test_annotations(tmp_path):
+    """Test lecture des TAL EDF+ (hypnogramme) : horodatage ignoré, durée optionnelle"""
+    tals = (b"+0\x14\x14\x00"
+            b"+0\x1560\x14Sleep stage W\x14\x00"
+            b"+60\x1530\x14Sleep stage 1\x14\x00"
+            b"+90\x14Lights on\x14Sleep stage ?\x14\x00")
+    path = tmp_path / "SC4001EC-Hypnogram.edf"
+    write_edf(path, [np.zeros(200)], fs=[100], annotations=tals)
+    
+    assert EdfReader(path).annotations() == [
+        (0.0, 60.0, "Sleep stage W"), (60.0, 30.0, "Sleep stage 1"),
+        (90.0, 0.0, "Lights on"), (90.0, 0.0, "Sleep stage ?")
+    ]
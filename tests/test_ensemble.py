@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.ensemble import EnsembleClassifier, load_classifier
+from app.feature_extractor import FeatureExtractor
+from app.main import app
+from app.monitoring import SimpleMonitor
+
+CNN_FILE = Path(__file__).parent.parent / "notebooks" / "models" / "cnn_regularizedlight_20251015_202037" / "cnn_model.npz"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def config_file(real_pipeline, real_joblib_load, tmp_path):
+    """Configuration : même forêt en sklearn et en flat, plus le CNN"""
+    joblib.dump(real_pipeline, tmp_path / "rf.joblib")
+    config = {
+        "members": [
+            {"name": "rf", "path": "rf.joblib", "backend": "sklearn", "weight": 2},
+            {"name": "rf_flat", "path": "rf.joblib", "backend": "flat", "weight": 1},
+            {"name": "cnn", "path": str(CNN_FILE), "backend": "cnn", "weight": 1}
+        ],
+        "info": {"accuracy": 0.7}
+    }
+    (tmp_path / "ensemble.json").write_text(json.dumps(config))
+    return tmp_path / "ensemble.json"
+
+
+@pytest.fixture
+def signals():
+    return np.random.default_rng(6).normal(size=(5, 3000)) * 25
+
+
+def test_weighted_average_of_members(config_file, signals):
+    """Test probabilités = moyenne pondérée des membres, features du FeatureExtractor"""
+    ensemble = EnsembleClassifier.from_config(config_file)
+    expected = sum(w * m.predict_proba(signals) for w, m in zip([0.5, 0.25, 0.25], ensemble.members))
+    
+    results, features = ensemble.predict_batch(signals, return_features=True)
+    np.testing.assert_allclose([list(p.values()) for *_, p in results], expected, rtol=1e-9)
+    np.testing.assert_array_equal(features, FeatureExtractor().fit(None).transform(signals))
+
+
+def test_shared_features_and_timings(config_file, signals, monkeypatch):
+    """Test une seule extraction de features pour les deux forêts, durées par membre"""
+    ensemble = EnsembleClassifier.from_config(config_file)
+    calls = []
+    transform = FeatureExtractor.transform
+    monkeypatch.setattr(FeatureExtractor, "transform", lambda self, X: calls.append(len(X)) or transform(self, X))
+    
+    ensemble.predict_batch(signals)
+    assert calls == [5]
+    
+    timings = ensemble.get_last_timings()
+    assert set(timings["members_ms"]) == {"rf", "rf_flat", "cnn"}
+    assert {"features_ms", "cnn_input_ms", "total_ms"} <= set(timings)
+
+
+def test_model_info_and_validation(config_file):
+    """Test informations de l'ensemble et configuration invalide"""
+    ensemble = load_classifier(config_file, "ensemble")
+    info = ensemble.get_model_info()
+    assert info["backend"] == "ensemble" and info["model_loaded"]
+    assert info["accuracy"] == 0.7
+    assert [member["name"] for member in info["members"]] == ["rf", "rf_flat", "cnn"]
+    
+    with pytest.raises(ValueError):
+        EnsembleClassifier(ensemble.members, weights=[1, -1, 1])
+    with pytest.raises(ValueError):
+        EnsembleClassifier(ensemble.members, names=["a", "a", "b"])
+
+
+def test_batch_endpoint_reports_timings(config_file, signals, tmp_path, monkeypatch):
+    """Test /predict/batch : durées par membre dans la réponse"""
+    monkeypatch.setattr(api, "model", EnsembleClassifier.from_config(config_file))
+    monkeypatch.setattr(api, "monitor", SimpleMonitor(str(tmp_path / "predictions.jsonl")))
+    
+    response = client.post("/predict/batch", json={"signals": signals.tolist()})
+    assert response.status_code == 200
+    assert set(response.json()["timings"]["members_ms"]) == {"rf", "rf_flat", "cnn"}
+
+
+def test_single_model_has_no_timings(classifier, signals):
+    """Test classificateur simple : pas de durées par membre"""
+    classifier.predict_batch(signals)
+    assert classifier.get_last_timings() is None
@@ -0,0 +1,64 @@
+import pickle
+import numpy as np
+import pytest
+
+from app.feature_cache import FeatureCache
+from app.feature_extractor import FeatureExtractor
+
+
+@pytest.fixture
+def signals():
+    return np.random.default_rng(0).normal(scale=20.0, size=(10, 3000))
+
+
+def test_cached_transform_matches_uncached(signals, tmp_path):
+    """Test features identiques avec cache, seules les nouvelles époques calculées"""
+    cache = FeatureCache(tmp_path / "features.sqlite")
+    extractor = FeatureExtractor().set_cache(cache)
+    
+    first = extractor.transform(signals[:6])
+    mixed = extractor.transform(signals)
+    
+    np.testing.assert_array_equal(mixed, FeatureExtractor().transform(signals))
+    np.testing.assert_array_equal(first, mixed[:6])
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (6, 10, 10)
+
+
+def test_cache_persists_across_instances(signals, tmp_path):
+    """Test cache relu depuis le fichier SQLite"""
+    FeatureExtractor().set_cache(FeatureCache(tmp_path / "features.sqlite")).transform(signals)
+    
+    cache = FeatureCache(tmp_path / "features.sqlite")
+    FeatureExtractor().set_cache(cache).transform(signals)
+    assert cache.get_metrics()["hits"] == 10
+
+
+def test_cache_keyed_by_extractor_params(signals):
+    """Test changement de paramètres : pas de relecture d'anciennes features"""
+    cache = FeatureCache()
+    FeatureExtractor(fs=100).set_cache(cache).transform(signals)
+    FeatureExtractor(fs=200).set_cache(cache).transform(signals)
+    assert cache.get_metrics()["hits"] == 0
+
+
+def test_lru_eviction(signals):
+    """Test éviction des époques les moins récemment utilisées"""
+    cache = FeatureCache(max_entries=4)
+    extractor = FeatureExtractor().set_cache(cache)
+    extractor.transform(signals[:4])
+    extractor.transform(signals[:1])      # époque 0 récemment utilisée
+    extractor.transform(signals[4:6])     # évince 1 et 2
+    
+    assert len(cache) == 4
+    assert cache.get_metrics()["evictions"] == 2
+    extractor.transform(signals[[0, 3]])
+    assert cache.get_metrics()["hits"] == 3
+
+
+def test_cache_not_pickled(signals):
+    """Test cache non sérialisé avec le pipeline"""
+    extractor = FeatureExtractor().set_cache(FeatureCache())
+    restored = pickle.loads(pickle.dumps(extractor))
+    assert getattr(restored, "_feature_cache", None) is None
+    np.testing.assert_array_equal(restored.transform(signals), extractor.transform(signals))
@@ -0,0 +1,50 @@
+import pickle
+import numpy as np
+import pytest
+from scipy.signal import welch
+from app.feature_extractor import FeatureExtractor, SpectralPlan
+
+
+@pytest.fixture
+def signals():
+    rng = np.random.default_rng(42)
+    return rng.normal(scale=20.0, size=(20, 3000))
+
+
+def test_transform_shape(signals):
+    """Test shape de sortie (N, 16)"""
+    features = FeatureExtractor().transform(signals)
+    assert features.shape == (20, 16)
+    print("✅ Feature shape OK")
+
+
+def test_batch_matches_per_epoch(signals):
+    """Test chemin vectorisé == chemin époque par époque (rtol 1e-9)"""
+    extractor = FeatureExtractor()
+    batch = extractor.transform(signals)
+    reference = np.vstack([extractor._extract_features_from_signal(s) for s in signals])
+    np.testing.assert_allclose(batch, reference, rtol=1e-9, atol=1e-12)
+    print("✅ Vectorized features match per-epoch features")
+
+
+def test_transform_invalid_shape():
+    """Test validation de la shape"""
+    with pytest.raises(ValueError):
+        FeatureExtractor().transform(np.zeros((2, 100)))
+
+
+def test_spectral_plan_matches_welch(signals):
+    """Test plan spectral précalculé == scipy.signal.welch"""
+    plan = SpectralPlan(fs=100, expected_len=3000)
+    freqs, psd = welch(signals, fs=100, nperseg=256, axis=-1)
+    np.testing.assert_allclose(plan.freqs, freqs)
+    np.testing.assert_allclose(plan.psd(signals), psd, rtol=1e-9)
+
+
+def test_spectral_plan_rebuilt_after_unpickle(signals):
+    """Test plan reconstruit au chargement, pas sérialisé"""
+    extractor = FeatureExtractor().fit(signals)
+    assert "_spectral_plan" not in extractor.__getstate__()
+    restored = pickle.loads(pickle.dumps(extractor))
+    assert isinstance(restored._spectral_plan, SpectralPlan)
+    np.testing.assert_array_equal(restored.transform(signals), extractor.transform(signals))
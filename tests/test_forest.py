@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.forest import FlatForest
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    """Scaler + forêt sur 16 features d'échelles très différentes"""
+    rng = np.random.default_rng(0)
+    scales = rng.uniform(1e-3, 1e3, size=16)
+    X = rng.normal(size=(2000, 16)) * scales + rng.uniform(-50, 50, size=16)
+    y = (X[:, 0] / scales[0] + X[:, 1] / scales[1] > 0).astype(int) + 2 * (X[:, 2] > np.median(X[:, 2]))
+    pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('classifier', RandomForestClassifier(n_estimators=30, random_state=0, n_jobs=1))
+    ]).fit(X, y)
+    X_test = rng.normal(size=(3000, 16)) * scales
+    return pipeline, X_test
+
+
+def test_probabilities_match_sklearn_exactly(fitted):
+    """Test probabilités identiques bit à bit (scaler replié dans les seuils)"""
+    pipeline, X_test = fitted
+    forest = FlatForest.from_pipeline(pipeline)
+    
+    np.testing.assert_array_equal(forest.predict_proba(X_test), pipeline.predict_proba(X_test))
+    np.testing.assert_array_equal(forest.predict(X_test), pipeline.predict(X_test))
+
+
+def test_folded_thresholds_exact_at_boundaries(fitted):
+    """Test valeurs exactement sur les seuils repliés et leurs voisins float64"""
+    pipeline, X_test = fitted
+    forest = FlatForest.from_pipeline(pipeline)
+    nodes = np.flatnonzero(forest.feature >= 0)
+    
+    X = np.tile(X_test[:1], (3 * len(nodes), 1))
+    for k, direction in enumerate((-np.inf, None, np.inf)):
+        values = forest.threshold[nodes]
+        if direction is not None:
+            values = np.nextafter(values, direction)
+        X[k * len(nodes) + np.arange(len(nodes)), forest.feature[nodes]] = values
+    
+    np.testing.assert_array_equal(forest.predict_proba(X), pipeline.predict_proba(X))
+
+
+def test_missing_values_follow_sklearn(fitted):
+    """Test NaN (skewness/kurtosis d'une époque constante) : même branche que sklearn"""
+    pipeline, X_test = fitted
+    X = X_test[:200].copy()
+    X[::3, 4] = np.nan
+    X[::5, 0] = np.nan
+    
+    forest = FlatForest.from_pipeline(pipeline)
+    np.testing.assert_array_equal(forest.predict_proba(X), pipeline.predict_proba(X))
+
+
+def test_from_arrays_roundtrip(fitted):
+    """Test reconstruction depuis les tableaux exportés"""
+    pipeline, X_test = fitted
+    forest = FlatForest.from_pipeline(pipeline)
+    restored = FlatForest.from_arrays(forest.arrays())
+    np.testing.assert_array_equal(restored.predict_proba(X_test[:50]), forest.predict_proba(X_test[:50]))
+
+
+def test_full_pipeline_and_classifier_backend(classifier, real_pipeline):
+    """Test pipeline avec FeatureExtractor et backend 'flat' du classificateur"""
+    signals = np.random.default_rng(1).normal(size=(8, 3000)) * 20
+    features = real_pipeline[0].transform(signals)
+    forest = FlatForest.from_pipeline(real_pipeline)
+    np.testing.assert_array_equal(forest.predict_proba(features), real_pipeline.predict_proba(signals))
+    
+    classifier.pipeline = real_pipeline
+    classifier._split_pipeline()
+    expected = classifier.predict_batch(signals)
+    classifier.backend = 'flat'
+    classifier._split_pipeline()
+    assert isinstance(classifier.flat_head, FlatForest)
+    assert classifier.predict_batch(signals) == expected
+    
+    classifier.FLAT_MAX_BATCH = 4  # au-delà : forêt sklearn
+    assert classifier.predict_batch(signals) == expected
+
+
+def test_rejects_unsupported_pipeline():
+    """Test pipeline sans RandomForest"""
+    from sklearn.linear_model import LogisticRegression
+    X, y = np.random.default_rng(0).normal(size=(20, 3)), np.arange(20) % 2
+    with pytest.raises(ValueError):
+        FlatForest.from_pipeline(Pipeline([('classifier', LogisticRegression().fit(X, y))]))
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+from app.inference import InferenceExecutor, InferenceQueueFull, MicroBatcher
+
+
+def test_run_in_pool():
+    """Test exécution dans un thread du pool, hors boucle asyncio"""
+    executor = InferenceExecutor(max_workers=1, max_pending=4)
+    
+    thread_name = asyncio.run(executor.run(lambda: threading.current_thread().name))
+    
+    assert thread_name.startswith("inference")
+    assert executor.get_metrics()["completed"] == 1
+    executor.shutdown()
+
+
+def test_backpressure_rejects_when_full():
+    """Test rejet immédiat quand max_pending jobs sont en cours"""
+    executor = InferenceExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: None)
+        release.set()
+        await blocked
+    
+    asyncio.run(scenario())
+    assert executor.get_metrics()["rejected"] == 1
+    assert executor.get_metrics()["pending"] == 0
+    executor.shutdown()
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    """Test regroupement des requêtes concurrentes en un seul batch"""
+    executor = InferenceExecutor(max_workers=1, max_pending=4)
+    batch_shapes = []
+    
+    def fn(rows, contexts):
+        batch_shapes.append(rows.shape)
+        return [f"{context}:{row[0]:.0f}" for row, context in zip(rows, contexts)]
+    
+    batcher = MicroBatcher(executor, fn, max_batch_size=8, max_wait_ms=50)
+    
+    async def scenario():
+        return await asyncio.gather(*[
+            batcher.submit(np.full((1, 3000), i), context=f"req{i}") for i in range(5)
+        ])
+    
+    results = asyncio.run(scenario())
+    
+    assert results == [f"req{i}:{i}" for i in range(5)]
+    assert batch_shapes == [(5, 3000)]
+    assert batcher.get_metrics()["batch_size_histogram"] == {5: 1}
+    executor.shutdown()
+
+
+def test_micro_batcher_respects_max_batch_size():
+    """Test découpage en batchs de max_batch_size lignes"""
+    executor = InferenceExecutor(max_workers=1, max_pending=4)
+    batcher = MicroBatcher(executor, lambda rows, contexts: list(contexts), max_batch_size=2, max_wait_ms=50)
+    
+    async def scenario():
+        return await asyncio.gather(*[batcher.submit(np.zeros(3000), context=i) for i in range(5)])
+    
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+    assert batcher.get_metrics()["batch_size_histogram"] == {1: 1, 2: 2}
+    executor.shutdown()
+
+
+def test_micro_batcher_propagates_errors():
+    """Test propagation de l'exception à toutes les requêtes du batch"""
+    executor = InferenceExecutor(max_workers=1, max_pending=4)
+    
+    def fn(rows, contexts):
+        raise ValueError("signal invalide")
+    
+    batcher = MicroBatcher(executor, fn, max_batch_size=4, max_wait_ms=10)
+    
+    async def scenario():
+        return await asyncio.gather(
+            *[batcher.submit(np.zeros(3000)) for _ in range(2)], return_exceptions=True
+        )
+    
+    assert all(isinstance(r, ValueError) for r in asyncio.run(scenario()))
+    executor.shutdown()
@@ -0,0 +1,36 @@
+import json
+from app.log_store import JsonlLogStore
+
+
+def test_tail_reads_last_lines(tmp_path, monkeypatch):
+    """Test lecture des N dernières lignes à rebours (blocs plus petits que le fichier)"""
+    monkeypatch.setattr("app.log_store.TAIL_BLOCK_SIZE", 16)
+    store = JsonlLogStore(tmp_path / "predictions.jsonl", max_bytes=None)
+    store.append([json.dumps({"i": i}) for i in range(100)])
+    
+    assert [json.loads(line)["i"] for line in store.tail(3)] == [97, 98, 99]
+    assert len(store.tail(1000)) == 100
+    assert store.tail(0) == []
+
+
+def test_rotation_by_size_is_transparent(tmp_path):
+    """Test rotation par taille, lecture à travers les archives"""
+    store = JsonlLogStore(tmp_path / "predictions.jsonl", max_bytes=200, backup_count=2)
+    for i in range(60):
+        store.append([json.dumps({"i": i})])
+    
+    assert len(store.files()) == 3  # courant + .1 + .2
+    assert all(p.stat().st_size <= 200 for p in store.files())
+    tail = [json.loads(line)["i"] for line in store.tail(25)]
+    assert tail == list(range(60))[-len(tail):]
+    assert len(tail) > 20  # les lignes des archives sont incluses
+
+
+def test_rotation_by_interval(tmp_path):
+    """Test rotation par durée"""
+    store = JsonlLogStore(tmp_path / "predictions.jsonl", max_bytes=None, rotate_interval=0)
+    store.append(['{"i": 0}'])
+    store.append(['{"i": 1}'])
+    
+    assert (tmp_path / "predictions.jsonl.1").exists()
+    assert store.tail(2) == ['{"i": 0}', '{"i": 1}']
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+
+def test_predict_single_pipeline_pass(classifier):
+    """Test predict : un seul predict_proba, pas de pipeline.predict"""
+    pipeline = classifier.pipeline
+    proba = Mock(wraps=pipeline.predict_proba)
+    predict = Mock(wraps=pipeline.predict)
+    classifier.pipeline = Mock(predict_proba=proba, predict=predict)
+    
+    predicted_class, predicted_index, confidence, probabilities = classifier.predict(np.zeros(3000))
+    
+    assert proba.call_count == 1
+    assert predict.call_count == 0
+    assert (predicted_class, predicted_index) == ("N2", 2)
+    assert confidence == pytest.approx(0.5)
+    assert set(probabilities) == {"Wake", "N1", "N2", "N3", "REM"}
+
+
+def test_predict_proba_batch_shape(classifier):
+    """Test predict_proba : (N, 3000) → (N, 5)"""
+    assert classifier.predict_proba(np.zeros((7, 3000))).shape == (7, 5)
+    with pytest.raises(ValueError):
+        classifier.predict_proba(np.zeros((7, 100)))
+
+
+def test_predict_batch_returns_features(classifier, real_pipeline):
+    """Test features du pipeline réutilisées, probabilités inchangées"""
+    classifier.pipeline = real_pipeline
+    classifier._split_pipeline()
+    signals = np.random.default_rng(1).normal(size=(4, 3000))
+    
+    results, features = classifier.predict_batch(signals, return_features=True)
+    
+    np.testing.assert_array_equal(features, real_pipeline[0].transform(signals))
+    np.testing.assert_allclose(classifier.predict_proba(signals), real_pipeline.predict_proba(signals))
+    assert len(results) == 4
+
+
+def test_monitor_uses_features_for_signal_stats(tmp_path):
+    """Test statistiques du signal tirées des features (pas de recalcul)"""
+    from app.monitoring import SimpleMonitor
+    from app.feature_extractor import FeatureExtractor
+    
+    signal = np.random.default_rng(2).normal(size=3000)
+    features = FeatureExtractor().transform(signal[None])[0]
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"), async_writes=False)
+    monitor.log_prediction(signal, "N2", 0.5, {}, 1.0, features=features)
+    
+    entry = monitor.get_recent_logs(1)[0]
+    assert entry["signal_stats"]["mean"] == pytest.approx(np.mean(signal))
+    assert entry["signal_stats"]["max"] == pytest.approx(np.max(signal))
+    assert len(entry["features"]) == 16
@@ -0,0 +1,50 @@
+import json
+import numpy as np
+import pytest
+
+from app.ml_model import SleepStageClassifier
+from app.model_artifact import load_flat_model, load_pipeline, read_metadata, save_artifact
+
+
+@pytest.fixture
+def signals():
+    return np.random.default_rng(3).normal(size=(6, 3000)) * 20
+
+
+def test_flat_model_is_memory_mapped(real_pipeline, tmp_path, signals, real_joblib_load):
+    """Test forêt rechargée en mmap, mêmes probabilités que le pipeline"""
+    metadata = save_artifact(real_pipeline, tmp_path / "model")
+    assert metadata["n_trees"] == 10
+    
+    extractor, forest = load_flat_model(tmp_path / "model")
+    assert isinstance(forest.threshold, np.memmap)
+    assert not forest.value.flags.writeable
+    np.testing.assert_array_equal(forest.predict_proba(extractor.transform(signals)),
+                                  real_pipeline.predict_proba(signals))
+    np.testing.assert_array_equal(load_pipeline(tmp_path / "model").predict_proba(signals),
+                                  real_pipeline.predict_proba(signals))
+
+
+@pytest.mark.parametrize("backend", ["sklearn", "flat"])
+def test_classifier_loads_artifact(real_pipeline, tmp_path, signals, real_joblib_load, backend):
+    """Test SleepStageClassifier sur un dossier d'artefact"""
+    save_artifact(real_pipeline, tmp_path / "model")
+    classifier = SleepStageClassifier(str(tmp_path / "model"), backend=backend)
+    
+    assert classifier.is_loaded()
+    assert (classifier.pipeline is None) == (backend == "flat")
+    probabilities = np.array([list(p.values()) for *_, p in classifier.predict_batch(signals)])
+    np.testing.assert_array_equal(probabilities, real_pipeline.predict_proba(signals))
+
+
+def test_save_is_atomic_and_versioned(real_pipeline, tmp_path):
+    """Test dossier existant refusé, pas de dossier temporaire laissé, version vérifiée"""
+    save_artifact(real_pipeline, tmp_path / "model")
+    with pytest.raises(FileExistsError):
+        save_artifact(real_pipeline, tmp_path / "model")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model"]
+    
+    metadata_file = tmp_path / "model" / "metadata.json"
+    metadata_file.write_text(json.dumps({**json.loads(metadata_file.read_text()), "artifact_version": 99}))
+    with pytest.raises(ValueError):
+        read_metadata(tmp_path / "model")
@@ -0,0 +1,110 @@
+import json
+import numpy as np
+import pytest
+from app.monitoring import SimpleMonitor
+
+
+def log_random_predictions(monitor, n, seed=0):
+    rng = np.random.default_rng(seed)
+    classes = ["Wake", "N1", "N2", "N3", "REM"]
+    for _ in range(n):
+        monitor.log_prediction(
+            signal=rng.normal(size=3000),
+            prediction=classes[rng.integers(5)],
+            confidence=float(rng.uniform(0.2, 1.0)),
+            probabilities={},
+            processing_time=float(rng.uniform(1, 10))
+        )
+
+
+@pytest.mark.parametrize("last_n", [1, 7, 30, 1000])
+def test_buffer_statistics_match_file_statistics(tmp_path, last_n):
+    """Test agrégats incrémentaux == recalcul depuis le fichier"""
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"), buffer_capacity=40)
+    log_random_predictions(monitor, 100)
+    monitor.flush()
+    
+    fast = monitor.get_statistics(last_n)
+    reference = monitor._statistics_from_logs([json.loads(line) for line in monitor.store.tail(last_n)])
+    
+    assert fast["total_predictions"] == reference["total_predictions"]
+    assert fast["class_distribution"] == reference["class_distribution"]
+    assert fast["time_range"] == reference["time_range"]
+    for key in ("mean", "std", "min", "max"):
+        assert fast["confidence_stats"][key] == pytest.approx(reference["confidence_stats"][key])
+    assert fast["confidence_by_class"] == pytest.approx(reference["confidence_by_class"])
+    assert fast["avg_processing_time_ms"] == pytest.approx(reference["avg_processing_time_ms"])
+
+
+def test_buffer_warmed_from_existing_log(tmp_path):
+    """Test buffer rechargé depuis la fin du fichier au démarrage"""
+    log_file = str(tmp_path / "predictions.jsonl")
+    writer_monitor = SimpleMonitor(log_file)
+    log_random_predictions(writer_monitor, 25)
+    writer_monitor.close()
+    
+    monitor = SimpleMonitor(log_file, buffer_capacity=10)
+    assert len(monitor.buffer) == 10
+    assert monitor.get_recent_logs(3) == [json.loads(line) for line in monitor.store.tail(3)]
+    assert monitor.get_statistics(50)["total_predictions"] == 25  # au-delà du buffer : fichier
+
+
+def test_buffer_keeps_few_full_records(tmp_path):
+    """Test entrées complètes limitées à la fenêtre /recent, au-delà : fichier"""
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"), buffer_capacity=40, recent_capacity=5)
+    log_random_predictions(monitor, 30)
+    
+    assert len(monitor.buffer.recent(100)) == 5
+    assert monitor.get_statistics(30)["total_predictions"] == 30
+    assert monitor.get_statistics(30)["last_prediction"] == monitor.buffer.recent(1)[0]
+    recent = monitor.get_recent_logs(12)
+    assert len(recent) == 12
+    assert recent[-5:] == monitor.buffer.recent(5)
+
+
+def test_drift_from_buffer(tmp_path):
+    """Test détection de drift sur les fenêtres du buffer"""
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"))
+    for confidence in [0.9] * 50 + [0.5] * 50:
+        monitor.log_prediction(np.zeros(3000), "N2", confidence, {}, 5.0)
+    
+    result = monitor.detect_drift(threshold=0.1, window_size=50)
+    assert result["drift_detected"] is True
+    assert result["confidence_drift"]["older_avg"] == pytest.approx(0.9)
+    assert result["confidence_drift"]["recent_avg"] == pytest.approx(0.5)
+    assert result["class_distribution_shift"]["recent"] == {"N2": 50}
+
+
+def test_async_writer_flushes_in_batches(tmp_path):
+    """Test écriture asynchrone : tout est écrit au close, compteurs à jour"""
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"))
+    log_random_predictions(monitor, 20)
+    monitor.close()
+    
+    assert len(monitor.store.tail(100)) == 20
+    metrics = monitor.get_writer_metrics()
+    assert metrics["flushed"] == 20
+    assert metrics["dropped"] == 0
+
+
+def test_async_writer_drops_when_queue_full(tmp_path):
+    """Test abandon (compté) quand la file est pleine"""
+    from app.log_store import BufferedLogWriter, JsonlLogStore
+    
+    writer = BufferedLogWriter(JsonlLogStore(tmp_path / "predictions.jsonl"), max_queue=2)
+    writer._ensure_started = lambda: None  # thread non démarré : la file se remplit
+    
+    assert writer.submit(["{}", "{}", "{}", "{}"]) == 2
+    assert writer.get_metrics()["dropped"] == 2
+
+
+def test_async_writer_restarts_after_close(tmp_path):
+    """Test écriture après close : le thread est relancé, rien n'est perdu"""
+    monitor = SimpleMonitor(str(tmp_path / "predictions.jsonl"))
+    log_random_predictions(monitor, 5)
+    monitor.close()
+    log_random_predictions(monitor, 5)
+    monitor.close()
+    
+    assert len(monitor.store.tail(100)) == 10
+    assert monitor.get_writer_metrics()["dropped"] == 0
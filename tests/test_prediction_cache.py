@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from app.prediction_cache import PredictionCache
+
+
+def test_lru_eviction():
+    """Test éviction de l'entrée la moins récemment utilisée"""
+    cache = PredictionCache(capacity=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.get_metrics()["evictions"] == 1
+
+
+def test_ttl_expiration(monkeypatch):
+    """Test expiration des entrées après le TTL"""
+    now = [100.0]
+    monkeypatch.setattr("app.prediction_cache.time.monotonic", lambda: now[0])
+    cache = PredictionCache(capacity=10, ttl=5.0)
+    cache.put("a", 1)
+    
+    now[0] = 104.0
+    assert cache.get("a") == 1
+    now[0] = 106.0
+    assert cache.get("a") is None
+    assert cache.get_metrics()["expirations"] == 1
+
+
+def test_classifier_cache_skips_pipeline(classifier, real_pipeline, monkeypatch):
+    """Test époques déjà vues : pas de passage dans le pipeline, même résultat"""
+    classifier.pipeline = real_pipeline
+    classifier._split_pipeline()
+    classifier.set_prediction_cache(PredictionCache(capacity=16))
+    signals = np.random.default_rng(0).normal(size=(3, 3000))
+    
+    expected, expected_features = classifier.predict_batch(signals, return_features=True, use_cache=True)
+    computed = []
+    compute = classifier._compute_proba_and_features
+    monkeypatch.setattr(classifier, "_compute_proba_and_features",
+                        lambda X: computed.append(len(X)) or compute(X))
+    
+    results, features = classifier.predict_batch(signals[[2, 0, 1]], return_features=True, use_cache=True)
+    assert computed == []
+    assert results == [expected[2], expected[0], expected[1]]
+    np.testing.assert_array_equal(features, expected_features[[2, 0, 1]])
+    assert classifier.prediction_cache.get_metrics()["hit_rate"] == pytest.approx(0.5)
+
+
+def test_classifier_cache_bypassed_by_default(classifier):
+    """Test batch sans use_cache : le cache n'est ni lu ni rempli"""
+    cache = PredictionCache(capacity=16)
+    classifier.set_prediction_cache(cache)
+    classifier.predict_batch(np.zeros((4, 3000)))
+    
+    assert len(cache) == 0
+    assert cache.get_metrics()["misses"] == 0
+    classifier.predict(np.ones(3000))
+    assert len(cache) == 1
+
+
+def test_classifier_cache_invalidated_on_model_change(classifier, real_pipeline):
+    """Test changement de pipeline : nouvelle version, cache vidé"""
+    cache = PredictionCache(capacity=16)
+    classifier.set_prediction_cache(cache)
+    classifier.predict_batch(np.zeros((2, 3000)), use_cache=True)
+    version = classifier.model_version
+    
+    classifier.pipeline = real_pipeline
+    classifier._split_pipeline()
+    assert classifier.model_version != version
+    assert len(cache) == 0
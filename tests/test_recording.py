@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.recording import EpochAssembler, hypnogram_entries, score_recording
+
+
+def test_assembler_splits_arbitrary_chunks():
+    """Test découpage en époques quelle que soit la taille des chunks"""
+    signal = np.arange(3000 * 5 + 100, dtype="<f4")
+    payload = signal.tobytes()
+    assembler = EpochAssembler(dtype="float32", batch_size=2)
+    
+    batches = []
+    for start in range(0, len(payload), 7777):  # Coupe des flottants en deux
+        batches.extend(assembler.feed_bytes(payload[start:start + 7777]))
+    batches.extend(assembler.finish())
+    
+    assert [len(b) for b in batches] == [2, 2, 1]
+    np.testing.assert_array_equal(np.vstack(batches).ravel(), signal[:15000])
+    assert assembler.n_epochs == 5
+    assert assembler.discarded_samples == 100
+
+
+def test_assembler_batches_are_independent():
+    """Test batchs émis non réutilisés par le buffer interne"""
+    assembler = EpochAssembler(batch_size=1)
+    first = next(assembler.feed_samples(np.ones(3000)))
+    list(assembler.feed_samples(np.zeros(3000)))
+    assert first.dtype == np.float64
+    assert (first == 1).all()
+
+
+def test_assembler_rejects_non_finite():
+    """Test NaN dans l'enregistrement → ValueError"""
+    assembler = EpochAssembler(batch_size=1)
+    with pytest.raises(ValueError):
+        list(assembler.feed_samples(np.full(3000, np.nan)))
+
+
+def test_assembler_invalid_dtype():
+    """Test dtype non supporté"""
+    with pytest.raises(ValueError):
+        EpochAssembler(dtype="int16")
+
+
+def test_hypnogram_entries():
+    """Test une ligne d'hypnogramme par époque, indexée depuis first_epoch"""
+    entries = hypnogram_entries([("N2", 2, 0.5, {"N2": 0.5})] * 2, first_epoch=10)
+    assert [e["epoch"] for e in entries] == [10, 11]
+    assert entries[1]["start_s"] == 330.0
+
+
+def test_score_recording(classifier, monkeypatch):
+    """Test scoring d'un enregistrement continu par batchs bornés"""
+    batch_sizes = []
+    predict_batch = classifier.predict_batch
+    
+    def spy(signals, **kwargs):
+        batch_sizes.append(len(signals))
+        return predict_batch(signals, **kwargs)
+    
+    monkeypatch.setattr(classifier, "predict_batch", spy)
+    chunks = (np.random.randn(1000) for _ in range(31))  # 10 époques + 1000 points
+    epochs = list(score_recording(classifier, chunks, batch_size=4))
+    
+    assert [e["epoch"] for e in epochs] == list(range(10))
+    assert all(e["predicted_class"] == "N2" for e in epochs)
+    assert batch_sizes == [4, 4, 2]
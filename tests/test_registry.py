@@ -0,0 +1,146 @@
+import json
+import threading
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.main import app
+from app.model_artifact import save_artifact
+from app.registry import ModelLoadInProgress, ModelRegistry
+
+CNN_FILE = Path(__file__).parent.parent / "notebooks" / "models" / "cnn_regularizedlight_20251015_202037" / "cnn_model.npz"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def model_dir(real_pipeline, real_joblib_load, tmp_path):
+    """Dossier avec un pipeline .joblib, un artefact, le CNN et des fichiers ignorés"""
+    root = tmp_path / "models"
+    root.mkdir()
+    joblib.dump(real_pipeline, root / "rf.joblib")
+    save_artifact(real_pipeline, root / "rf_artifact")
+    (root / "cnn").mkdir()
+    (root / "cnn" / "cnn_model.npz").write_bytes(CNN_FILE.read_bytes())
+    (root / "cnn" / "metadata.json").write_text("{}")  # dossier de notebook, pas un artefact
+    joblib.dump({"n_estimators": 500}, root / "rf_best_params.pkl")
+    (root / "ensemble.json").write_text(json.dumps({"members": [
+        {"path": "rf.joblib", "backend": "flat"}, {"path": "cnn/cnn_model.npz", "backend": "cnn"}
+    ]}))
+    return root
+
+
+@pytest.fixture
+def swaps():
+    return []
+
+
+@pytest.fixture
+def registry(model_dir, swaps):
+    registry = ModelRegistry([model_dir], on_swap=swaps.append, warmup_epochs=4, base_dir=model_dir)
+    yield registry
+    registry.shutdown()
+
+
+def test_list_models(registry):
+    """Test artefacts reconnus (pipeline, dossier, CNN), .pkl et fichiers internes ignorés"""
+    models = {entry["model_id"]: entry for entry in registry.list_models()}
+    
+    assert set(models) == {"rf.joblib", "rf_artifact", "cnn/cnn_model.npz", "ensemble.json"}
+    assert models["rf.joblib"]["backends"] == ["sklearn", "flat"]
+    assert models["rf_artifact"]["backends"] == ["flat", "sklearn"]
+    assert models["rf_artifact"]["metadata"]["n_trees"] == 10
+    assert models["cnn/cnn_model.npz"]["kind"] == "cnn"
+    assert models["cnn/cnn_model.npz"]["metadata"]["model_type"] == "CNN_RegularizedLight"
+    assert models["ensemble.json"]["backends"] == ["ensemble"]
+    assert len(models["ensemble.json"]["metadata"]["members"]) == 2
+    assert not any(entry["active"] for entry in models.values())
+
+
+def test_load_async_swaps_after_warm_up(registry, swaps):
+    """Test chargement en arrière-plan : temps enregistrés, substitution, ancien marqué remplacé"""
+    first = registry.load_async("rf.joblib").result(timeout=30)
+    second = registry.load_async("rf_artifact").result(timeout=30)
+    
+    assert [classifier.backend for classifier in swaps] == ["sklearn", "flat"]
+    assert swaps[1].is_loaded()
+    assert second["status"] == "active" and first["status"] == "replaced"
+    assert second["load_time_ms"] > 0 and second["warmup_ms"] > 0
+    
+    status = registry.get_status()
+    assert status["active"]["model_id"] == "rf_artifact"
+    assert status["loading"] is None
+    assert [entry["active"] for entry in registry.list_models() if entry["model_id"] == "rf_artifact"] == [True]
+
+
+def test_failed_load_keeps_active_model(registry, swaps, model_dir):
+    """Test échec de chargement : le modèle actif reste en place"""
+    registry.load(model_dir / "rf.joblib", "sklearn")
+    (model_dir / "broken.joblib").write_bytes(b"pas un pickle")
+    
+    with pytest.raises(Exception):
+        registry.load_async("broken.joblib").result(timeout=30)
+    
+    assert len(swaps) == 1
+    status = registry.get_status()
+    assert status["active"]["model_id"] == "rf.joblib"
+    assert status["history"][-1]["status"] == "failed"
+    assert status["loading"] is None
+
+
+def test_load_async_validation(registry, monkeypatch):
+    """Test identifiant inconnu, backend non supporté, chargement déjà en cours"""
+    with pytest.raises(KeyError):
+        registry.load_async("absent.joblib")
+    with pytest.raises(ValueError):
+        registry.load_async("cnn/cnn_model.npz", "flat")
+    
+    release = threading.Event()
+    monkeypatch.setattr(registry, "_warm_up", lambda classifier: release.wait(30) and 0.0)
+    future = registry.load_async("rf.joblib")
+    with pytest.raises(ModelLoadInProgress):
+        registry.load_async("rf_artifact")
+    release.set()
+    future.result(timeout=30)
+
+
+def test_models_endpoints(registry, model_dir, monkeypatch):
+    """Test GET /models et POST /models/load (202, 404, 400, 409)"""
+    monkeypatch.setattr(api, "model", None)
+    monkeypatch.setattr(registry, "on_swap", api._set_model)
+    monkeypatch.setattr(api, "registry", registry)
+    registry.load(model_dir / "rf.joblib", "sklearn")
+    previous = api.model
+    
+    response = client.get("/models")
+    assert response.status_code == 200
+    assert len(response.json()["models"]) == 4
+    
+    assert client.post("/models/load", json={"model_id": "absent"}).status_code == 404
+    assert client.post("/models/load", json={"model_id": "rf.joblib", "backend": "cnn"}).status_code == 400
+    
+    release = threading.Event()
+    warm_up = registry._warm_up
+    monkeypatch.setattr(registry, "_warm_up", lambda c: release.wait(30) and warm_up(c))
+    response = client.post("/models/load", json={"model_id": "cnn/cnn_model.npz"})
+    assert response.status_code == 202
+    assert response.json()["loading"]["model_id"] == "cnn/cnn_model.npz"
+    assert client.post("/models/load", json={"model_id": "rf.joblib"}).status_code == 409
+    assert api.model is previous  # l'ancien modèle sert pendant le chargement
+    
+    release.set()
+    registry.shutdown()  # attend la fin du chargement
+    assert api.model.backend == "cnn"
+    assert client.get("/model-info").json()["model_type"] == "CNN_RegularizedLight"
+
+
+def test_load_ensemble(registry, swaps):
+    """Test chargement d'une configuration d'ensemble par le registre"""
+    record = registry.load_async("ensemble.json").result(timeout=30)
+    
+    assert record["backend"] == "ensemble"
+    assert [member.backend for member in swaps[0].members] == ["flat", "cnn"]
@@ -0,0 +1,76 @@
+import base64
+import io
+import numpy as np
+import pytest
+from app.signal_codec import decode_signals, max_payload_size, UnsupportedContentType
+
+
+@pytest.fixture
+def signals():
+    return np.random.default_rng(0).normal(size=(3, 3000))
+
+
+def test_decode_raw_float32(signals):
+    """Test octets float32 little-endian → (N, 3000)"""
+    body = signals.astype("<f4").tobytes()
+    decoded = decode_signals(body, "application/octet-stream", dtype="float32")
+    assert decoded.shape == (3, 3000)
+    np.testing.assert_array_equal(decoded, signals.astype(np.float32))
+
+
+def test_decode_raw_float64_zero_copy(signals):
+    """Test octets float64 : vue sans copie sur le buffer de la requête"""
+    body = signals.astype("<f8").tobytes()
+    decoded = decode_signals(body, "application/octet-stream", dtype="float64")
+    assert not decoded.flags.writeable
+    assert not decoded.flags.owndata
+    np.testing.assert_array_equal(decoded, signals)
+
+
+def test_decode_base64_float64(signals):
+    """Test base64 de float64"""
+    body = base64.b64encode(signals.astype("<f8").tobytes())
+    decoded = decode_signals(body, "application/base64", dtype="float64")
+    np.testing.assert_array_equal(decoded, signals)
+
+
+def test_decode_npy(signals):
+    """Test fichier .npy"""
+    buffer = io.BytesIO()
+    np.save(buffer, signals)
+    decoded = decode_signals(buffer.getvalue(), "application/x-npy")
+    np.testing.assert_array_equal(decoded, signals)
+
+
+def test_decode_npy_rejects_other_shapes(signals):
+    """Test .npy : seules les shapes (3000,) et (N, 3000) sont acceptées"""
+    single = io.BytesIO()
+    np.save(single, signals[0])
+    assert decode_signals(single.getvalue(), "application/x-npy").shape == (1, 3000)
+    
+    for array in (signals[:2].T, np.zeros((2, 50, 60))):
+        buffer = io.BytesIO()
+        np.save(buffer, array)
+        with pytest.raises(ValueError, match="shape"):
+            decode_signals(buffer.getvalue(), "application/x-npy")
+
+
+def test_decode_rejects_invalid(signals):
+    """Test payloads invalides"""
+    with pytest.raises(ValueError):
+        decode_signals(np.zeros(2999, "<f4").tobytes(), "application/octet-stream")
+    with pytest.raises(ValueError):
+        decode_signals(np.full(3000, np.nan, "<f4").tobytes(), "application/octet-stream")
+    with pytest.raises(UnsupportedContentType):
+        decode_signals(b"", "text/csv")
+
+
+def test_max_payload_size(signals):
+    """Test borne de taille : payloads exacts acceptés, une valeur de plus refusée"""
+    raw = signals.astype("<f4").tobytes()
+    assert len(raw) == max_payload_size("application/octet-stream", "float32", 3)
+    assert len(base64.b64encode(raw)) <= max_payload_size("application/base64", "float32", 3)
+    buffer = io.BytesIO()
+    np.save(buffer, signals)
+    assert len(buffer.getvalue()) <= max_payload_size("application/x-npy", "float32", 3)
+    assert len(raw) + 4 > max_payload_size("application/octet-stream; charset=binary", "float32", 3)
@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.recording import score_recording
+from app.smoothing import HypnogramSmoother, estimate_transitions, hypnogram_stages, viterbi
+
+
+@pytest.fixture
+def smoother():
+    """HMM appris sur des nuits synthétiques : longs blocs de stades"""
+    rng = np.random.default_rng(0)
+    sequences = [np.repeat(rng.integers(0, 5, 40), rng.integers(5, 30, 40)) for _ in range(10)]
+    return HypnogramSmoother.fit(sequences)
+
+
+def noisy_probabilities(stages, rng, noise=0.3):
+    """Probabilités d'un classificateur imparfait : vrai stade favorisé, bruit Dirichlet"""
+    probabilities = rng.dirichlet(np.ones(5), size=len(stages)) * noise
+    probabilities[np.arange(len(stages)), stages] += 1 - noise
+    return probabilities
+
+
+def test_viterbi_matches_brute_force():
+    """Test chemin de Viterbi = argmax exhaustif sur toutes les séquences"""
+    rng = np.random.default_rng(1)
+    log_transitions = np.log(rng.dirichlet(np.ones(3), size=3))
+    log_start = np.log(rng.dirichlet(np.ones(3)))
+    log_emissions = np.log(rng.dirichlet(np.ones(3), size=6))
+    
+    def score(path):
+        return log_start[path[0]] + log_emissions[0, path[0]] + sum(
+            log_transitions[path[t - 1], path[t]] + log_emissions[t, path[t]] for t in range(1, len(path)))
+    
+    expected = max(itertools.product(range(3), repeat=6), key=score)
+    assert tuple(viterbi(log_emissions, log_start, log_transitions)) == expected
+    assert viterbi(np.empty((0, 3)), log_start, log_transitions).size == 0
+
+
+def test_estimate_transitions_skips_unscored_epochs():
+    """Test comptes des paires consécutives scorées seulement, lissage de Laplace"""
+    estimate = estimate_transitions([[0, 0, 1, -1, 2, 2], [2, 3]], n_classes=4, pseudocount=0.0)
+    
+    np.testing.assert_allclose(estimate["transitions"][0], [0.5, 0.5, 0, 0])
+    np.testing.assert_allclose(estimate["transitions"][2], [0, 0, 0.5, 0.5])
+    assert estimate["n_sequences"] == 2 and estimate["n_epochs"] == 7
+    np.testing.assert_allclose(estimate["initial"], [0.5, 0, 0.5, 0])
+
+
+def test_decode_removes_isolated_errors(smoother):
+    """Test époque isolée faiblement mal classée corrigée, changement de stade franc conservé"""
+    stages = np.array([2] * 10 + [3] * 10)
+    probabilities = np.tile([0.05, 0.1, 0.7, 0.1, 0.05], (20, 1))
+    probabilities[10:] = [0.05, 0.05, 0.1, 0.75, 0.05]
+    probabilities[4] = [0.05, 0.42, 0.4, 0.08, 0.05]  # N1 à peine devant N2
+    
+    assert probabilities.argmax(axis=1)[4] == 1
+    np.testing.assert_array_equal(smoother.decode(probabilities), stages)
+
+
+def test_stream_matches_full_decode(smoother):
+    """Test décodage en flux : retard respecté, identique au décodage complet si le retard couvre la nuit"""
+    rng = np.random.default_rng(2)
+    probabilities = noisy_probabilities(np.repeat([0, 1, 2, 3, 2, 4], 15), rng)
+    
+    decoder = smoother.stream(lag=len(probabilities))
+    decided = [decoder.push(probabilities[i:i + 16]) for i in range(0, len(probabilities), 16)]
+    assert all(d.size == 0 for d in decided)
+    np.testing.assert_array_equal(decoder.finish(), smoother.decode(probabilities))
+    
+    decoder = smoother.stream(lag=5)
+    assert decoder.push(probabilities[:8]).size == 3
+    assert decoder.n_pending == 5
+    assert decoder.push(probabilities[8:9]).size == 1
+    assert decoder.finish().size == 5 and decoder.n_decided == 9
+
+
+def test_save_load_roundtrip(smoother, tmp_path):
+    """Test HMM écrit en JSON puis relu"""
+    smoother.save(tmp_path / "transitions.json")
+    loaded = HypnogramSmoother.load(tmp_path / "transitions.json")
+    
+    np.testing.assert_allclose(loaded.transitions, smoother.transitions)
+    assert loaded.info["n_sequences"] == 10
+    with pytest.raises(ValueError):
+        HypnogramSmoother(np.ones((5, 5)))
+
+
+def test_hypnogram_stages():
+    """Test annotations Sleep-EDF → stade par époque (N4 → N3, époques exclues à -1)"""
+    annotations = [(0.0, 90.0, "Sleep stage W"), (90.0, 30.0, "Sleep stage 4"),
+                   (120.0, 60.0, "Movement time"), (180.0, 30.0, "Sleep stage R")]
+    np.testing.assert_array_equal(hypnogram_stages(annotations), [0, 0, 0, 3, -1, -1, 4])
+
+
+def test_score_recording_with_smoothing(classifier, smoother):
+    """Test stade lissé ajouté à chaque époque, toutes les époques émises dans l'ordre"""
+    signal = np.random.default_rng(3).normal(size=3000 * 7)
+    epochs = list(score_recording(classifier, [signal], batch_size=3, smoother=smoother, lag=2))
+    
+    assert [epoch["epoch"] for epoch in epochs] == list(range(7))
+    assert all(epoch["smoothed_class"] == "N2" and epoch["smoothed_index"] == 2 for epoch in epochs)
@@ -0,0 +1,108 @@
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import main as api
+from app.feature_extractor import FeatureExtractor
+from app.main import app
+from app.ml_model import SleepStageClassifier
+from app.monitoring import SimpleMonitor
+from app.streaming import LiveScorer, StreamingFeatureExtractor
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def signal():
+    """Signal continu de 5 min : dérive lente, décalage, plateau (valeurs répétées)"""
+    rng = np.random.default_rng(7)
+    x = np.cumsum(rng.normal(size=30000)) * 0.3 + rng.normal(size=30000) * 20 + 40
+    x[5000:5300] = 3.0
+    return x
+
+
+def sliding_features(signal, hop):
+    """Référence : FeatureExtractor sur chaque fenêtre de 3000 points"""
+    starts = range(0, len(signal) - 3000 + 1, hop)
+    return FeatureExtractor().fit(None).transform(np.stack([signal[s:s + 3000] for s in starts]))
+
+
+@pytest.mark.parametrize("hop", [128, 256, 1280])
+def test_matches_feature_extractor(signal, hop):
+    """Test features incrémentales = FeatureExtractor de chaque fenêtre, morceaux de taille quelconque"""
+    extractor = StreamingFeatureExtractor(hop=hop, refresh_every=1000)
+    rng = np.random.default_rng(8)
+    bounds = np.cumsum(rng.integers(1, 700, size=200))
+    chunks = np.split(signal, bounds[bounds < len(signal)])
+    
+    features = np.vstack([extractor.push(chunk) for chunk in chunks])
+    np.testing.assert_allclose(features, sliding_features(signal, hop), rtol=1e-9)
+    assert extractor.n_windows == len(features)
+    assert extractor.window_end_s(1) == (3000 + hop) / 100
+
+
+def test_windows_and_bytes(signal):
+    """Test octets bruts coupés au milieu d'un flottant, fenêtres brutes pour les modèles sans features"""
+    extractor = StreamingFeatureExtractor(hop=256, dtype="float64")
+    data = signal[:4000].astype("<f8").tobytes()
+    
+    first, windows = extractor.feed_bytes(data[:1001], return_windows=True)
+    assert first.shape == (0, 16) and windows.shape == (0, 3000)
+    features, windows = extractor.feed_bytes(data[1001:], return_windows=True)
+    
+    assert len(features) == 4
+    np.testing.assert_array_equal(windows[-1], signal[768:3768])
+
+
+def test_invalid_parameters_and_signal():
+    """Test hop non aligné sur les segments de Welch, NaN rejetés"""
+    with pytest.raises(ValueError):
+        StreamingFeatureExtractor(hop=300)
+    with pytest.raises(ValueError):
+        StreamingFeatureExtractor(dtype="int16")
+    with pytest.raises(ValueError):
+        StreamingFeatureExtractor().push([0.0, np.nan])
+
+
+def test_live_scorer_uses_incremental_features(real_pipeline, real_joblib_load, signal, tmp_path):
+    """Test forêt : prédiction sur les features incrémentales, identique au pipeline sur chaque fenêtre"""
+    joblib.dump(real_pipeline, tmp_path / "rf.joblib")
+    scorer = LiveScorer(SleepStageClassifier(str(tmp_path / "rf.joblib")), hop=512)
+    assert scorer.uses_features
+    
+    entries, features = scorer.feed_bytes(signal.astype("<f4").tobytes())
+    windows = np.stack([signal.astype("<f4")[s:s + 3000] for s in range(0, len(signal) - 2999, 512)])
+    np.testing.assert_allclose([list(entry["probabilities"].values()) for entry in entries],
+                               real_pipeline.predict_proba(windows.astype(np.float64)))
+    assert [entry["window"] for entry in entries] == list(range(len(windows)))
+
+
+def test_live_endpoint(classifier, signal, tmp_path, monkeypatch):
+    """Test /ws/live : une estimation par fenêtre complétée, modèle sans features (fenêtre brute)"""
+    monkeypatch.setattr(api, "model", classifier)
+    monkeypatch.setattr(api, "monitor", SimpleMonitor(str(tmp_path / "predictions.jsonl")))
+    data = signal[:3512].astype("<f4").tobytes()
+    
+    with client.websocket_connect("/ws/live?hop=256") as websocket:
+        websocket.send_bytes(data[:8000])
+        websocket.send_bytes(data[8000:])
+        messages = [json.loads(websocket.receive_text()) for _ in range(3)]
+    
+    assert [message["window"] for message in messages] == [0, 1, 2]
+    assert messages[2]["end_s"] == 35.12
+    assert messages[0]["predicted_class"] == "N2"
+
+
+def test_live_endpoint_rejects_invalid_hop(classifier, monkeypatch):
+    """Test /ws/live : hop invalide → message d'erreur puis fermeture"""
+    monkeypatch.setattr(api, "model", classifier)
+    
+    with client.websocket_connect("/ws/live?hop=100") as websocket:
+        assert "hop" in websocket.receive_json()["error"]
+        with pytest.raises(WebSocketDisconnect) as exc:
+            websocket.receive_text()
+    assert exc.value.code == 1008
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.feature_extractor import FeatureExtractor
+from app.training import evaluate, featurize, fit_pipeline, load_split, resample_smote
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """X_train/y_train synthétiques sur disque (classes séparables par l'amplitude)"""
+    rng = np.random.default_rng(0)
+    y = np.arange(50) % 5
+    X = rng.normal(size=(50, 3000)) * (1 + 10 * y[:, None])
+    np.save(tmp_path / "X_train.npy", X)
+    np.save(tmp_path / "y_train.npy", y)
+    return tmp_path
+
+
+def test_load_split_is_memory_mapped(data_dir):
+    """Test X ouvert en mmap, pas chargé en RAM"""
+    X, y = load_split(data_dir)
+    assert isinstance(X, np.memmap)
+    assert X.shape == (50, 3000)
+
+
+def test_featurize_in_chunks(data_dir):
+    """Test features par chunks identiques à un transform global"""
+    X, _ = load_split(data_dir)
+    np.testing.assert_array_equal(featurize(X, chunk_size=7), FeatureExtractor().transform(np.asarray(X)))
+
+
+def test_fit_pipeline_on_features(data_dir):
+    """Test pipeline entraîné sur features, utilisable sur signaux bruts"""
+    X, y = load_split(data_dir)
+    pipeline = fit_pipeline(X, y, rf_params={'n_estimators': 10, 'random_state': 0},
+                            smote=False, chunk_size=16)
+    
+    assert list(pipeline.named_steps) == ['feature_extractor', 'scaler', 'classifier']
+    assert pipeline.predict_proba(np.asarray(X[:3])).shape == (3, 5)
+    assert evaluate(pipeline, X, y, chunk_size=16)['accuracy'] > 0.9
+
+
+def test_smote_on_features():
+    """Test SMOTE appliqué à la matrice de features"""
+    pytest.importorskip("imblearn")
+    features = np.random.default_rng(0).normal(size=(40, 16))
+    y = np.array([0] * 30 + [1] * 10)
+    _, y_balanced = resample_smote(features, y)
+    assert np.bincount(y_balanced).tolist() == [30, 30]
+
+
+def test_smote_requires_imblearn(monkeypatch):
+    """Test SMOTE demandé sans imbalanced-learn : erreur, pas d'entraînement silencieux sans rééquilibrage"""
+    import sys
+    monkeypatch.setitem(sys.modules, "imblearn.over_sampling", None)
+    with pytest.raises(ImportError):
+        resample_smote(np.zeros((10, 16)), np.arange(10) % 2)
@@ -0,0 +1,112 @@
+"""
+Script pour réentraîner le pipeline à partir des données preprocessées,
+sans charger X_train.npy en mémoire.
+
+Les signaux sont lus via np.load(mmap_mode='r') et featurisés par chunks ;
+SMOTE et la RandomForest travaillent sur la matrice de features (N × 16).
+
+Usage:
+    python train_pipeline.py --data-dir data/processed --output models/rf_retrained_pipeline.joblib
+
+Le pipeline servi par l'API (models/rf_v2_final_pipeline.joblib) n'est
+jamais écrasé implicitement : --output est obligatoire.
+"""
+
+import argparse
+import logging
+import resource
+import sys
+import time
+from pathlib import Path
+
+import joblib
+
+# Ajouter app/ au path pour importer les modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.feature_cache import FeatureCache
+from app.training import DEFAULT_RF_PARAMS, evaluate, fit_pipeline, load_split
+
+
+def peak_memory_mb() -> float:
+    """Pic de mémoire résidente du processus (MB, Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+logging.basicConfig(level=logging.INFO)
+
+parser = argparse.ArgumentParser(description="Réentraînement du pipeline SleepAI")
+parser.add_argument("--data-dir", default="data/processed", help="Dossier contenant X_train.npy / y_train.npy")
+parser.add_argument("--output", required=True, help="Pipeline à écrire, ex. models/rf_retrained_pipeline.joblib")
+parser.add_argument("--n-estimators", type=int, default=DEFAULT_RF_PARAMS['n_estimators'])
+parser.add_argument("--max-depth", type=int, default=DEFAULT_RF_PARAMS['max_depth'])
+parser.add_argument("--chunk-size", type=int, default=2048, help="Époques featurisées à la fois")
+parser.add_argument("--no-smote", action="store_true", help="Ne pas rééquilibrer les classes")
+parser.add_argument("--feature-cache", default=None,
+                    help="Cache SQLite des features (réutilisé entre entraînements), ex. cache/features.sqlite")
+args = parser.parse_args()
+
+print("=" * 70)
+print("🎓 ENTRAÎNEMENT DU PIPELINE (données mappées en mémoire)")
+print("=" * 70)
+
+# ============================================================================
+# Données
+# ============================================================================
+
+data_dir = Path(args.data_dir)
+print(f"\n📂 Ouverture des données : {data_dir}")
+try:
+    X_train, y_train = load_split(data_dir, 'train')
+except FileNotFoundError as e:
+    print(f"❌ Données d'entraînement non trouvées : {e}")
+    sys.exit(1)
+print(f"   X_train: {X_train.shape} {X_train.dtype} ({X_train.nbytes / 1e9:.2f} GB sur disque, mmap)")
+
+# ============================================================================
+# Entraînement
+# ============================================================================
+
+rf_params = {**DEFAULT_RF_PARAMS, 'n_estimators': args.n_estimators, 'max_depth': args.max_depth}
+print(f"\n🌲 RandomForest : {rf_params}")
+print(f"⚖️  SMOTE : {'non' if args.no_smote else 'oui (sur les features)'}")
+
+feature_cache = FeatureCache(args.feature_cache) if args.feature_cache else None
+
+start = time.perf_counter()
+try:
+    pipeline = fit_pipeline(X_train, y_train, rf_params=rf_params, smote=not args.no_smote,
+                            chunk_size=args.chunk_size, feature_cache=feature_cache)
+except ImportError as e:
+    print(f"❌ SMOTE indisponible ({e}) : installer imbalanced-learn ou relancer avec --no-smote")
+    sys.exit(1)
+print(f"✅ Pipeline entraîné en {time.perf_counter() - start:.1f} s")
+print(f"   Pic mémoire : {peak_memory_mb():.0f} MB")
+if feature_cache is not None:
+    metrics = feature_cache.get_metrics()
+    print(f"   Cache de features : {metrics['hits']} hits / {metrics['misses']} misses "
+          f"({metrics['entries']} entrées)")
+    feature_cache.close()
+
+# ============================================================================
+# Évaluation
+# ============================================================================
+
+try:
+    X_test, y_test = load_split(data_dir, 'test')
+    metrics = evaluate(pipeline, X_test, y_test, chunk_size=args.chunk_size)
+    print(f"\n📊 Test ({len(y_test)} époques) :")
+    for name, value in metrics.items():
+        print(f"   {name}: {value:.4f}")
+except FileNotFoundError:
+    print("\n⚠️  X_test.npy non trouvé : évaluation ignorée")
+
+# ============================================================================
+# Sauvegarde
+# ============================================================================
+
+output = Path(args.output)
+output.parent.mkdir(parents=True, exist_ok=True)
+joblib.dump(pipeline, output)
+print(f"\n💾 Pipeline sauvegardé : {output} ({output.stat().st_size / 1024**2:.2f} MB)")
+print("=" * 70)